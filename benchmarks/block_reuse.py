@@ -0,0 +1,67 @@
+"""Time re-converting a long manual after a one-line edit.
+
+A plain render renders every block of the document each time; with
+``reuse_blocks`` the renderer replays the blocks it rendered before and
+renders only the one that changed. Both are timed on the same 200-page
+manual -- headings, prose with links, lists, a table, display math and a
+missing image per page -- and the documents compared, to be sure the
+replayed one is what a plain render would give.
+
+Run from the repository root::
+
+    python -m benchmarks.block_reuse
+"""
+
+from __future__ import annotations
+
+import time
+
+from docx.shared import Pt
+
+from mdtoword.gfm_renderer import GfmDocxRenderer, block_cache_info
+
+_PAGE = """## Section {page}
+
+Prose with **bold**, *italic*, `code`, a [link](https://example.com/{page}) and
+inline math $x^2 + y_{page}$, long enough to fill a line or two of a page.
+
+- first item
+- second item with $\\alpha$
+  - nested item
+
+| name | value | note |
+| --- | --- | --- |
+| a | 1 | $z$ |
+
+$$\\frac{{a}}{{b}} + \\sum_{{k=1}}^n k$$
+
+![diagram](missing-{page}.png)
+
+"""
+
+
+def _render(markdown: str, reuse_blocks: bool) -> tuple[float, str]:
+    renderer = GfmDocxRenderer("Times New Roman", Pt(12), reuse_blocks=reuse_blocks)
+    started = time.perf_counter()
+    document, _ = renderer.render(markdown)
+    return time.perf_counter() - started, document.element.body.xml
+
+
+def main() -> None:
+    manual = "".join(_PAGE.format(page=page) for page in range(200))
+    edited = manual.replace("## Section 100\n", "## Section 100, revised\n")
+    _render("# Warm-up", reuse_blocks=False)
+
+    plain, expected = _render(edited, reuse_blocks=False)
+    first, _ = _render(manual, reuse_blocks=True)
+    edit, replayed = _render(edited, reuse_blocks=True)
+    assert replayed == expected
+    print(f"manual of {len(manual):,} characters")
+    print(f"plain render               {plain * 1000:8.0f} ms")
+    print(f"reuse_blocks, first render {first * 1000:8.0f} ms")
+    print(f"reuse_blocks, after edit   {edit * 1000:8.0f} ms")
+    print(block_cache_info())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Time the text tab's live preview on a 50-page draft.
+
+A whole ``preview_content`` renders every block of the draft; after an
+edit, ``LivePreview`` renders only the block that changed. Both are timed
+on the same draft -- headings, prose, lists, a table, display math and a
+missing image per page -- first whole, then after a one-line edit.
+
+Run from the repository root::
+
+    python -m benchmarks.live_preview
+"""
+
+from __future__ import annotations
+
+import time
+
+from mdtoword.converters import MarkdownToWordConverter
+from mdtoword.live_preview import LivePreview
+
+_PAGE = """## Section {page}
+
+Prose with **bold**, *italic*, `code`, a [link](https://example.com) and
+inline math $x^2 + y_{page}$, long enough to fill a line or two of a page.
+
+- first item
+- second item with $\\alpha$
+  - nested item
+
+| name | value | note |
+| --- | --- | --- |
+| a | 1 | $z$ |
+
+$$\\frac{{a}}{{b}} + \\sum_{{k=1}}^n k$$
+
+![diagram](missing-{page}.png)
+
+"""
+
+
+def main() -> None:
+    draft = "".join(_PAGE.format(page=page) for page in range(200))
+    edited = draft.replace("## Section 100\n", "## Section 100, revised\n")
+    converter = MarkdownToWordConverter()
+    converter.preview_content("# Warm-up")
+    preview = LivePreview(converter)
+
+    started = time.perf_counter()
+    converter.preview_content(edited)
+    whole = time.perf_counter() - started
+    started = time.perf_counter()
+    preview.update(draft)
+    first = time.perf_counter() - started
+    started = time.perf_counter()
+    preview.update(edited)
+    edit = time.perf_counter() - started
+    print(f"draft of {len(draft):,} characters")
+    print(f"preview_content, whole      {whole * 1000:8.0f} ms")
+    print(f"LivePreview, first render   {first * 1000:8.0f} ms")
+    print(f"LivePreview, after an edit  {edit * 1000:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Per-document cost of getting a Markdown parser ready.
+
+Compares building a fresh ``MarkdownIt`` with the footnote and math plugins
+for every document -- what ``GfmDocxRenderer.render`` used to do -- with
+fetching the cached one from ``markdown_parser()``, and shows both next to
+the cost of parsing a short note, so the setup overhead is seen in proportion.
+
+Run from the repository root::
+
+    python -m benchmarks.parser_setup
+"""
+
+from __future__ import annotations
+
+import timeit
+
+from mdtoword.gfm_renderer import _build_parser, markdown_parser
+
+_NOTE = "# Note\n\nSome *text* with a footnote[^1] and $x^2$.\n\n[^1]: Footnote.\n"
+
+
+def _per_call_us(statement, number: int) -> float:
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    markdown_parser()  # build the cached instance outside the timed loop
+    fresh = _per_call_us(lambda: _build_parser(True, True), 200)
+    cached = _per_call_us(markdown_parser, 200_000)
+    parse = _per_call_us(lambda: markdown_parser().parse(_NOTE), 2_000)
+    print(f"fresh parser per document : {fresh:10.1f} us")
+    print(f"cached parser per document: {cached:10.3f} us")
+    print(f"parsing a short note      : {parse:10.1f} us")
+    print(f"setup saved per document  : {fresh - cached:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
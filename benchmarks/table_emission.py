@@ -0,0 +1,54 @@
+"""Time ``GfmDocxRenderer`` on large GFM tables.
+
+Covers the two shapes that used to go quadratic when every cell was looked
+up through ``Table.cell``: a long data-dictionary export (10,000 rows) and a
+wide one (50 columns). Only rendering is timed; parsing the Markdown is
+measured separately and subtracted, so the figure is the cost of emitting
+the table itself.
+
+Run from the repository root::
+
+    python -m benchmarks.table_emission
+"""
+
+from __future__ import annotations
+
+import time
+
+from docx.shared import Pt
+
+from mdtoword.gfm_renderer import GfmDocxRenderer, markdown_parser
+
+
+def _table(rows: int, columns: int) -> str:
+    header = "| " + " | ".join(f"col {c}" for c in range(columns)) + " |"
+    rule = "|" + "---|" * columns
+    body = (
+        "| " + " | ".join(f"r{r}c{c}" for c in range(columns)) + " |"
+        for r in range(rows)
+    )
+    return "\n".join([header, rule, *body]) + "\n"
+
+
+def _time(label: str, rows: int, columns: int) -> None:
+    markdown = _table(rows, columns)
+    started = time.perf_counter()
+    markdown_parser().parse(markdown)
+    parsed = time.perf_counter()
+    GfmDocxRenderer("Times New Roman", Pt(12)).render(markdown)
+    rendered = time.perf_counter()
+    parse_seconds = parsed - started
+    table_seconds = (rendered - parsed) - parse_seconds
+    print(
+        f"{label:<22} {rows:>6} x {columns:<3} "
+        f"parse {parse_seconds:7.2f} s   emit {table_seconds:7.2f} s"
+    )
+
+
+def main() -> None:
+    _time("long (data dictionary)", 10_000, 4)
+    _time("wide", 1_000, 50)
+
+
+if __name__ == "__main__":
+    main()
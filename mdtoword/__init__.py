@@ -1 +1,3 @@
 """MDtoWORD — конвертер Markdown в Word и обратно."""
+
+__version__ = "1.1.1"
@@ -1,6 +1,35 @@
-"""Точка входа: ``python -m mdtoword`` и entry script для PyInstaller."""
+"""Точка входа: ``python -m mdtoword`` и entry script для PyInstaller.
+
+Без аргументов запускается GUI. ``python -m mdtoword convert ...`` —
+пакетная конвертация из командной строки (``mdtoword.cli``), ``watch ...`` —
+режим наблюдения (``mdtoword.watch``); им PyQt6 не нужен и не импортируется.
+Импорты поэтому внутри ``main``: процессы-воркеры (spawn) исполняют этот
+модуль заново, и GUI не должен подгружаться в каждый из них.
+
+``freeze_support()`` стоит раньше разбора аргументов: в собранном
+PyInstaller'ом exe воркер запускается тем же exe с аргументами
+multiprocessing, и без этого вызова он открыл бы GUI вместо работы.
+"""
+
+import multiprocessing
+import sys
+
+
+def main() -> None:
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == "convert":
+        from mdtoword.cli import main as convert
+
+        sys.exit(convert(sys.argv[2:]))
+    if command == "watch":
+        from mdtoword.watch import main as watch
+
+        sys.exit(watch(sys.argv[2:]))
+    from mdtoword.app import main as gui
+
+    gui()
 
-from mdtoword.app import main
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
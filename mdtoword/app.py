@@ -1,10 +1,11 @@
+import copy
 import sys
 from typing import Any, cast
 from pathlib import Path
 
 from docx.shared import Pt
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QDragEnterEvent, QDragMoveEvent, QDropEvent, QIcon, QMouseEvent
+from PyQt6.QtCore import QObject, QThread, QTimer, Qt, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QCloseEvent, QDragEnterEvent, QDragMoveEvent, QDropEvent, QIcon, QMouseEvent
 from PyQt6.QtWidgets import (
     QApplication, QAbstractItemView, QComboBox, QFileDialog, QGroupBox,
     QHBoxLayout, QLabel, QListWidget, QMainWindow, QMessageBox,
@@ -12,11 +13,13 @@ from PyQt6.QtWidgets import (
     QVBoxLayout, QWidget,
 )
 
+from .batch import BatchProgress, Converter, FileOutcome, run_pipeline
 from .converters import (
     ConversionError,
     MarkdownToWordConverter,
     WordToMarkdownConverter,
 )
+from .live_preview import LivePreview, PreviewResult
 from .workflow import discover_sources, resolve_output_paths
 from .theme import ThemeManager
 
@@ -90,9 +93,95 @@ class DropZoneLabel(QLabel):
         super().mouseReleaseEvent(event)
 
 
+class BatchThread(QThread):
+    """Runs a conversion batch off the UI thread.
+
+    Files are converted by ``run_pipeline``, several at once on worker
+    processes; ``file_finished`` carries the count done so far and the name
+    of the file just finished. Once the thread's own ``finished`` signal
+    fires, ``outcomes`` holds the results in queue order, or ``error`` the
+    reason the batch as a whole failed.
+    """
+
+    file_finished = pyqtSignal(int, str)
+
+    def __init__(
+        self,
+        queue: list[Path],
+        outputs: dict[Path, Path],
+        converter: Converter,
+        workers: int | None = None,
+        parent: QWidget | None = None,
+    ):
+        super().__init__(parent)
+        self.queue = queue
+        self.outputs = outputs
+        self.converter = converter
+        self.workers = workers
+        self.progress = BatchProgress(self._report)
+        self.outcomes: list[FileOutcome] = []
+        self.error: str | None = None
+
+    def cancel(self) -> None:
+        """Stop taking new files; files already started are still written."""
+        self.progress.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.progress.cancelled
+
+    def run(self) -> None:
+        jobs = ((source, self.outputs[source]) for source in self.queue)
+        try:
+            self.outcomes = run_pipeline(
+                jobs, self.converter, self.workers, progress=self.progress
+            )
+        except Exception as error:
+            self.error = str(error) or type(error).__name__
+
+    def _report(self, progress: BatchProgress) -> None:
+        _, done, _, _, last = progress.snapshot()
+        self.file_finished.emit(done, last.name if last is not None else "")
+
+
+class PreviewWorker(QObject):
+    """Renders the live preview of the text tab on a thread of its own.
+
+    Requests carry a generation number; the UI thread bumps ``latest`` for
+    every new one, which stops a render that has gone stale between two
+    blocks and skips stale requests still queued. Results, or the error
+    text of a failed render, come back through ``rendered``.
+    """
+
+    rendered = pyqtSignal(int, object)
+
+    def __init__(self, preview: LivePreview):
+        super().__init__()
+        self.preview = preview
+        self.latest = 0
+
+    @pyqtSlot(int, str)
+    def render(self, generation: int, content: str) -> None:
+        if generation != self.latest:
+            return
+        result: PreviewResult | str | None
+        try:
+            result = self.preview.update(content, lambda: generation != self.latest)
+        except ConversionError as error:
+            result = str(error)
+        if result is not None:
+            self.rendered.emit(generation, result)
+
+
+# How long typing has to pause before the preview is rendered again.
+PREVIEW_DELAY_MS = 300
+
+
 class ConverterGUI(QMainWindow):
     """Compact GUI for interactive conversion batches."""
 
+    preview_requested = pyqtSignal(int, str)
+
     def __init__(self, theme_manager: ThemeManager | None = None):
         super().__init__()
         self.theme_manager = theme_manager or ThemeManager()
@@ -104,7 +193,17 @@ class ConverterGUI(QMainWindow):
         self.selected_files: list[Path] = []
         self.output_directory: Path | None = None
         self.current_converter_type = "md_to_word"
-        self.converter: MarkdownToWordConverter | WordToMarkdownConverter = MarkdownToWordConverter()
+        # Blocks unchanged since the last conversion are not rendered again.
+        self.converter: MarkdownToWordConverter | WordToMarkdownConverter = (
+            MarkdownToWordConverter(reuse_blocks=True)
+        )
+        # Worker processes for a batch; None means one per CPU core.
+        self.workers: int | None = None
+        self._batch: BatchThread | None = None
+        self._preview_worker: PreviewWorker | None = None
+        self._preview_thread: QThread | None = None
+        self._preview_generation = 0
+        self._preview_result: PreviewResult | str | None = None
         self.current_language = "ru"
         self.fonts = ["Arial", "Times New Roman", "Calibri", "Georgia", "Helvetica", "Courier New"]
         self.translations = {
@@ -120,6 +219,10 @@ class ConverterGUI(QMainWindow):
                 "choose_output": "Выбрать папку", "reset_output": "Сбросить",
                 "ready": "Готово к конвертации", "queued": "В очереди: {count}",
                 "converting": "Конвертация: {filename}",
+                "progress": "Готово {done} из {total}: {filename}",
+                "cancel": "Отменить",
+                "cancelling": "Отмена: дописываются начатые файлы…",
+                "cancelled": "Конвертация отменена",
                 "finished": "Конвертация завершена", "convert": "Конвертировать",
                 "toggle_md": "Режим: MD → Word", "toggle_word": "Режим: Word → MD",
                 "theme_dark": "Тёмная тема · Переключить на светлую",
@@ -129,6 +232,10 @@ class ConverterGUI(QMainWindow):
                 "errors": "Конвертация завершена с ошибками", "result": "Готово: {success}\nОшибок: {errors}",
                 "footnotes_heading": "Сноски",
                 "converted_ok": "Успешно конвертировано",
+                "preview": "Предпросмотр",
+                "preview_outline": "Структура",
+                "preview_warnings": "Предупреждения",
+                "preview_no_warnings": "Предупреждений нет",
                 "convert_failed": "Ошибка при конвертации: {error}",
             },
             "en": {
@@ -143,6 +250,10 @@ class ConverterGUI(QMainWindow):
                 "choose_output": "Choose folder", "reset_output": "Reset",
                 "ready": "Ready to convert", "queued": "In queue: {count}",
                 "converting": "Converting: {filename}",
+                "progress": "Done {done} of {total}: {filename}",
+                "cancel": "Cancel",
+                "cancelling": "Cancelling: finishing files already started…",
+                "cancelled": "Conversion cancelled",
                 "finished": "Conversion finished", "convert": "Convert",
                 "toggle_md": "Mode: MD → Word", "toggle_word": "Mode: Word → MD",
                 "theme_dark": "Dark theme · Switch to light",
@@ -152,6 +263,10 @@ class ConverterGUI(QMainWindow):
                 "errors": "Conversion completed with errors", "result": "Complete: {success}\nErrors: {errors}",
                 "footnotes_heading": "Footnotes",
                 "converted_ok": "Converted successfully",
+                "preview": "Preview",
+                "preview_outline": "Outline",
+                "preview_warnings": "Warnings",
+                "preview_no_warnings": "No warnings",
                 "convert_failed": "Conversion failed: {error}",
             },
         }
@@ -269,8 +384,19 @@ class ConverterGUI(QMainWindow):
         text_layout = QVBoxLayout(self.text_tab)
         self.text_label = QLabel()
         self.text_input = QPlainTextEdit()
+        self.text_input.textChanged.connect(self._schedule_preview)
+        self.preview_label = QLabel()
+        self.preview_output = QPlainTextEdit()
+        self.preview_output.setReadOnly(True)
+        self.preview_output.setMaximumHeight(140)
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(PREVIEW_DELAY_MS)
+        self._preview_timer.timeout.connect(self._request_preview)
         text_layout.addWidget(self.text_label)
-        text_layout.addWidget(self.text_input)
+        text_layout.addWidget(self.text_input, 1)
+        text_layout.addWidget(self.preview_label)
+        text_layout.addWidget(self.preview_output)
         self.tabs.addTab(self.text_tab, "")
 
         self.output_group = QGroupBox()
@@ -300,6 +426,11 @@ class ConverterGUI(QMainWindow):
         self.convert_button.setObjectName("primary-button")
         self.convert_button.clicked.connect(self._convert_files)
         layout.addWidget(self.convert_button)
+        self.cancel_button = QPushButton()
+        self.cancel_button.setObjectName("danger-button")
+        self.cancel_button.clicked.connect(self._cancel_batch)
+        self.cancel_button.hide()
+        layout.addWidget(self.cancel_button)
 
         footer = QHBoxLayout()
         self.toggle_button = QPushButton()
@@ -322,7 +453,9 @@ class ConverterGUI(QMainWindow):
             "word_to_md" if self.current_converter_type == "md_to_word" else "md_to_word"
         )
         self.converter = (
-            WordToMarkdownConverter() if self.current_converter_type == "word_to_md" else MarkdownToWordConverter()
+            WordToMarkdownConverter()
+            if self.current_converter_type == "word_to_md"
+            else MarkdownToWordConverter(reuse_blocks=True)
         )
         if isinstance(self.converter, MarkdownToWordConverter):
             self.converter.default_font_name = self.font_combobox.currentText()
@@ -368,12 +501,15 @@ class ConverterGUI(QMainWindow):
         self.tabs.setTabText(self.tabs.indexOf(self.files_tab), text["files_tab"])
         self.tabs.setTabText(self.tabs.indexOf(self.text_tab), text["text_tab"])
         self.text_label.setText(text["text_label"])
+        self.preview_label.setText(text["preview"])
+        self._show_preview_text()
         self.tabs.setTabVisible(self.tabs.indexOf(self.text_tab), is_markdown)
         self.output_group.setTitle(text["output"])
         self.output_label.setText(str(self.output_directory) if self.output_directory else text["output_auto"])
         self.choose_output_button.setText(text["choose_output"])
         self.reset_output_button.setText(text["reset_output"])
         self.reset_output_button.setVisible(self.output_directory is not None)
+        self.cancel_button.setText(text["cancel"])
         self.toggle_button.setText(text["toggle_md"] if is_markdown else text["toggle_word"])
         self.language_button.setText("EN" if self.current_language == "ru" else "RU")
         self._update_theme_button()
@@ -455,7 +591,19 @@ class ConverterGUI(QMainWindow):
         queue = list(self.selected_files)
         outputs = resolve_output_paths(queue, self.output_directory, suffix)
 
-        lockable_widgets = (
+        # A copy: changing the font or language mid-run must not reach the
+        # files still waiting in this batch.
+        self._batch = BatchThread(queue, outputs, copy.copy(self.converter), self.workers, self)
+        self._batch.file_finished.connect(self._on_file_finished)
+        self._batch.finished.connect(self._on_batch_finished)
+        self._set_batch_running(True)
+        self.progress.setRange(0, len(queue))
+        self.progress.setValue(0)
+        self.status_label.setText(self._text["converting"].format(filename=queue[0].name))
+        self._batch.start()
+
+    def _lockable_widgets(self) -> tuple[QWidget, ...]:
+        return (
             self.convert_button,
             self.files_listbox,
             self.add_files_button,
@@ -464,47 +612,137 @@ class ConverterGUI(QMainWindow):
             self.clear_button,
             self.drop_hint,
         )
-        try:
-            for widget in lockable_widgets:
-                widget.setEnabled(False)
-            self.setAcceptDrops(False)
-            self.files_listbox.setAcceptDrops(False)
-            self.progress.show()
-            self.progress.setRange(0, len(queue))
-            success_count = 0
-            errors: list[str] = []
-            warnings: list[str] = []
-            for index, source in enumerate(queue, start=1):
-                self.status_label.setText(self._text["converting"].format(filename=source.name))
-                QApplication.processEvents()
-                try:
-                    file_warnings = self.converter.convert_file(source, outputs[source])
-                except ConversionError as error:
-                    errors.append(
-                        f"{source.name}: " + self._text["convert_failed"].format(error=error)
-                    )
-                else:
-                    success_count += 1
-                    warnings.extend(f"{source.name}: {warning}" for warning in file_warnings)
-                self.progress.setValue(index)
-                QApplication.processEvents()
-
-            details = errors + warnings
-            result = self._text["result"].format(success=success_count, errors=len(errors))
-            if details:
-                QMessageBox.warning(self, self._text["errors"], result + "\n\n" + "\n".join(details))
-            else:
-                QMessageBox.information(self, self.windowTitle(), result)
-            self.status_label.setText(self._text["finished"])
-        finally:
-            self.progress.hide()
+
+    def _set_batch_running(self, running: bool) -> None:
+        for widget in self._lockable_widgets():
+            widget.setEnabled(not running)
+        self.setAcceptDrops(not running)
+        self.files_listbox.setAcceptDrops(not running)
+        self.progress.setVisible(running)
+        self.cancel_button.setEnabled(running)
+        self.cancel_button.setVisible(running)
+        if not running:
             self.progress.reset()
-            self.setAcceptDrops(True)
-            self.files_listbox.setAcceptDrops(True)
-            for widget in lockable_widgets:
-                widget.setEnabled(True)
             self._update_queue_buttons()
 
+    def _cancel_batch(self) -> None:
+        if self._batch is None:
+            return
+        self._batch.cancel()
+        self.cancel_button.setEnabled(False)
+        self.status_label.setText(self._text["cancelling"])
+
+    def _on_file_finished(self, done: int, filename: str) -> None:
+        self.progress.setValue(done)
+        if self._batch is not None and not self._batch.cancelled:
+            self.status_label.setText(
+                self._text["progress"].format(
+                    done=done, total=self.progress.maximum(), filename=filename
+                )
+            )
+
+    def _on_batch_finished(self) -> None:
+        batch, self._batch = self._batch, None
+        if batch is None:
+            return
+        batch.deleteLater()
+        self._set_batch_running(False)
+        if batch.error is not None:
+            QMessageBox.critical(
+                self, self._text["errors"], self._text["convert_failed"].format(error=batch.error)
+            )
+            self.status_label.setText(self._text["finished"])
+            return
+
+        success_count = 0
+        errors: list[str] = []
+        warnings: list[str] = []
+        for outcome in batch.outcomes:
+            name = outcome.source.name
+            if outcome.error is not None:
+                errors.append(f"{name}: " + self._text["convert_failed"].format(error=outcome.error))
+            else:
+                success_count += 1
+                warnings.extend(f"{name}: {warning}" for warning in outcome.warnings)
+
+        details = errors + warnings
+        result = self._text["result"].format(success=success_count, errors=len(errors))
+        if details:
+            QMessageBox.warning(self, self._text["errors"], result + "\n\n" + "\n".join(details))
+        else:
+            QMessageBox.information(self, self.windowTitle(), result)
+        self.status_label.setText(self._text["cancelled" if batch.cancelled else "finished"])
+
+    def _schedule_preview(self) -> None:
+        self._preview_timer.start()
+
+    def _request_preview(self) -> None:
+        if not isinstance(self.converter, MarkdownToWordConverter):
+            return
+        content = self.text_input.toPlainText()
+        self._preview_generation += 1
+        if not content.strip():
+            self._preview_result = None
+            self._show_preview_text()
+            if self._preview_worker is not None:
+                self._preview_worker.latest = self._preview_generation
+            return
+        if self._preview_worker is None:
+            # One long-lived thread: parsers and the document template are
+            # built per thread, and reusing them is most of what keeps a
+            # preview fast.
+            self._preview_worker = PreviewWorker(LivePreview(self.converter))
+            self._preview_thread = QThread(self)
+            self._preview_worker.moveToThread(self._preview_thread)
+            self.preview_requested.connect(self._preview_worker.render)
+            self._preview_worker.rendered.connect(self._on_preview_rendered)
+            self._preview_thread.start()
+        elif self._preview_worker.preview.converter is not self.converter:
+            self._preview_worker.preview = LivePreview(self.converter)
+        self._preview_worker.latest = self._preview_generation
+        self.preview_requested.emit(self._preview_generation, content)
+
+    def _on_preview_rendered(self, generation: int, result: PreviewResult | str) -> None:
+        if generation != self._preview_generation:
+            return
+        self._preview_result = result
+        self._show_preview_text()
+
+    def _show_preview_text(self) -> None:
+        result = self._preview_result
+        if result is None:
+            self.preview_output.clear()
+            return
+        if isinstance(result, str):
+            self.preview_output.setPlainText(self._text["convert_failed"].format(error=result))
+            return
+        lines = []
+        if result.headings:
+            lines.append(self._text["preview_outline"] + ":")
+            lines.extend("  " * level + heading for level, heading in result.headings)
+        if result.warnings:
+            lines.append(self._text["preview_warnings"] + ":")
+            lines.extend(f"  • {warning}" for warning in result.warnings)
+        else:
+            lines.append(self._text["preview_no_warnings"])
+        self.preview_output.setPlainText("\n".join(lines))
+
+    def closeEvent(self, event: QCloseEvent | None) -> None:
+        self._preview_timer.stop()
+        if self._preview_worker is not None and self._preview_thread is not None:
+            self._preview_worker.latest = -1
+            self._preview_thread.quit()
+            self._preview_thread.wait()
+            self._preview_worker = self._preview_thread = None
+        if self._batch is not None:
+            # Nothing left to report to: just let the files already started
+            # finish writing, so none is left half-done.
+            self._batch.blockSignals(True)
+            self._batch.cancel()
+            self._batch.wait()
+            self._batch = None
+        super().closeEvent(event)
+
     def _convert_text(self) -> None:
         if not isinstance(self.converter, MarkdownToWordConverter):
             return
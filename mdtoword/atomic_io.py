@@ -0,0 +1,52 @@
+"""Write files so that readers never see them half-written.
+
+Every output and cache file goes to a temporary name next to its target
+and is renamed over it only once complete. ``os.replace`` within one
+directory is atomic, so a reader sees either the old file, the new one or
+none -- never the truncated .docx a killed or crashed save would otherwise
+leave behind. The temporary file is created with the usual 0o666-minus-umask
+mode, so the renamed output has the permissions a plain ``open`` would
+have given it.
+
+Durability against power loss (``fsync``) is deliberately not attempted:
+it would cost every save a round trip to the disk, or to the server on a
+network drive, for a failure these files can simply be rebuilt after.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+import os
+from pathlib import Path
+import secrets
+from typing import BinaryIO
+
+# Writers like ``zipfile`` issue many small writes; buffering them into
+# large ones matters most on network drives, where each write is a request.
+_BUFFER_SIZE = 1024 * 1024
+
+
+@contextmanager
+def atomic_output(path: Path, buffer_size: int = _BUFFER_SIZE) -> Iterator[BinaryIO]:
+    """A buffered binary stream whose contents replace *path* on success.
+
+    If the block raises, the temporary file is removed and *path* is left
+    exactly as it was.
+    """
+    temporary = path.with_name(f".{path.name}.{secrets.token_hex(4)}.tmp")
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    descriptor = os.open(temporary, flags, 0o666)
+    try:
+        with open(descriptor, "wb", buffering=buffer_size) as stream:
+            yield stream
+        os.replace(temporary, path)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+
+
+def write_atomically(path: Path, data: bytes) -> None:
+    """Write *data* to *path* through a temporary file in the same directory."""
+    with atomic_output(path) as stream:
+        stream.write(data)
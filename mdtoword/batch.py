@@ -0,0 +1,483 @@
+"""Пакетная конвертация: прогон одного конвертера по списку файлов.
+
+Модуль, как и ``mdtoword.converters``, свободен и от PyQt6, и от SDK ``mcp``:
+пакетный движок нужен MCP-серверу, но сам по себе о протоколе ничего не знает
+и возвращает простые результаты, которые потребитель упаковывает как хочет.
+
+Контракт повторяет последовательный цикл, который жил в ``mcp_server``:
+результаты идут строго в порядке ``sources``, а отказ одного файла
+(``ConversionError``) фиксируется в его результате и не прерывает остальные.
+``run_pipeline`` принимает файлы потоком и конвертирует их, пока обход
+дерева ещё идёт.
+
+С ``limits`` (``FileLimits``) каждый файл конвертируется в процессе-воркере
+под пределом времени и памяти: файл, который завис или раздул память,
+становится отказом с понятной причиной, а прогон идёт дальше.
+
+С ``incremental=True`` прогон ведёт манифест (``mdtoword.manifest``) в каждом
+каталоге результатов и пропускает файлы, результат которых уже актуален.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+import hashlib
+import itertools
+import os
+from pathlib import Path
+import pickle
+import threading
+
+from .converters import (
+    ConversionError,
+    MarkdownToWordConverter,
+    WordToMarkdownConverter,
+)
+from .manifest import Manifests, options_key
+from .worker_pool import JobOutOfMemory, JobTimedOut, WorkerCrashed, WorkerPool
+
+Converter = MarkdownToWordConverter | WordToMarkdownConverter
+
+
+@dataclass
+class FileOutcome:
+    """Итог конвертации одного файла: варнинги при успехе, текст ошибки при отказе.
+
+    ``unchanged`` — файл не конвертировался, потому что результат уже
+    актуален; варнинги и ``local_images`` тогда те, что были записаны при
+    его сборке.
+    ``local_images`` и ``remote_images`` — что рендер прочитал помимо
+    исходника, ``http_cache_*`` — счётчики дискового кэша изображений,
+    ``output_bytes`` и ``save_seconds`` — размер результата и время его
+    записи (см. ``ConversionResult``). У пропущенного файла записи не было,
+    и ``save_seconds`` — None. Размер и время — замеры, а не итог (в docx
+    попадает время сохранения, и сжатый размер плавает на байты), поэтому в
+    сравнении результатов они не участвуют.
+    """
+
+    source: Path
+    output: Path
+    warnings: list[str] = field(default_factory=list)
+    error: str | None = None
+    unchanged: bool = False
+    local_images: list[Path] = field(default_factory=list)
+    remote_images: list[str] = field(default_factory=list)
+    http_cache_hits: int = 0
+    http_cache_misses: int = 0
+    output_bytes: int | None = field(default=None, compare=False)
+    save_seconds: float | None = field(default=None, compare=False)
+
+
+@dataclass(frozen=True)
+class FileLimits:
+    """Пределы на конвертацию одного файла; None — без предела.
+
+    ``seconds`` — время на файл, ``memory_bytes`` — пиковая память
+    процесса-воркера (на Windows не проверяется, см. ``worker_pool``).
+    """
+
+    seconds: float | None = None
+    memory_bytes: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.seconds is not None and self.seconds <= 0:
+            raise ValueError(f"seconds must be positive, got {self.seconds}")
+        if self.memory_bytes is not None and self.memory_bytes < 1:
+            raise ValueError(f"memory_bytes must be positive, got {self.memory_bytes}")
+
+    def __bool__(self) -> bool:
+        return self.seconds is not None or self.memory_bytes is not None
+
+
+class BatchProgress:
+    """Ход прогона для тех, кто за ним следит: найдено, готово, записано.
+
+    Пока обход дерева не закончен (``discovery_complete`` ложно), ``found``
+    растёт вместе с ``done``, и итоговое число файлов ещё неизвестно.
+    *on_change* вызывается после каждого готового файла в потоке прогона;
+    читать счётчики из других потоков безопасно через ``snapshot``.
+
+    ``cancel`` из любого потока останавливает прогон: новые файлы больше не
+    берутся, начатые дописываются, и в итог попадают только они.
+    """
+
+    def __init__(self, on_change: Callable[[BatchProgress], None] | None = None) -> None:
+        self._on_change = on_change
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self.found = 0
+        self.done = 0
+        self.bytes_written = 0
+        self.discovery_complete = False
+        self.last_source: Path | None = None
+
+    def snapshot(self) -> tuple[int, int, int, bool, Path | None]:
+        """``(found, done, bytes_written, discovery_complete, last_source)`` разом."""
+        with self._lock:
+            return (
+                self.found,
+                self.done,
+                self.bytes_written,
+                self.discovery_complete,
+                self.last_source,
+            )
+
+    def cancel(self) -> None:
+        """Не брать в работу новые файлы; см. docstring класса."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def _track(self, jobs: Iterable[tuple[Path, Path]]) -> Iterator[tuple[Path, Path]]:
+        # На одну задачу вперёд: конец обхода виден уже при выдаче последней
+        # задачи, и итог по последнему файлу приходит с известным общим числом.
+        remaining = iter(jobs)
+        job = next(remaining, None)
+        while job is not None and not self.cancelled:
+            following = next(remaining, None)
+            with self._lock:
+                self.found += 1
+                self.discovery_complete = following is None
+            yield job
+            job = following
+        with self._lock:
+            self.discovery_complete = True
+
+    def _record(self, outcome: FileOutcome) -> None:
+        with self._lock:
+            self.done += 1
+            if outcome.error is None and not outcome.unchanged:
+                self.bytes_written += outcome.output_bytes or 0
+            self.last_source = outcome.source
+        if self._on_change is not None:
+            self._on_change(self)
+
+
+def default_workers() -> int:
+    """Число процессов по умолчанию — по числу ядер."""
+    return os.cpu_count() or 1
+
+
+def new_worker_pool(size: int | None = None, **limits: int | None) -> WorkerPool:
+    """Пул процессов-воркеров, уже готовых конвертировать.
+
+    Воркер ещё до первой задачи прогревает всё, что иначе оплатил бы первый
+    файл: импорты, парсер Markdown, шаблон docx, таблицы LaTeX. Пул можно
+    держать между прогонами (как MCP-сервер) и передавать в ``run_pipeline``;
+    *limits* — ``max_jobs`` и ``max_rss_bytes`` для ``WorkerPool``.
+    """
+    return WorkerPool(size or default_workers(), _warm_up, **limits)
+
+
+def _warm_up() -> None:
+    """Отрендерить в воркере крошечный документ со всем, что стоит прогреть."""
+    MarkdownToWordConverter().preview_content(
+        "# Warm-up\n\n| a |\n| - |\n| $x^2$ |\n\n$$\\frac{a}{b}$$\n"
+    )
+
+
+def _convert_one(converter: Converter, source: Path, output: Path) -> FileOutcome:
+    """Сконвертировать один файл, переведя ConversionError в результат."""
+    try:
+        result = converter.convert(source, output)
+    except ConversionError as error:
+        return FileOutcome(source, output, error=str(error))
+    return FileOutcome(
+        source,
+        output,
+        result.warnings,
+        local_images=result.local_images,
+        remote_images=result.remote_images,
+        http_cache_hits=result.http_cache_hits,
+        http_cache_misses=result.http_cache_misses,
+        output_bytes=result.output_bytes,
+        save_seconds=result.save_seconds,
+    )
+
+
+# Конвертеры, уже переданные этому процессу-воркеру, по ключу их pickle.
+_installed: dict[str, Converter] = {}
+# Сколько разных конвертеров воркер помнит; старейший вытесняется.
+_INSTALLED_KEPT = 8
+
+
+class _ConverterMissing(Exception):
+    """Воркеру не передан конвертер задачи: её надо повторить вместе с ним."""
+
+
+def _convert_installed(
+    key: str, payload: bytes | None, source: Path, output: Path
+) -> FileOutcome:
+    """``_convert_one`` в воркере, с конвертером, установленным по *key*."""
+    converter = _installed.get(key)
+    if converter is None:
+        if payload is None:
+            raise _ConverterMissing(key)
+        converter = pickle.loads(payload)
+        if len(_installed) >= _INSTALLED_KEPT:
+            del _installed[next(iter(_installed))]
+        _installed[key] = converter
+    return _convert_one(converter, source, output)
+
+
+def _collect(future: Future[FileOutcome], source: Path, output: Path) -> FileOutcome:
+    """Забрать результат задачи; падение процесса-воркера — отказ этого файла."""
+    try:
+        return future.result()
+    except JobTimedOut as error:
+        return FileOutcome(
+            source, output, error=f"Conversion timed out after {error.seconds:g} s"
+        )
+    except JobOutOfMemory as error:
+        megabytes = error.limit_bytes / (1024 * 1024)
+        return FileOutcome(
+            source,
+            output,
+            error=f"Conversion exceeded the memory limit of {megabytes:g} MB",
+        )
+    except WorkerCrashed as error:
+        return FileOutcome(
+            source, output, error=f"Conversion worker terminated abruptly ({error})"
+        )
+
+
+def run_batch(
+    sources: Sequence[Path],
+    outputs: Mapping[Path, Path],
+    converter: Converter,
+    workers: int | None = None,
+    incremental: bool = False,
+    limits: FileLimits | None = None,
+) -> list[FileOutcome]:
+    """Сконвертировать все файлы, не прерываясь на отдельных отказах.
+
+    ``workers`` — число процессов-воркеров, по умолчанию по числу ядер. Пул
+    не поднимается вовсе, когда параллелить нечего (один воркер или один
+    файл): запуск процессов дороже конвертации одного файла.
+
+    ``incremental`` — пропускать файлы, чей результат по манифесту актуален,
+    и обновить манифест по итогам прогона. Проверка идёт в вызывающем
+    процессе, так что прогон без изменений пул не поднимает.
+
+    ``limits`` — пределы времени и памяти на файл (``FileLimits``). С ними
+    каждый файл конвертируется в процессе-воркере, даже единственный:
+    зависший или раздувшийся процесс можно убить, не задев остальные.
+    """
+    return run_pipeline(
+        ((source, outputs[source]) for source in sources),
+        converter,
+        workers,
+        incremental,
+        limits=limits,
+    )
+
+
+def summarize(
+    outcomes: Iterable[FileOutcome], remote_image_cache: bool = False
+) -> dict[str, object]:
+    """Отчёт о прогоне в виде JSON-совместимого словаря.
+
+    Форма та же, что у ``ConversionReport`` MCP-сервера, — он сам строится
+    из этого словаря, — так что командная строка и сервер отчитываются
+    одинаково. *remote_image_cache* — заполнить счётчики дискового кэша
+    изображений; без него ``remote_image_cache`` — None.
+    """
+    report: dict[str, object] = {"sources_found": 0}
+    converted: list[dict[str, object]] = []
+    failed: list[dict[str, object]] = []
+    unchanged: list[dict[str, object]] = []
+    cache = {"hits": 0, "misses": 0}
+    for outcome in outcomes:
+        report["sources_found"] += 1
+        cache["hits"] += outcome.http_cache_hits
+        cache["misses"] += outcome.http_cache_misses
+        if outcome.error is not None:
+            failed.append({"source": str(outcome.source), "error": outcome.error})
+            continue
+        (unchanged if outcome.unchanged else converted).append(
+            {
+                "source": str(outcome.source),
+                "output": str(outcome.output),
+                "warnings": list(outcome.warnings),
+                "output_bytes": outcome.output_bytes,
+                "save_seconds": outcome.save_seconds,
+            }
+        )
+    report.update(
+        converted=converted,
+        failed=failed,
+        unchanged=unchanged,
+        remote_image_cache=cache if remote_image_cache else None,
+        job_id=None,
+    )
+    return report
+
+
+def run_pipeline(
+    jobs: Iterable[tuple[Path, Path]],
+    converter: Converter,
+    workers: int | None = None,
+    incremental: bool = False,
+    progress: BatchProgress | None = None,
+    pool: WorkerPool | None = None,
+    limits: FileLimits | None = None,
+) -> list[FileOutcome]:
+    """То же, что ``run_batch``, но пары «исходник — результат» приходят потоком.
+
+    Конвертация начинается с первой же пары, не дожидаясь конца *jobs*:
+    обход большого дерева (``workflow.iter_sources``) и конвертация идут
+    одновременно. В работе не больше ``workers`` задач, так что поток,
+    который находит файлы быстрее, чем они конвертируются, просто ждёт.
+    Результаты идут в порядке *jobs*.
+
+    *progress*, если передан, отмечает каждый найденный и каждый готовый
+    файл, в том числе пропущенный как актуальный, и через него же прогон
+    можно отменить (``BatchProgress.cancel``). *pool* — уже прогретый
+    пул из ``new_worker_pool``; прогон не растит его, и *workers* больше его
+    размера не бывает. Без пула прогон поднимает свой и гасит его в конце.
+    *limits* — как в ``run_batch``.
+    """
+    if workers is None:
+        workers = default_workers()
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    if progress is not None:
+        jobs = progress._track(jobs)
+
+    manifests = Manifests()
+    options = options_key(converter) if incremental else ""
+    outcomes: list[FileOutcome | None] = []
+
+    def conversions() -> Iterator[tuple[int, Path, Path]]:
+        for source, output in jobs:
+            outcomes.append(None)
+            if incremental:
+                manifest = manifests.for_output(output)
+                warnings = manifest.current(source, output, options)
+                if warnings is not None:
+                    unchanged = FileOutcome(
+                        source,
+                        output,
+                        warnings,
+                        unchanged=True,
+                        local_images=manifest.images(output),
+                        output_bytes=output.stat().st_size,
+                    )
+                    outcomes[-1] = unchanged
+                    if progress is not None:
+                        progress._record(unchanged)
+                    continue
+            yield len(outcomes) - 1, source, output
+
+    stream = _convert_stream(conversions(), converter, workers, pool, limits or None)
+    for index, outcome in stream:
+        outcomes[index] = outcome
+        if progress is not None:
+            progress._record(outcome)
+        if not incremental:
+            continue
+        manifest = manifests.for_output(outcome.output)
+        if outcome.error is not None or outcome.remote_images:
+            # Отказ мог оставить прежний или недописанный файл, а у
+            # скачанного изображения нет отпечатка, по которому проверить,
+            # не сменилось ли оно: такой результат в следующий раз собирается
+            # заново.
+            manifest.forget(outcome.output)
+        else:
+            manifest.record(
+                outcome.source,
+                outcome.output,
+                options,
+                outcome.local_images,
+                outcome.warnings,
+            )
+    manifests.save()
+    return [outcome for outcome in outcomes if outcome is not None]
+
+
+def _convert_stream(
+    jobs: Iterator[tuple[int, Path, Path]],
+    converter: Converter,
+    workers: int,
+    pool: WorkerPool | None,
+    limits: FileLimits | None,
+) -> Iterator[tuple[int, FileOutcome]]:
+    """Сконвертировать задачи по мере поступления; итоги — в порядке готовности."""
+    first = next(jobs, None)
+    if first is None:
+        return
+    if limits is None:
+        second = next(jobs, None) if workers > 1 else None
+        if second is None:
+            for index, source, output in itertools.chain([first], jobs):
+                yield index, _convert_one(converter, source, output)
+            return
+        jobs = itertools.chain([first, second], jobs)
+    else:
+        # Предел можно соблюсти только в отдельном процессе.
+        jobs = itertools.chain([first], jobs)
+
+    if pool is not None:
+        # Чужой пул не растёт: он живёт дольше прогона (у MCP-сервера — всю
+        # сессию), и один прогон с огромным workers оставил бы после себя
+        # столько же прогретых процессов.
+        yield from _dispatch(jobs, converter, min(workers, pool.size), pool, limits)
+        return
+    with WorkerPool(workers, _warm_up) as owned:
+        yield from _dispatch(jobs, converter, workers, owned, limits)
+
+
+def _dispatch(
+    jobs: Iterator[tuple[int, Path, Path]],
+    converter: Converter,
+    workers: int,
+    pool: WorkerPool,
+    limits: FileLimits | None,
+) -> Iterator[tuple[int, FileOutcome]]:
+    """Раздать задачи пулу, держа в работе не больше *workers* разом.
+
+    Пул может быть общим для нескольких прогонов: предел держит этот
+    прогон в пределах его ``workers``, а очередь задач — короткой.
+    """
+    limits = limits or FileLimits()
+    # Конвертер передаётся воркеру один раз, а не с каждой задачей: задача
+    # несёт ключ конвертера и пути. Воркер, которому ключ не знаком, отвечает
+    # _ConverterMissing, и задача уходит снова, уже с конвертером. Первые
+    # *workers* задач несут его сразу: их разберут разные воркеры.
+    payload = pickle.dumps(converter)
+    key = hashlib.sha256(payload).hexdigest()
+    in_flight: dict[Future[FileOutcome], tuple[int, Path, Path]] = {}
+
+    def submit(job: tuple[int, Path, Path], carry: bool) -> None:
+        _, source, output = job
+        future = pool.submit(
+            _convert_installed,
+            key,
+            payload if carry else None,
+            source,
+            output,
+            timeout=limits.seconds,
+            max_rss_bytes=limits.memory_bytes,
+        )
+        in_flight[future] = job
+
+    def settle() -> Iterator[tuple[int, FileOutcome]]:
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            job = in_flight.pop(future)
+            if not future.cancelled() and isinstance(future.exception(), _ConverterMissing):
+                submit(job, carry=True)
+                continue
+            index, source, output = job
+            yield index, _collect(future, source, output)
+
+    for submitted, job in enumerate(jobs):
+        while len(in_flight) >= workers:
+            yield from settle()
+        submit(job, carry=submitted < workers)
+    while in_flight:
+        yield from settle()
@@ -0,0 +1,155 @@
+"""Headless batch conversion: ``python -m mdtoword convert``.
+
+For machines with neither a display nor an MCP client, such as a build
+farm. The inputs are collected with ``workflow.discover_sources``, given
+outputs by ``resolve_output_paths`` and converted by ``batch.run_batch``,
+as the GUI and the MCP server do. Images referenced by an http(s) URL are
+fetched by default, as in the GUI: the command runs Markdown its user
+chose, while the MCP server converts whatever a client hands it and so
+fetches only on request. ``--no-remote-images`` turns fetching off.
+Neither PyQt6 nor the ``mcp`` SDK is imported, so the command starts
+quickly and runs with only the conversion core installed
+(``requirements-core.txt``).
+
+``--json`` prints the report in the shape of the MCP server's
+``ConversionReport`` (see ``batch.summarize``), so a script can parse
+either. The exit status is 0 when every file converted or was already up
+to date, 1 when a file failed or the inputs matched no file, and 2 for
+bad arguments.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Sequence
+import json
+from pathlib import Path
+import sys
+
+from docx.shared import Pt
+
+from .batch import run_batch, summarize
+from .converters import MarkdownToWordConverter, WordToMarkdownConverter
+from .docx_writer import COMPRESSION_LEVELS
+from .workflow import discover_sources, resolve_output_paths
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m mdtoword convert",
+        description="Convert Markdown files to Word documents, or Word documents "
+        "to Markdown with --to-markdown, without the GUI.",
+    )
+    parser.add_argument(
+        "inputs", nargs="+", type=Path, help="files and directories; directories are scanned"
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        type=Path,
+        help="write every output here instead of next to its source",
+    )
+    parser.add_argument(
+        "--to-markdown",
+        action="store_true",
+        help="convert .docx files to Markdown instead (lossy)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        metavar="N",
+        help="convert N files in parallel (default: one per CPU core)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="skip files whose output is up to date with its source and images",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="print the report as JSON on stdout"
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="only convert matching files",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="skip matching files and directories",
+    )
+    parser.add_argument("--font", default="Times New Roman", help="default font name")
+    parser.add_argument("--size", type=float, default=12, help="default font size in points")
+    parser.add_argument(
+        "--footnotes-heading", default="Footnotes", help="title of the footnotes section"
+    )
+    parser.add_argument(
+        "--no-remote-images",
+        action="store_true",
+        help="do not fetch images referenced by an http(s) URL",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=COMPRESSION_LEVELS,
+        default="default",
+        help="ZIP compression of the .docx (default: %(default)s)",
+    )
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Convert as the command line says; returns the exit status."""
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    if args.to_markdown:
+        mode, suffix = "word_to_md", ".md"
+        converter = WordToMarkdownConverter()
+    else:
+        mode, suffix = "md_to_word", ".docx"
+        converter = MarkdownToWordConverter(
+            args.font,
+            Pt(args.size),
+            args.footnotes_heading,
+            allow_remote_images=not args.no_remote_images,
+            compression=args.compression,
+        )
+    sources = discover_sources(args.inputs, mode, args.include, args.exclude)
+    output_dir = None if args.output_dir is None else args.output_dir.expanduser().resolve()
+    if output_dir is not None and sources:
+        try:
+            output_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as error:
+            parser.error(f"cannot create --output-dir {output_dir}: {error}")
+    outputs = resolve_output_paths(sources, output_dir, suffix)
+
+    outcomes = run_batch(sources, outputs, converter, args.jobs, args.incremental)
+    report = summarize(outcomes)
+
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        for outcome in outcomes:
+            if outcome.error is not None:
+                print(f"failed     {outcome.source}: {outcome.error}", file=sys.stderr)
+                continue
+            state = "unchanged" if outcome.unchanged else "converted"
+            print(f"{state:<10} {outcome.source} -> {outcome.output}")
+            for warning in outcome.warnings:
+                print(f"  warning: {warning}")
+        print(
+            f"{len(report['converted'])} converted, {len(report['unchanged'])} unchanged, "
+            f"{len(report['failed'])} failed"
+        )
+    if not sources:
+        print("no supported files found in the inputs", file=sys.stderr)
+        return 1
+    return 1 if report["failed"] else 0
@@ -13,19 +13,55 @@
 from __future__ import annotations
 
 from collections.abc import Sequence
+from dataclasses import dataclass, field
+import os
 from pathlib import Path
-from typing import Any
+import time
+from typing import IO, Any
 
 from docx import Document
 from docx.shared import Pt
 
+from .atomic_io import atomic_output
+from .docx_writer import COMPRESSION_LEVELS, save_document
 from .gfm_renderer import GfmDocxRenderer
+from .http_cache import HttpCache
+from .image_optimizer import ImageOptimizer
+
+# Начиная с этого размера исходник рендерится потоково, кусками
+# (``GfmDocxRenderer.render_file``): иначе в памяти одновременно лежат весь
+# текст, весь список токенов и растущий документ. Для файлов меньше порога
+# разовый разбор быстрее и по памяти ничего не стоит.
+STREAMING_THRESHOLD = 8 * 1024 * 1024
 
 
 class ConversionError(Exception):
     """Конвертация не удалась. Сообщение пригодно для показа без перевода."""
 
 
+@dataclass
+class ConversionResult:
+    """Итог успешной конвертации одного файла.
+
+    Кроме варнингов — всё, что рендер прочитал помимо самого исходника:
+    локальные пути изображений (в том числе не найденные — их появление тоже
+    меняет результат) и скачанные URL. По ним инкрементальная пересборка
+    решает, актуален ли уже записанный результат. ``http_cache_hits`` и
+    ``http_cache_misses`` — сколько из этих URL отдал дисковый кэш после
+    ответа 304 и сколько пришлось скачать целиком (оба ноль без кэша).
+    ``output_bytes`` и ``save_seconds`` — размер записанного файла и время
+    его записи (для docx — упаковки ZIP).
+    """
+
+    warnings: list[str] = field(default_factory=list)
+    local_images: list[Path] = field(default_factory=list)
+    remote_images: list[str] = field(default_factory=list)
+    http_cache_hits: int = 0
+    http_cache_misses: int = 0
+    output_bytes: int = 0
+    save_seconds: float = 0.0
+
+
 class MarkdownToWordConverter:
     """Конвертирует GFM-разметку в документ Word."""
 
@@ -36,23 +72,108 @@ class MarkdownToWordConverter:
         footnotes_heading: str = "Footnotes",
         allow_remote_images: bool = True,
         image_roots: Sequence[Path] | None = None,
+        streaming_threshold: int = STREAMING_THRESHOLD,
+        http_cache_dir: Path | None = None,
+        image_optimizer: ImageOptimizer | None = None,
+        compression: str = "default",
+        reuse_blocks: bool = False,
     ) -> None:
+        if compression not in COMPRESSION_LEVELS:
+            raise ValueError(
+                f"compression must be one of {', '.join(COMPRESSION_LEVELS)}; "
+                f"got {compression!r}"
+            )
         self.default_font_name = font_name
         self.default_font_size = font_size
         self.footnotes_heading = footnotes_heading
         self.allow_remote_images = allow_remote_images
         self.image_roots = image_roots
+        self.streaming_threshold = streaming_threshold
+        # Каталог дискового кэша скачанных изображений (``mdtoword.http_cache``);
+        # None — качать каждый раз заново.
+        self.http_cache_dir = http_cache_dir
+        # Уменьшение и пережатие изображений перед вставкой; None — как есть.
+        self.image_optimizer = image_optimizer
+        # Уровень сжатия ZIP при сохранении (см. ``mdtoword.docx_writer``).
+        self.compression = compression
+        # Переиспользовать отрендеренные блоки, не изменившиеся с прошлой
+        # конвертации в этом процессе (см. ``GfmDocxRenderer.reuse_blocks``):
+        # повторная сборка правленого документа рендерит только правку.
+        self.reuse_blocks = reuse_blocks
 
-    def _render(self, content: str, source_path: Path | None) -> tuple[Any, list[str]]:
+    def renderer(self) -> GfmDocxRenderer:
+        """Новый рендерер с настройками этого конвертера."""
+        return GfmDocxRenderer(
+            self.default_font_name,
+            self.default_font_size,
+            self.footnotes_heading,
+            self.allow_remote_images,
+            self.image_roots,
+            None if self.http_cache_dir is None else HttpCache(self.http_cache_dir),
+            self.image_optimizer,
+            self.reuse_blocks,
+        )
+
+    def _render(
+        self, content: str, source_path: Path | None
+    ) -> tuple[Any, ConversionResult]:
         """Отрендерить Markdown, переведя любой сбой рендеринга в ConversionError."""
+        renderer = self.renderer()
+        try:
+            document, warnings = renderer.render(content, source_path=source_path)
+        except Exception as error:
+            raise ConversionError(str(error)) from error
+        return document, self._result(renderer, warnings)
+
+    @staticmethod
+    def _result(renderer: GfmDocxRenderer, warnings: list[str]) -> ConversionResult:
+        return ConversionResult(
+            warnings,
+            renderer.local_images,
+            renderer.remote_images,
+            renderer.http_cache_hits,
+            renderer.http_cache_misses,
+        )
+
+    def _render_file(self, input_path: str | Path) -> tuple[Any, ConversionResult]:
+        """Отрендерить Markdown-файл, большой — потоково, кусками.
+
+        Сбой чтения и сбой рендеринга одинаково становятся ConversionError.
+        """
+        source_path = Path(input_path)
         try:
-            return GfmDocxRenderer(
-                self.default_font_name,
-                self.default_font_size,
-                self.footnotes_heading,
-                self.allow_remote_images,
-                self.image_roots,
-            ).render(content, source_path=source_path)
+            streamed = source_path.stat().st_size >= self.streaming_threshold
+        except OSError:
+            # Пусть о недоступном файле сообщит _read_source, как и раньше.
+            streamed = False
+        if not streamed:
+            source_path, content = self._read_source(source_path)
+            return self._render(content, source_path)
+        renderer = self.renderer()
+        try:
+            document, warnings = renderer.render_file(source_path)
+        except Exception as error:
+            raise ConversionError(str(error)) from error
+        return document, self._result(renderer, warnings)
+
+    def _save(self, document: Any, output: str | Path | IO[bytes]) -> tuple[int, float]:
+        """Сохранить документ в файл или поток; вернуть размер и время записи.
+
+        Файл пишется во временный рядом и подменяется переименованием:
+        прерванная запись не оставляет на месте результата битый .docx.
+        Поток (открытый файл, ``BytesIO``) пишется с текущей позиции и
+        остаётся открытым.
+        """
+        started = time.perf_counter()
+        try:
+            if isinstance(output, (str, Path)):
+                with atomic_output(Path(output)) as stream:
+                    save_document(document, stream, self.compression)
+                    size = stream.tell()
+                return size, time.perf_counter() - started
+            start = output.tell()
+            save_document(document, output, self.compression)
+            return output.tell() - start, time.perf_counter() - started
         except Exception as error:
             raise ConversionError(str(error)) from error
 
@@ -68,34 +189,50 @@ class MarkdownToWordConverter:
             raise ConversionError(str(error)) from error
 
     def convert_content(
-        self, content: str, output_path: str | Path, source_path: Path | None = None
+        self,
+        content: str,
+        output_path: str | Path | IO[bytes],
+        source_path: Path | None = None,
     ) -> list[str]:
-        """Отрендерить Markdown и сохранить результат в *output_path*."""
-        document, warnings = self._render(content, source_path)
-        try:
-            document.save(str(output_path))
-        except Exception as error:
-            raise ConversionError(str(error)) from error
-        return warnings
+        """Отрендерить Markdown и сохранить результат в *output_path* — путь
+        или двоичный поток."""
+        document, result = self._render(content, source_path)
+        self._save(document, output_path)
+        return result.warnings
 
     def convert_file(
         self, input_path: str | Path, output_path: str | Path
     ) -> list[str]:
-        """Прочитать Markdown-файл и сконвертировать его."""
-        source_path, content = self._read_source(input_path)
-        return self.convert_content(content, output_path, source_path)
+        """Прочитать Markdown-файл и сконвертировать его.
+
+        Файлы от ``streaming_threshold`` байт рендерятся потоково: в памяти
+        держится документ, а не весь исходник со всеми его токенами.
+        """
+        return self.convert(input_path, output_path).warnings
+
+    def convert(
+        self, input_path: str | Path, output_path: str | Path | IO[bytes]
+    ) -> ConversionResult:
+        """То же, что ``convert_file``, но с полным итогом, а не только варнингами.
+
+        *output_path* может быть и двоичным потоком: документ пишется прямо в
+        него, минуя диск.
+        """
+        document, result = self._render_file(input_path)
+        result.output_bytes, result.save_seconds = self._save(document, output_path)
+        return result
 
     def preview_content(
         self, content: str, source_path: Path | None = None
     ) -> list[str]:
         """Отрендерить Markdown в память и вернуть варнинги, ничего не сохраняя."""
-        _, warnings = self._render(content, source_path)
-        return warnings
+        _, result = self._render(content, source_path)
+        return result.warnings
 
     def preview_file(self, input_path: str | Path) -> list[str]:
         """Прочитать Markdown-файл и отрендерить его вхолостую."""
-        source_path, content = self._read_source(input_path)
-        return self.preview_content(content, source_path)
+        _, result = self._render_file(input_path)
+        return result.warnings
 
 
 class WordToMarkdownConverter:
@@ -110,14 +247,27 @@ class WordToMarkdownConverter:
         self, input_path: str | Path, output_path: str | Path
     ) -> list[str]:
         """Сконвертировать документ Word в Markdown-файл."""
+        return self.convert(input_path, output_path).warnings
+
+    def convert(
+        self, input_path: str | Path, output_path: str | Path
+    ) -> ConversionResult:
+        """То же, что ``convert_file``. Внешних зависимостей у docx нет:
+        изображения лежат внутри пакета."""
         try:
             document = Document(str(input_path))
             lines = self._paragraph_lines(document)
             lines.extend(self._table_lines(document))
-            Path(output_path).write_text("\n".join(lines), encoding="utf-8")
+            # Переводы строк — как у write_text: родные для платформы.
+            data = "\n".join(lines).replace("\n", os.linesep).encode("utf-8")
+            started = time.perf_counter()
+            with atomic_output(Path(output_path)) as stream:
+                stream.write(data)
+            elapsed = time.perf_counter() - started
+            written = len(data)
         except Exception as error:
             raise ConversionError(str(error)) from error
-        return []
+        return ConversionResult(output_bytes=written, save_seconds=elapsed)
 
     def _paragraph_lines(self, document: Any) -> list[str]:
         lines: list[str] = []
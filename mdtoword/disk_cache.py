@@ -0,0 +1,47 @@
+"""Eviction shared by the on-disk caches.
+
+Cache directories are shared between threads and between the processes of
+a batch pool, with no lock: a file is only ever written whole (see
+``mdtoword.atomic_io``), and eviction only deletes files a reader treats as
+a miss.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+import os
+from pathlib import Path
+
+
+def evict_least_recently_used(
+    directory: Path,
+    max_bytes: int,
+    suffix: str,
+    companion_suffixes: Iterable[str] = (),
+) -> None:
+    """Delete the oldest *suffix* files until their total fits in *max_bytes*.
+
+    Age is the file's mtime, which readers refresh on every hit. A file's
+    companions -- the same name with another suffix, e.g. its metadata --
+    are deleted along with it but not counted.
+    """
+    entries = []
+    total = 0
+    with os.scandir(directory) as scan:
+        for item in scan:
+            if not item.name.endswith(suffix):
+                continue
+            try:
+                stat = item.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, Path(item.path)))
+            total += stat.st_size
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        for companion in companion_suffixes:
+            path.with_suffix(companion).unlink(missing_ok=True)
+        path.unlink(missing_ok=True)
+        total -= size
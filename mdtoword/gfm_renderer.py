@@ -1,24 +1,45 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
-from io import BytesIO
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import hashlib
+from io import BytesIO, StringIO
 from pathlib import Path
 import re
-from typing import Any, cast
-from urllib.request import urlopen
+from stat import S_ISREG
+import threading
+from typing import Any, NamedTuple, cast
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
 
 from docx import Document
 from docx.document import Document as DocumentType
+from docx.enum.style import WD_STYLE_TYPE
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml import OxmlElement
+from docx.image.image import Image
+from docx.opc.packuri import PackURI
+from docx.oxml import OxmlElement, parse_xml
 from docx.oxml.ns import qn
-from docx.shared import Pt, RGBColor
+from docx.oxml.shape import CT_Inline
+from docx.oxml.table import CT_Tbl
+from docx.parts.image import ImagePart
+from docx.shared import Emu, Pt, RGBColor
 from docx.styles.style import ParagraphStyle
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+from lxml import etree
 from markdown_it import MarkdownIt
+from markdown_it.rules_core import StateCore
+from markdown_it.token import Token
 from mdit_py_plugins.amsmath import amsmath_plugin
 from mdit_py_plugins.dollarmath import dollarmath_plugin
 from mdit_py_plugins.footnote import footnote_plugin
+from mdit_py_plugins.footnote.index import footnote_tail
 
+from .http_cache import HttpCache
+from .image_optimizer import ImageOptimizer
 from .latex_omml import UnsupportedLatexError, latex_to_omml
 
 
@@ -37,6 +58,10 @@ _BLACK = RGBColor(0, 0, 0)
 # regardless of ``allow_remote_images`` -- a large or hostile URL should not be
 # able to exhaust memory just because fetching is permitted.
 _MAX_REMOTE_IMAGE_BYTES = 20 * 1024 * 1024
+# Remote images of one document (or one streamed chunk) are downloaded this
+# many at a time before rendering starts, instead of one by one as each is
+# reached.
+_PREFETCH_WORKERS = 8
 
 # ``latex_omml`` parses these environments itself, so they are passed through
 # with their ``\begin``/``\end`` wrapper intact.
@@ -79,10 +104,248 @@ _HEADING_SCALE: dict[int, tuple[float, bool, bool]] = {
 # A single-dollar fragment with none of these is unlikely to be a real
 # formula: no LaTeX command, no super/subscript, no digit, no operator.
 _MATH_INDICATOR = re.compile(r"[\\^_0-9+\-*/=<>]")
+_HYPERLINK_RELATIONSHIP = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink"
+)
+_IMAGE_RELATIONSHIP = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/image"
+)
+# Where rendered blocks refer outside themselves: hyperlinks and pictures
+# by relationship id, and pictures by drawing id too.
+_RELATIONSHIP_ATTRIBUTES = {qn("w:hyperlink"): qn("r:id"), qn("a:blip"): qn("r:embed")}
+_DRAWING_PROPERTIES = qn("wp:docPr")
+_TABLE_ALIGNMENTS = {
+    "right": WD_ALIGN_PARAGRAPH.RIGHT,
+    "center": WD_ALIGN_PARAGRAPH.CENTER,
+}
 
 
 _THEME_FONT_ATTRS = ("asciiTheme", "hAnsiTheme", "eastAsiaTheme", "cstheme", "csTheme")
 
+# Parsers already built by ``markdown_parser``, one dict per thread keyed by
+# configuration. Per-thread rather than one shared instance: linkify-it keeps
+# the state of its last match on the object itself (``LinkifyIt.test`` sets
+# ``_index``/``_last_index`` that ``match`` then reads), so two threads
+# parsing through one parser could hand each other's links around.
+_thread_parsers = threading.local()
+
+
+def _build_parser(breaks: bool, linkify: bool) -> MarkdownIt:
+    parser = MarkdownIt(
+        "js-default", {"breaks": breaks, "html": False, "linkify": linkify}
+    )
+    if linkify:
+        parser.enable("linkify")
+    return (
+        parser.use(footnote_plugin)
+        .use(dollarmath_plugin, allow_digits=False, allow_blank_lines=False)
+        .use(amsmath_plugin)
+    )
+
+
+def markdown_parser(*, breaks: bool = True, linkify: bool = True) -> MarkdownIt:
+    """Return the calling thread's parser for this configuration.
+
+    Building a ``MarkdownIt`` compiles every rule chain and registers the
+    footnote and math plugins, which costs more than parsing a short
+    document. The parser itself holds no per-document state -- ``parse``
+    starts from a fresh state and ``env`` on every call -- so one instance
+    per thread and configuration is built on first use and reused for every
+    render after that.
+    """
+    parsers: dict[tuple[bool, bool], MarkdownIt] | None = getattr(
+        _thread_parsers, "parsers", None
+    )
+    if parsers is None:
+        parsers = _thread_parsers.parsers = {}
+    key = (breaks, linkify)
+    parser = parsers.get(key)
+    if parser is None:
+        parser = parsers[key] = _build_parser(breaks, linkify)
+    return parser
+
+
+def _keep_footnote_ids(state: StateCore) -> None:
+    """Give labels numbered in earlier chunks their number back.
+
+    The footnote plugin resets a label to "unnumbered" whenever it parses
+    the label's definition. Parsing a whole document, every definition is
+    seen before any reference is numbered; parsing chunk by chunk, a
+    definition in a later chunk would otherwise renumber a footnote that an
+    earlier chunk already referenced.
+    """
+    footnotes = state.env.get("footnotes")
+    if not footnotes:
+        return
+    for footnote_id, footnote in footnotes.get("list", {}).items():
+        if "label" in footnote:
+            footnotes["refs"][":" + footnote["label"]] = footnote_id
+
+
+def _streaming_parser() -> MarkdownIt:
+    """Return the calling thread's parser for ``GfmDocxRenderer.render_file``.
+
+    Same rules as ``markdown_parser()``, except that footnotes are numbered
+    across chunks and their list is left to the caller, to be emitted once
+    after the last chunk rather than after every one.
+    """
+    parser: MarkdownIt | None = getattr(_thread_parsers, "streaming", None)
+    if parser is None:
+        parser = _build_parser(breaks=True, linkify=True)
+        parser.disable("footnote_tail")
+        parser.core.ruler.after("block", "footnote_ids", _keep_footnote_ids)
+        _thread_parsers.streaming = parser
+    return parser
+
+
+# Source characters ``render_file`` parses at a time. Tokens take several
+# times the memory of their source, so this caps the parser's share of peak
+# memory at a few megabytes whatever the size of the file.
+_STREAM_CHUNK_CHARS = 1 << 18
+_FENCE_OPEN = re.compile(r" {0,3}(`{3,}|~{3,})")
+_MATH_FENCE = re.compile(r" {0,3}\$\$")
+_ENVIRONMENT_OPEN = re.compile(r" {0,3}\\begin\{([A-Za-z]+\*?)\}")
+# A line after a blank line that may still belong to the block above it:
+# indented content (list item bodies, footnote bodies, indented code) or the
+# next item of the same list.
+_CONTINUATION = re.compile(r"[ \t]|[-+*](?:[ \t]|$)|\d{1,9}[.)](?:[ \t]|$)")
+
+
+def split_markdown(
+    lines: Iterable[str], chunk_chars: int = _STREAM_CHUNK_CHARS
+) -> Iterator[str]:
+    """Group Markdown source lines into chunks that parse alike apart and together.
+
+    A chunk only ends after a blank line outside any fenced code, ``$$`` or
+    ``\\begin``/``\\end`` block, and only if the next line opens a new
+    top-level block: neither indented nor a list marker that could continue
+    the list above. Anything unsure keeps the chunk going, so a chunk grows
+    past *chunk_chars* until such a boundary comes -- one huge code block is
+    one huge chunk. Link reference definitions and footnotes do cross
+    chunks; ``GfmDocxRenderer.render_file`` carries those itself.
+    """
+    chunk: list[str] = []
+    size = 0
+    fence: str | None = None
+    closing: str | None = None
+    boundary = False
+    for line in lines:
+        if (
+            boundary
+            and size >= chunk_chars
+            and line.strip()
+            and not _CONTINUATION.match(line)
+        ):
+            yield "".join(chunk)
+            chunk = []
+            size = 0
+        boundary = False
+        chunk.append(line)
+        size += len(line)
+        if fence is not None:
+            match = _FENCE_OPEN.match(line)
+            if (
+                match
+                and match.group(1)[0] == fence[0]
+                and len(match.group(1)) >= len(fence)
+                and not line[match.end():].strip()
+            ):
+                fence = None
+        elif closing is not None:
+            if closing in line:
+                closing = None
+        elif match := _FENCE_OPEN.match(line):
+            # A backtick fence's info string cannot hold a backtick; such a
+            # line is inline code, not a fence.
+            if not (match.group(1)[0] == "`" and "`" in line[match.end():]):
+                fence = match.group(1)
+        elif _MATH_FENCE.match(line):
+            if line.count("$$") % 2:
+                closing = "$$"
+        elif match := _ENVIRONMENT_OPEN.match(line):
+            end = f"\\end{{{match.group(1)}}}"
+            if end not in line[match.end():]:
+                closing = end
+        else:
+            boundary = not line.strip()
+    if chunk:
+        yield "".join(chunk)
+
+
+def _hold_footnote_definitions(tokens: list[Token], held: list[Token]) -> Iterator[Token]:
+    """Yield *tokens* except footnote definitions, which go to *held*.
+
+    The same cut ``footnote_tail`` makes: a definition's body is rendered
+    in the footnote list at the end, not where it was written.
+    """
+    inside = False
+    for token in tokens:
+        if token.type == "footnote_reference_open":
+            inside = True
+        if inside:
+            held.append(token)
+        else:
+            yield token
+        if token.type == "footnote_reference_close":
+            inside = False
+
+
+def chunk_definitions(chunk: str) -> tuple[dict[str, Any], list[str]]:
+    """Link reference definitions and footnote labels defined in *chunk*.
+
+    What ``render_file``'s first pass collects, for one chunk; merged over
+    every chunk, it is the *env* ``GfmDocxRenderer.preview_chunks`` needs.
+    """
+    parser = _streaming_parser()
+    env: dict[str, Any] = {}
+    parser.block.parse(chunk, parser, env, [])
+    labels = [key[1:] for key in env.get("footnotes", {}).get("refs", {})]
+    return env.get("references", {}), labels
+
+
+def merge_definitions(
+    definitions: Iterable[tuple[dict[str, Any], list[str]]],
+) -> dict[str, Any]:
+    """The *env* of a whole document, from ``chunk_definitions`` of each chunk in order."""
+    references: dict[str, Any] = {}
+    labels: dict[str, int] = {}
+    for chunk_references, chunk_labels in definitions:
+        for label, reference in chunk_references.items():
+            # The first definition of a label wins, as in one whole parse.
+            references.setdefault(label, reference)
+        labels.update((":" + label, -1) for label in chunk_labels)
+    return {"references": references, "footnotes": {"refs": labels}}
+
+
+def _footnote_bodies(held: list[Token]) -> Iterator[tuple[str, list[Token]]]:
+    """Split definitions held back by ``_hold_footnote_definitions`` by label."""
+    label = ""
+    body: list[Token] = []
+    for token in held:
+        if token.type == "footnote_reference_open":
+            label, body = token.meta["label"], []
+        elif token.type == "footnote_reference_close":
+            yield label, body
+        else:
+            body.append(token)
+
+
+def _headings(tokens: list[Token]) -> list[tuple[int, str]]:
+    """The level and text of every heading in *tokens*."""
+    return [
+        (int(token.tag[1:]), following.content)
+        for token, following in zip(tokens, tokens[1:])
+        if token.type == "heading_open"
+    ]
+
+
+# Configured base documents, per thread like the parsers above: deep-copying
+# one lxml tree from several threads at once is not something lxml promises
+# to survive. A handful per thread covers a batch (one font) and the GUI
+# (whatever the user last picked) without keeping every font ever tried.
+_thread_templates = threading.local()
+_TEMPLATES_PER_THREAD = 4
+
 
 def _set_style_font(style: ParagraphStyle, font_name: str) -> None:
     """Set a style's font and clear any theme attributes overriding it.
@@ -132,6 +395,304 @@ def _is_remote_target(target: str) -> bool:
     return lowered.startswith(("http://", "https://")) or target.startswith(("//", "\\\\"))
 
 
+class ImageCacheInfo(NamedTuple):
+    """Counters of the process-wide local image cache."""
+
+    hits: int
+    misses: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+
+class ChunkPreview(NamedTuple):
+    """What rendering one chunk found; see ``GfmDocxRenderer.preview_chunks``.
+
+    ``footnotes`` lists the labels of the footnotes the chunk references,
+    in the order they are numbered. ``definitions`` holds the warnings of the
+    footnote bodies the chunk defines, by label, to be emitted where the
+    footnote list renders them: after the last chunk.
+    """
+
+    warnings: list[str]
+    headings: list[tuple[int, str]]
+    footnotes: list[str]
+    definitions: dict[str, list[str]]
+
+
+# Budget for decoded local images kept across renders. A batch tends to
+# repeat a handful of logos and diagrams in every file; anything that does
+# not fit is simply read again next time.
+_IMAGE_CACHE_BYTES = 64 * 1024 * 1024
+_image_cache: OrderedDict[tuple[str, int, int], Image] = OrderedDict()
+_image_cache_bytes = 0
+_image_cache_hits = 0
+_image_cache_misses = 0
+_image_cache_lock = threading.Lock()
+
+
+def _fetch_remote_image(url: str, cache: HttpCache | None) -> tuple[bytes, bool]:
+    """Download *url*, reading at most one byte past the size cap.
+
+    Returns the body and whether it came from *cache*. With a cached copy
+    the request is conditional, and a ``304 Not Modified`` serves the copy;
+    any full response replaces it.
+    """
+    cached = cache.lookup(url) if cache is not None else None
+    request: str | Request = url
+    if cached is not None:
+        request = Request(url, headers=cached.validators())
+    try:
+        with urlopen(request, timeout=10) as response:
+            body = response.read(_MAX_REMOTE_IMAGE_BYTES + 1)
+            headers = response.headers
+    except HTTPError as error:
+        if error.code != 304 or cached is None:
+            raise
+        body = cache.read(cached)
+        if body is not None:
+            return body, True
+        # Evicted since the lookup: fetch it again, unconditionally.
+        return _fetch_remote_image(url, None)[0], False
+    if cache is not None and len(body) <= _MAX_REMOTE_IMAGE_BYTES:
+        cache.store(url, body, headers)
+    return body, False
+
+
+def _remote_image_targets(tokens: Iterable[Token]) -> list[str]:
+    """Every distinct ``http(s)`` image target in *tokens*, in document order."""
+    targets: dict[str, None] = {}
+    for token in tokens:
+        for child in token.children or ():
+            if child.type == "image":
+                target = child.attrGet("src") or ""
+                if target.lower().startswith(("http://", "https://")):
+                    targets[target] = None
+    return list(targets)
+
+
+def _local_image(path: Path) -> Image:
+    """Read and sniff the image at *path*, or reuse an earlier read of it.
+
+    ``Run.add_picture`` reads the file and parses its header for format,
+    pixel size and DPI on every call, so a logo repeated through a document
+    -- or through every document of a batch -- is read that many times.
+    Here the parsed ``Image`` is kept per resolved path, size and mtime: a
+    repeat costs one ``stat``, and a file changed on disk is simply a new
+    key. ``Image`` is never mutated once built, so documents can share it.
+    """
+    global _image_cache_bytes, _image_cache_hits, _image_cache_misses
+    try:
+        stat = path.stat()
+    except OSError:
+        raise FileNotFoundError(path) from None
+    if not S_ISREG(stat.st_mode):
+        raise FileNotFoundError(path)
+    key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    with _image_cache_lock:
+        image = _image_cache.get(key)
+        if image is not None:
+            _image_cache.move_to_end(key)
+            _image_cache_hits += 1
+            return image
+        _image_cache_misses += 1
+
+    image = Image.from_file(str(path))
+    size = len(image.blob)
+    if size <= _IMAGE_CACHE_BYTES:
+        with _image_cache_lock:
+            if key not in _image_cache:
+                _image_cache[key] = image
+                _image_cache_bytes += size
+                while _image_cache_bytes > _IMAGE_CACHE_BYTES:
+                    _, evicted = _image_cache.popitem(last=False)
+                    _image_cache_bytes -= len(evicted.blob)
+    return image
+
+
+def image_cache_info() -> ImageCacheInfo:
+    """Hit/miss counters and fill level of the local image cache."""
+    with _image_cache_lock:
+        return ImageCacheInfo(
+            _image_cache_hits,
+            _image_cache_misses,
+            len(_image_cache),
+            _image_cache_bytes,
+            _IMAGE_CACHE_BYTES,
+        )
+
+
+def clear_image_cache() -> None:
+    """Drop every cached image and reset the counters."""
+    global _image_cache_bytes, _image_cache_hits, _image_cache_misses
+    with _image_cache_lock:
+        _image_cache.clear()
+        _image_cache_bytes = _image_cache_hits = _image_cache_misses = 0
+
+
+class BlockCacheInfo(NamedTuple):
+    """Counters of the process-wide rendered block cache."""
+
+    hits: int
+    misses: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+
+class _RenderedBlock(NamedTuple):
+    """One top-level block as ``GfmDocxRenderer`` rendered it, ready to replay.
+
+    ``xml`` holds the serialized body elements, with the relationship ids
+    of the document they were rendered into; ``relationships`` maps each of
+    those ids to its hyperlink target or image, to be related afresh in the
+    next document. ``local_images`` pairs every image path looked up with
+    its ``stat`` signature then (None if it was missing): if any of them
+    has changed, the block is rendered again. ``footnotes`` counts the
+    references to each footnote label, in the order they were numbered, and
+    ``definitions`` holds the footnote bodies for the list at the end.
+    """
+
+    xml: list[bytes]
+    warnings: list[str]
+    local_images: list[tuple[Path, tuple[int, int] | None]]
+    relationships: dict[str, str | Image]
+    footnotes: list[tuple[str, int]]
+    definitions: list[Token]
+    size: int
+
+
+# Budget for rendered blocks kept across renders. Re-rendering one edited
+# block of a long document reuses every other block's XML from here.
+_BLOCK_CACHE_BYTES = 64 * 1024 * 1024
+_block_cache: OrderedDict[bytes, _RenderedBlock] = OrderedDict()
+_block_cache_bytes = 0
+_block_cache_hits = 0
+_block_cache_misses = 0
+# ``chunk_definitions`` of each block, by the block's digest: the first pass
+# over a document is a block-level parse of every block otherwise.
+_BLOCK_DEFINITIONS_ENTRIES = 1 << 16
+_block_definitions: OrderedDict[bytes, tuple[dict[str, Any], list[str]]] = OrderedDict()
+_block_cache_lock = threading.Lock()
+
+
+def _file_signature(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _cached_definitions(digest: bytes, chunk: str) -> tuple[dict[str, Any], list[str]]:
+    with _block_cache_lock:
+        definitions = _block_definitions.get(digest)
+        if definitions is not None:
+            _block_definitions.move_to_end(digest)
+            return definitions
+    definitions = chunk_definitions(chunk)
+    with _block_cache_lock:
+        _block_definitions[digest] = definitions
+        if len(_block_definitions) > _BLOCK_DEFINITIONS_ENTRIES:
+            _block_definitions.popitem(last=False)
+    return definitions
+
+
+def _cached_block(key: bytes) -> _RenderedBlock | None:
+    """The block stored under *key*, if every image it read is unchanged."""
+    global _block_cache_hits, _block_cache_misses
+    with _block_cache_lock:
+        block = _block_cache.get(key)
+        if block is not None:
+            _block_cache.move_to_end(key)
+    if block is not None and all(
+        _file_signature(path) == signature for path, signature in block.local_images
+    ):
+        with _block_cache_lock:
+            _block_cache_hits += 1
+        return block
+    with _block_cache_lock:
+        _block_cache_misses += 1
+    return None
+
+
+def _store_block(key: bytes, block: _RenderedBlock) -> None:
+    global _block_cache_bytes
+    if block.size > _BLOCK_CACHE_BYTES:
+        return
+    with _block_cache_lock:
+        replaced = _block_cache.pop(key, None)
+        if replaced is not None:
+            _block_cache_bytes -= replaced.size
+        _block_cache[key] = block
+        _block_cache_bytes += block.size
+        while _block_cache_bytes > _BLOCK_CACHE_BYTES:
+            _, evicted = _block_cache.popitem(last=False)
+            _block_cache_bytes -= evicted.size
+
+
+def block_cache_info() -> BlockCacheInfo:
+    """Hit/miss counters and fill level of the rendered block cache."""
+    with _block_cache_lock:
+        return BlockCacheInfo(
+            _block_cache_hits,
+            _block_cache_misses,
+            len(_block_cache),
+            _block_cache_bytes,
+            _BLOCK_CACHE_BYTES,
+        )
+
+
+def clear_block_cache() -> None:
+    """Drop every rendered block and reset the counters."""
+    global _block_cache_bytes, _block_cache_hits, _block_cache_misses
+    with _block_cache_lock:
+        _block_cache.clear()
+        _block_definitions.clear()
+        _block_cache_bytes = _block_cache_hits = _block_cache_misses = 0
+
+
+def _table_cell(width: str, alignment: Any, bold: bool) -> Any:
+    """Build a ``w:tc`` prototype: fixed width, one paragraph, one empty run.
+
+    ``alignment`` of ``None`` builds the bare cell of a short row instead:
+    an empty paragraph with no run and no justification.
+    """
+    cell = OxmlElement("w:tc")
+    properties = OxmlElement("w:tcPr")
+    cell_width = OxmlElement("w:tcW")
+    cell_width.set(qn("w:type"), "dxa")
+    cell_width.set(qn("w:w"), width)
+    properties.append(cell_width)
+    cell.append(properties)
+    paragraph = OxmlElement("w:p")
+    cell.append(paragraph)
+    if alignment is None:
+        return cell
+    run = paragraph.add_r()
+    if bold:
+        run.get_or_add_rPr()._set_bool_val("b", True)
+    paragraph.alignment = alignment
+    return cell
+
+
+def _set_run_text(run: Any, text: str) -> None:
+    """Append *text* to an empty ``w:r``, the way ``Run.text`` would.
+
+    Plain text goes into a single ``w:t`` directly; anything with a tab or a
+    line break takes python-docx's own setter, which splits it into
+    ``w:tab``/``w:br`` elements.
+    """
+    if "\t" in text or "\n" in text or "\r" in text:
+        run.text = text
+        return
+    element = OxmlElement("w:t")
+    element.text = text
+    if len(text.strip()) < len(text):
+        element.set(qn("xml:space"), "preserve")
+    run.append(element)
+
+
 class GfmDocxRenderer:
     """Render a GFM token stream into a Word document."""
 
@@ -142,12 +703,20 @@ class GfmDocxRenderer:
         footnotes_heading: str = "Footnotes",
         allow_remote_images: bool = True,
         image_roots: Sequence[Path] | None = None,
+        http_cache: HttpCache | None = None,
+        image_optimizer: ImageOptimizer | None = None,
+        reuse_blocks: bool = False,
     ):
         self.font_name = font_name
         self.font_size = font_size
         self.footnotes_heading = footnotes_heading
         self.allow_remote_images = allow_remote_images
         self.image_roots = image_roots
+        self.http_cache = http_cache
+        self.image_optimizer = image_optimizer
+        # Render block by block through the process-wide block cache; see
+        # ``_render_reusing_blocks``.
+        self.reuse_blocks = reuse_blocks
         # Resolved once here rather than per image: __init__ runs once per
         # render, while _append_image runs once per image in the document.
         # None means unrestricted (the GUI's default -- see app.py, which
@@ -157,6 +726,15 @@ class GfmDocxRenderer:
         )
         self.document: DocumentType
         self.warnings: list[str]
+        # What the last render read besides its Markdown: every local image
+        # path it looked up (present or not) and every URL it fetched. A
+        # caller deciding whether an old output is still current needs both.
+        self.local_images: list[Path]
+        self.remote_images: list[str]
+        # Of those URLs, how many ``http_cache`` answered after a 304 and how
+        # many had to be downloaded in full.
+        self.http_cache_hits: int
+        self.http_cache_misses: int
         self._paragraph: Any
         self._list_stack: list[str]
         self._quote_depth: int
@@ -167,12 +745,345 @@ class GfmDocxRenderer:
         self._table_header: bool
         self._footnote_depth: int
         self._heading_level: int | None
+        self._body_end: Any
+        self._style_ids: dict[str, str | None]
+        self._hyperlink_ids: dict[str, str]
+        self._image_ids: dict[str, str]
+        self._images: dict[str, Image]
+        # Every relationship id handed out, repeats included, in order: what
+        # a rendered block records to be related again when it is replayed.
+        self._relationships_used: list[str]
+        self._downloads: dict[str, bytes | Exception]
+        self._fetched_images: dict[str, Image]
+        self._next_relationship: int
+        self._next_shape_id: int | None
+        self._column_width: int | None
 
     def render(
         self, markdown: str, source_path: Path | None = None
     ) -> tuple[DocumentType, list[str]]:
-        self.document = Document()
+        if self.reuse_blocks:
+            return self._render_reusing_blocks(
+                lambda: split_markdown(StringIO(markdown), 0), source_path
+            )
+        self._start_document()
+        tokens = markdown_parser().parse(markdown)
+        self._prefetch_remote_images(tokens)
+        for token in tokens:
+            self._render_block(token, source_path)
+
+        return self.document, self.warnings
+
+    def render_file(
+        self, path: Path, chunk_chars: int = _STREAM_CHUNK_CHARS
+    ) -> tuple[DocumentType, list[str]]:
+        """Render a Markdown file without holding its source or tokens whole.
+
+        The result is what ``render(path.read_text(), source_path=path)``
+        gives, but the file is parsed and rendered a chunk at a time (see
+        ``split_markdown``), so peak memory follows the document being built
+        rather than the source plus its token list. The file is read twice:
+        a block-level pass first collects link reference definitions and
+        footnote labels, since Markdown lets a chunk use them before the
+        chunk that defines them. Footnote bodies are held back and listed
+        after the last chunk, as the footnote plugin would.
+
+        With ``reuse_blocks`` the chunks are single blocks, whatever
+        *chunk_chars* says.
+        """
+        if self.reuse_blocks:
+
+            def blocks() -> Iterator[str]:
+                with path.open(encoding="utf-8") as source:
+                    yield from split_markdown(source, 0)
+
+            return self._render_reusing_blocks(blocks, path)
+        parser = _streaming_parser()
+        env: dict[str, Any] = {}
+        with path.open(encoding="utf-8") as source:
+            for chunk in split_markdown(source, chunk_chars):
+                parser.block.parse(chunk, parser, env, [])
+
+        self._start_document()
+        definitions: list[Token] = []
+        with path.open(encoding="utf-8") as source:
+            for chunk in split_markdown(source, chunk_chars):
+                tokens = parser.parse(chunk, env)
+                self._prefetch_remote_images(tokens)
+                for token in _hold_footnote_definitions(tokens, definitions):
+                    self._render_block(token, path)
+        tail = StateCore("", parser, env, definitions)
+        footnote_tail(tail)
+        for token in tail.tokens:
+            self._render_block(token, path)
+
+        return self.document, self.warnings
+
+    def preview_chunks(
+        self,
+        chunks: Iterable[str],
+        env: dict[str, Any],
+        source_path: Path | None = None,
+        cancelled: Callable[[], bool] | None = None,
+    ) -> list[ChunkPreview]:
+        """Render *chunks* of a ``split_markdown`` document one by one, for their warnings.
+
+        *env* must already know every link reference definition and
+        footnote label in the document, as ``render_file``'s first pass
+        would; each chunk is parsed with its own copy of it. Rendering a
+        chunk does not depend on any other, so a caller can keep the result
+        for a chunk that has not changed and render only those that have.
+        *cancelled* is polled between chunks; once it says stop, only the
+        chunks rendered so far are returned.
+        """
+        parser = _streaming_parser()
+        self._start_document()
+        previews = []
+        for chunk in chunks:
+            if cancelled is not None and cancelled():
+                break
+            chunk_env = {
+                "references": dict(env.get("references", {})),
+                "footnotes": {
+                    "refs": dict(env.get("footnotes", {}).get("refs", {})),
+                    "list": {},
+                },
+            }
+            tokens = parser.parse(chunk, chunk_env)
+            self._prefetch_remote_images(tokens)
+            start = len(self.warnings)
+            held: list[Token] = []
+            body = list(_hold_footnote_definitions(tokens, held))
+            for token in body:
+                self._render_block(token, source_path)
+            warnings = self.warnings[start:]
+
+            definitions: dict[str, list[str]] = {}
+            for label, definition in _footnote_bodies(held):
+                start = len(self.warnings)
+                self._render_footnote(label, definition, source_path)
+                definitions[label] = self.warnings[start:]
+            footnotes = [
+                footnote["label"] for footnote in chunk_env["footnotes"]["list"].values()
+            ]
+            previews.append(ChunkPreview(warnings, _headings(body), footnotes, definitions))
+        return previews
+
+    def _render_footnote(
+        self, label: str, body: list[Token], source_path: Path | None
+    ) -> None:
+        """Render one footnote's body as the footnote list at the end would."""
+        opening = Token("footnote_open", "", 1)
+        opening.meta = {"label": label}
+        self._footnote_depth += 1
+        for token in (opening, *body, Token("footnote_close", "", -1)):
+            self._render_block(token, source_path)
+        self._footnote_depth -= 1
+
+    def _render_reusing_blocks(
+        self, blocks: Callable[[], Iterable[str]], source_path: Path | None
+    ) -> tuple[DocumentType, list[str]]:
+        """Render the document *blocks* yields, reusing blocks rendered before.
+
+        *blocks* is called twice, for the same ``split_markdown(..., 0)``
+        blocks each time: the first pass gathers every definition, as in
+        ``render_file``. Each block is then looked up in the process-wide
+        block cache by the SHA-256 of its source, of the document's
+        definitions, of *source_path* and of the options that shape its
+        output; a hit is replayed instead of rendered -- its XML parsed
+        back and its hyperlinks and images related to this document. So an
+        edit to one block of a long document renders that block alone,
+        plus the footnote list, which is always rendered afresh. A block
+        that fetched a remote image is not kept: the URL may serve
+        something else next time. Where remote images are allowed, every
+        block that missed the cache is parsed before any is rendered, so
+        their images download together rather than one block at a time.
+        """
+        parser = _streaming_parser()
+        digests: list[bytes] = []
+        definitions = []
+        for chunk in blocks():
+            digest = hashlib.sha256(chunk.encode("utf-8")).digest()
+            digests.append(digest)
+            definitions.append(_cached_definitions(digest, chunk))
+        env = merge_definitions(definitions)
+        document_key = hashlib.sha256(
+            repr(
+                (
+                    self.font_name,
+                    int(self.font_size),
+                    self.allow_remote_images,
+                    self._resolved_image_roots,
+                    self.image_optimizer,
+                    None if source_path is None else str(source_path),
+                    sorted(
+                        (label, reference["href"], reference["title"])
+                        for label, reference in env["references"].items()
+                    ),
+                    sorted(env["footnotes"]["refs"]),
+                )
+            ).encode("utf-8")
+        ).digest()
+
+        self._start_document()
+        footnotes: dict[str, int] = {}
+        held: list[Token] = []
+        # Blocks looked up but not yet rendered: a hit, or a miss's parse.
+        pending: list[tuple[bytes, _RenderedBlock | None, list[Token], dict[str, Any]]] = []
+
+        def flush() -> None:
+            self._prefetch_remote_images(
+                [token for _, block, tokens, _ in pending if block is None for token in tokens]
+            )
+            for key, block, tokens, chunk_env in pending:
+                if block is None:
+                    block, reusable = self._render_new_block(tokens, chunk_env, source_path)
+                    if reusable:
+                        _store_block(key, block)
+                else:
+                    self._replay_block(block)
+                for label, count in block.footnotes:
+                    footnotes[label] = footnotes.get(label, 0) + count
+                held.extend(block.definitions)
+            pending.clear()
+
+        for chunk, digest in zip(blocks(), digests):
+            key = hashlib.sha256(document_key + digest).digest()
+            block = _cached_block(key)
+            tokens: list[Token] = []
+            chunk_env: dict[str, Any] = {}
+            if block is None:
+                chunk_env = {
+                    "references": dict(env["references"]),
+                    "footnotes": {"refs": dict(env["footnotes"]["refs"]), "list": {}},
+                }
+                tokens = parser.parse(chunk, chunk_env)
+            pending.append((key, block, tokens, chunk_env))
+            if not self.allow_remote_images:
+                # Nothing to download: render as we go, holding no tokens.
+                flush()
+        flush()
+
+        if footnotes:
+            numbers = {label: number for number, label in enumerate(footnotes)}
+            tail_env = {
+                "references": env["references"],
+                "footnotes": {
+                    "refs": {":" + label: number for label, number in numbers.items()},
+                    "list": {
+                        number: {"label": label, "count": footnotes[label]}
+                        for label, number in numbers.items()
+                    },
+                },
+            }
+            # Copies: rendering a task list item trims its tokens in place.
+            tail = StateCore("", parser, tail_env, copy.deepcopy(held))
+            footnote_tail(tail)
+            for token in tail.tokens:
+                self._render_block(token, source_path)
+
+        return self.document, self.warnings
+
+    def _render_new_block(
+        self, tokens: list[Token], chunk_env: dict[str, Any], source_path: Path | None
+    ) -> tuple[_RenderedBlock, bool]:
+        """Render a block from its *tokens* and record it, and whether it may be kept."""
+        warnings_start = len(self.warnings)
+        images_start = len(self.local_images)
+        relationships_start = len(self._relationships_used)
+        previous = self._body_end.getprevious()
+        definitions: list[Token] = []
+        for token in _hold_footnote_definitions(tokens, definitions):
+            self._render_block(token, source_path)
+        footnotes = [
+            (footnote["label"], footnote.get("count", 0))
+            for footnote in chunk_env["footnotes"]["list"].values()
+        ]
+        if self.allow_remote_images and _remote_image_targets(tokens):
+            # Footnote bodies still have to reach the list at the end.
+            return _RenderedBlock([], [], [], {}, footnotes, definitions, 0), False
+
+        elements = []
+        element = self._body_end.getprevious()
+        while element is not previous:
+            elements.append(element)
+            element = element.getprevious()
+        xml = [etree.tostring(element) for element in reversed(elements)]
+        relationships: dict[str, str | Image] = {}
+        for relationship_id in self._relationships_used[relationships_start:]:
+            image = self._images.get(relationship_id)
+            relationships[relationship_id] = (
+                self.document.part.rels[relationship_id].target_ref
+                if image is None
+                else image
+            )
+        local_images = [
+            (path, _file_signature(path)) for path in self.local_images[images_start:]
+        ]
+        size = sum(map(len, xml)) + sum(
+            len(target.blob) for target in relationships.values() if isinstance(target, Image)
+        )
+        block = _RenderedBlock(
+            xml,
+            self.warnings[warnings_start:],
+            local_images,
+            relationships,
+            footnotes,
+            definitions,
+            size,
+        )
+        return block, True
+
+    def _replay_block(self, block: _RenderedBlock) -> None:
+        """Append a block rendered into an earlier document to this one."""
+        self.warnings.extend(block.warnings)
+        self.local_images.extend(path for path, _ in block.local_images)
+        for xml in block.xml:
+            element = parse_xml(xml)
+            if block.relationships:
+                self._relate_again(element, block.relationships)
+            self._append_block(element)
+
+    def _relate_again(self, element: Any, relationships: dict[str, str | Image]) -> None:
+        """Point *element*'s hyperlinks and pictures at this document's parts.
+
+        Relationship and drawing ids are handed out in document order, just
+        as rendering the block here would have, so a replayed block comes
+        out identical to a freshly rendered one.
+        """
+        for node in element.iter(_DRAWING_PROPERTIES, *_RELATIONSHIP_ATTRIBUTES):
+            if node.tag == _DRAWING_PROPERTIES:
+                shape_id = self._shape_id()
+                node.set("id", str(shape_id))
+                node.set("name", f"Picture {shape_id}")
+                continue
+            attribute = _RELATIONSHIP_ATTRIBUTES[node.tag]
+            target = relationships[node.get(attribute)]
+            node.set(
+                attribute,
+                self._hyperlink_relationship(target)
+                if isinstance(target, str)
+                else self._image_relationship(target),
+            )
+
+    def _start_document(self) -> None:
+        self.document = self._new_document()
         self.warnings = []
+        self.local_images = []
+        self.remote_images = []
+        self.http_cache_hits = 0
+        self.http_cache_misses = 0
+        self._body_end = self.document.element.body.get_or_add_sectPr()
+        self._style_ids = {}
+        self._hyperlink_ids = {}
+        self._image_ids = {}
+        self._images = {}
+        self._relationships_used = []
+        self._downloads = {}
+        self._fetched_images = {}
+        self._next_relationship = 1
+        self._next_shape_id = None
+        self._column_width = None
         self._paragraph = None
         self._list_stack = []
         self._quote_depth = 0
@@ -183,28 +1094,42 @@ class GfmDocxRenderer:
         self._table_alignments = []
         self._footnote_depth = 0
         self._heading_level = None
-        self._configure_document()
-
-        parser = (
-            MarkdownIt("js-default", {"breaks": True, "html": False, "linkify": True})
-            .enable("linkify")
-            .use(footnote_plugin)
-            .use(dollarmath_plugin, allow_digits=False, allow_blank_lines=False)
-            .use(amsmath_plugin)
-        )
-        for token in parser.parse(markdown):
-            self._render_block(token, source_path)
 
-        return self.document, self.warnings
+    def _new_document(self) -> DocumentType:
+        """Return a fresh, already-styled document for this font and size.
 
-    def _configure_document(self) -> None:
-        style = cast(ParagraphStyle, self.document.styles["Normal"])
+        ``Document()`` unzips and parses python-docx's default template, and
+        ``_configure_document`` then rewrites a dozen styles; for a one-page
+        note that fixed cost outweighs the rendering itself. Both are done
+        once per (font, size) per thread, and every render gets a deep copy
+        of that configured template instead -- roughly a third of the cost,
+        most of what is left being the copy of the template's styles part.
+        """
+        templates: OrderedDict[tuple[str, int], DocumentType] | None = getattr(
+            _thread_templates, "templates", None
+        )
+        if templates is None:
+            templates = _thread_templates.templates = OrderedDict()
+        key = (self.font_name, int(self.font_size))
+        template = templates.get(key)
+        if template is None:
+            template = Document()
+            self._configure_document(template)
+            templates[key] = template
+            if len(templates) > _TEMPLATES_PER_THREAD:
+                templates.popitem(last=False)
+        else:
+            templates.move_to_end(key)
+        return copy.deepcopy(template)
+
+    def _configure_document(self, document: DocumentType) -> None:
+        style = cast(ParagraphStyle, document.styles["Normal"])
         _set_style_font(style, self.font_name)
         style.font.size = self.font_size
         style.font.color.rgb = _BLACK
         for level in range(1, 10):
             try:
-                heading = cast(ParagraphStyle, self.document.styles[f"Heading {level}"])
+                heading = cast(ParagraphStyle, document.styles[f"Heading {level}"])
             except KeyError:
                 continue
             heading.font.color.rgb = _BLACK
@@ -216,7 +1141,7 @@ class GfmDocxRenderer:
                 heading.font.bold = bold
                 heading.font.italic = italic
         try:
-            quote = cast(ParagraphStyle, self.document.styles["Quote"])
+            quote = cast(ParagraphStyle, document.styles["Quote"])
         except KeyError:
             pass
         else:
@@ -229,7 +1154,7 @@ class GfmDocxRenderer:
         # only thing standing between a list item and the wrong font.
         for list_style_name in ("List Bullet", "List Number"):
             try:
-                list_style = cast(ParagraphStyle, self.document.styles[list_style_name])
+                list_style = cast(ParagraphStyle, document.styles[list_style_name])
             except KeyError:
                 continue
             _set_style_font(list_style, self.font_name)
@@ -240,7 +1165,7 @@ class GfmDocxRenderer:
         if token_type == "heading_open":
             level = min(int(token.tag[1:]), 9)
             self._heading_level = level
-            self._paragraph = self.document.add_paragraph(style=f"Heading {level}")
+            self._paragraph = self._add_paragraph(f"Heading {level}")
             return
         if token_type == "paragraph_open":
             self._paragraph = self._new_paragraph()
@@ -323,7 +1248,7 @@ class GfmDocxRenderer:
             self._finish_table()
             return
         if token_type == "footnote_block_open":
-            self.document.add_heading(self.footnotes_heading, level=2)
+            self._add_paragraph("Heading 2").add_run(self.footnotes_heading)
             self._footnote_depth += 1
             return
         if token_type == "footnote_block_close":
@@ -331,22 +1256,45 @@ class GfmDocxRenderer:
             return
         if token_type == "footnote_open":
             label = token.meta["label"]
-            self._paragraph = self.document.add_paragraph(style="List Number")
+            self._paragraph = self._add_paragraph("List Number")
             self._paragraph.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
             self._paragraph.add_run(f"[{label}] ")
             return
         if token_type == "footnote_close":
             self._paragraph = None
 
+    def _append_block(self, element: Any) -> None:
+        """Append a paragraph or table element to the end of the body.
+
+        ``Document.add_paragraph`` and ``add_table`` look the body's closing
+        ``w:sectPr`` up again on every call by scanning the body from the
+        top, which makes rendering quadratic in the number of blocks; the
+        section properties are found once per document here instead.
+        """
+        self._body_end.addprevious(element)
+
+    def _add_paragraph(self, style: str | None = None) -> Paragraph:
+        """``Document.add_paragraph(style=style)``, in constant time."""
+        paragraph = Paragraph(OxmlElement("w:p"), self.document._body)
+        self._append_block(paragraph._p)
+        if style is not None:
+            # Resolving a style name walks every style in the document, twice.
+            if style not in self._style_ids:
+                self._style_ids[style] = self.document.part.get_style_id(
+                    style, WD_STYLE_TYPE.PARAGRAPH
+                )
+            paragraph._p.style = self._style_ids[style]
+        return paragraph
+
     def _new_paragraph(self):
         if self._list_stack:
             style = "List Number" if self._list_stack[-1] == "ordered_list_open" else "List Bullet"
-            paragraph = self.document.add_paragraph(style=style)
+            paragraph = self._add_paragraph(style)
             paragraph.paragraph_format.left_indent = Pt(18 * (len(self._list_stack) - 1))
         elif self._quote_depth:
-            paragraph = self.document.add_paragraph(style="Quote")
+            paragraph = self._add_paragraph("Quote")
         else:
-            paragraph = self.document.add_paragraph()
+            paragraph = self._add_paragraph()
         paragraph.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
         return paragraph
 
@@ -470,11 +1418,7 @@ class GfmDocxRenderer:
     def _append_hyperlink(
         self, text: str, target: str, formatting: dict[str, bool]
     ) -> None:
-        relationship_id = self._paragraph.part.relate_to(
-            target,
-            "http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink",
-            is_external=True,
-        )
+        relationship_id = self._hyperlink_relationship(target)
         hyperlink = OxmlElement("w:hyperlink")
         hyperlink.set(qn("r:id"), relationship_id)
         run = OxmlElement("w:r")
@@ -498,6 +1442,140 @@ class GfmDocxRenderer:
         hyperlink.append(run)
         self._paragraph._p.append(hyperlink)
 
+    def _hyperlink_relationship(self, target: str) -> str:
+        """Return the rId of the external hyperlink relationship to *target*.
+
+        What ``Part.relate_to(target, ..., is_external=True)`` returns, but
+        without its two scans of every relationship in the part (one to
+        reuse a match, one for the lowest free rId), which a changelog with
+        thousands of links turns quadratic. Relationships are only ever
+        added while rendering, so counting upwards past taken ids hands out
+        the same lowest free rId.
+        """
+        relationship_id = self._hyperlink_ids.get(target)
+        if relationship_id is None:
+            relationship_id = self._free_relationship_id()
+            self.document.part.rels.add_relationship(
+                _HYPERLINK_RELATIONSHIP, target, relationship_id, is_external=True
+            )
+            self._hyperlink_ids[target] = relationship_id
+        self._relationships_used.append(relationship_id)
+        return relationship_id
+
+    def _free_relationship_id(self) -> str:
+        relationships = self.document.part.rels
+        while f"rId{self._next_relationship}" in relationships:
+            self._next_relationship += 1
+        return f"rId{self._next_relationship}"
+
+    def _add_picture(self, image: Image) -> None:
+        """Append *image* to a new run of the paragraph.
+
+        What ``Run.add_picture`` does, starting from an already parsed
+        ``Image`` instead of a path or stream (see ``_local_image``), after
+        the optional ``image_optimizer`` has fitted it to the page. Each
+        distinct image gets one media part and one relationship per
+        document, looked up by its SHA-1 rather than by python-docx's scan
+        of every image part, and drawing ids are counted up from the
+        document's first free id instead of re-scanning the whole body for
+        ``@id`` attributes on every picture.
+        """
+        if self.image_optimizer is None:
+            width, height = image.scaled_dimensions()
+        else:
+            if self._column_width is None:
+                section = self.document.sections[-1]
+                self._column_width = (
+                    section.page_width - section.left_margin - section.right_margin
+                )
+            image, width, height = self.image_optimizer.fit(image, self._column_width)
+        inline = CT_Inline.new_pic_inline(
+            self._shape_id(), self._image_relationship(image), image.filename, width, height
+        )
+        self._paragraph.add_run()._r.add_drawing(inline)
+
+    def _image_relationship(self, image: Image) -> str:
+        """Return the rId of *image*'s media part, adding the part on first use."""
+        relationship_id = self._image_ids.get(image.sha1)
+        if relationship_id is None:
+            part = self.document.part
+            image_parts = part.package.image_parts
+            # Media parts are only ever added here, numbered from 1 up, so
+            # the next free number is always one past the count.
+            partname = PackURI(f"/word/media/image{len(image_parts) + 1}.{image.ext}")
+            image_part = ImagePart.from_image(image, partname)
+            image_parts.append(image_part)
+            relationship_id = self._free_relationship_id()
+            part.rels.add_relationship(_IMAGE_RELATIONSHIP, image_part, relationship_id)
+            self._image_ids[image.sha1] = relationship_id
+            self._images[relationship_id] = image
+        self._relationships_used.append(relationship_id)
+        return relationship_id
+
+    def _shape_id(self) -> int:
+        if self._next_shape_id is None:
+            self._next_shape_id = self.document.part.next_id
+        shape_id = self._next_shape_id
+        self._next_shape_id += 1
+        return shape_id
+
+    def _prefetch_remote_images(self, tokens: list[Token]) -> None:
+        """Download the remote images in *tokens* concurrently, up front.
+
+        Fetched inline, each image would hold up rendering for a full round
+        trip -- a document with dozens of remote diagrams stalls for minutes.
+        Results, failures included, are kept for ``_download`` to hand out
+        when rendering reaches each image, so every URL is requested once
+        per document and any error surfaces as that image's usual warning.
+        """
+        if not self.allow_remote_images:
+            return
+        targets = [
+            target for target in _remote_image_targets(tokens)
+            if target not in self._downloads
+        ]
+        if len(targets) < 2:
+            # Nothing to overlap: leave a lone image to be fetched in place.
+            return
+        self.remote_images.extend(targets)
+        with ThreadPoolExecutor(min(_PREFETCH_WORKERS, len(targets))) as pool:
+            futures = [
+                pool.submit(_fetch_remote_image, target, self.http_cache)
+                for target in targets
+            ]
+        for target, future in zip(targets, futures):
+            error = future.exception()
+            if error is not None:
+                self._downloads[target] = error
+                continue
+            body, cached = future.result()
+            self._count_download(cached)
+            self._downloads[target] = body
+
+    def _count_download(self, cached: bool) -> None:
+        if self.http_cache is None:
+            return
+        if cached:
+            self.http_cache_hits += 1
+        else:
+            self.http_cache_misses += 1
+
+    def _download(self, target: str) -> bytes:
+        """The body of remote image *target*, fetching it now if not prefetched."""
+        download = self._downloads.get(target)
+        if download is None:
+            self.remote_images.append(target)
+            try:
+                download, cached = _fetch_remote_image(target, self.http_cache)
+            except Exception as error:
+                download = error
+            else:
+                self._count_download(cached)
+            self._downloads[target] = download
+        if isinstance(download, Exception):
+            raise download
+        return download
+
     def _append_image(self, token: Any, source_path: Path | None) -> None:
         target = token.attrGet("src") or ""
         alt_text = token.content or "image"
@@ -511,16 +1589,21 @@ class GfmDocxRenderer:
                     )
                     return
                 if target.lower().startswith(("http://", "https://")):
-                    with urlopen(target, timeout=10) as response:
-                        image_bytes = response.read(_MAX_REMOTE_IMAGE_BYTES + 1)
-                    if len(image_bytes) > _MAX_REMOTE_IMAGE_BYTES:
-                        self._image_fallback(
-                            alt_text,
-                            f"Remote image too large: {target} (exceeds the "
-                            f"{_MAX_REMOTE_IMAGE_BYTES}-byte limit; not embedded)",
-                        )
-                        return
-                    self._paragraph.add_run().add_picture(BytesIO(image_bytes))
+                    # Fetched images are reused within this render only: the
+                    # URL may serve something else by the next document.
+                    image = self._fetched_images.get(target)
+                    if image is None:
+                        image_bytes = self._download(target)
+                        if len(image_bytes) > _MAX_REMOTE_IMAGE_BYTES:
+                            self._image_fallback(
+                                alt_text,
+                                f"Remote image too large: {target} (exceeds the "
+                                f"{_MAX_REMOTE_IMAGE_BYTES}-byte limit; not embedded)",
+                            )
+                            return
+                        image = Image.from_file(BytesIO(image_bytes))
+                        self._fetched_images[target] = image
+                    self._add_picture(image)
                     return
                 # A UNC (``\\host\share``) or protocol-relative (``//host``)
                 # target with fetching enabled is not fetched over HTTP -- it
@@ -546,9 +1629,8 @@ class GfmDocxRenderer:
                         "(pass image_root=... to widen it)",
                     )
                     return
-            if not image_path.is_file():
-                raise FileNotFoundError(target)
-            self._paragraph.add_run().add_picture(str(image_path))
+            self.local_images.append(image_path)
+            self._add_picture(_local_image(image_path))
         except FileNotFoundError:
             self._image_fallback(alt_text, f"Image not found: {target}")
         except Exception as error:
@@ -580,7 +1662,7 @@ class GfmDocxRenderer:
         if not formula:
             if display:
                 # Keep the empty block so an equation label still has a home.
-                paragraph = self.document.add_paragraph()
+                paragraph = self._add_paragraph()
                 paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
                 return
             # An empty inline span means the dollars were literal, as in
@@ -636,7 +1718,7 @@ class GfmDocxRenderer:
 
     def _place_math(self, math_element: Any, display: bool) -> None:
         if display:
-            paragraph = self.document.add_paragraph()
+            paragraph = self._add_paragraph()
             paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
             paragraph._p.append(math_element)
             return
@@ -741,7 +1823,7 @@ class GfmDocxRenderer:
         """
         text = latex.strip("\n")
         if display:
-            paragraph = self.document.add_paragraph()
+            paragraph = self._add_paragraph()
             paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
             run = paragraph.add_run(text)
         else:
@@ -776,15 +1858,15 @@ class GfmDocxRenderer:
     def _render_code_block(self, token: Any) -> None:
         language = token.info.strip().split(maxsplit=1)[0] if token.info else ""
         if language:
-            caption = self.document.add_paragraph()
+            caption = self._add_paragraph()
             caption.add_run(language).italic = True
-        paragraph = self.document.add_paragraph()
+        paragraph = self._add_paragraph()
         run = paragraph.add_run(token.content.rstrip("\n"))
         run.font.name = "Courier New"
         run.font.size = Pt(10)
 
     def _add_thematic_break(self) -> None:
-        paragraph = self.document.add_paragraph()
+        paragraph = self._add_paragraph()
         properties = paragraph._p.get_or_add_pPr()
         borders = OxmlElement("w:pBdr")
         bottom = OxmlElement("w:bottom")
@@ -796,32 +1878,55 @@ class GfmDocxRenderer:
         properties.append(borders)
 
     def _finish_table(self) -> None:
-        if not self._table_rows:
-            self._table_rows = None
+        """Emit the collected rows as a bordered Word table in one pass.
+
+        Rows are written straight into the ``w:tbl`` as ``w:tr``/``w:tc``
+        elements. Going through ``add_table(rows, cols)`` and then
+        ``table.cell(row, column)`` instead is quadratic: python-docx answers
+        every ``cell`` call by listing the whole grid again, so a few
+        thousand rows took minutes. Each cell is a deep copy of a prototype
+        built once per column, which keeps the per-cell cost to one small
+        lxml copy plus its text.
+        """
+        rows = self._table_rows
+        self._table_rows = None
+        if not rows:
             return
-        columns = max(len(row) for row in self._table_rows)
-        table = self.document.add_table(rows=len(self._table_rows), cols=columns)
+        columns = max(len(row) for row in rows)
+        table = Table(
+            CT_Tbl.new_tbl(0, columns, self.document._block_width), self.document._body
+        )
+        self._append_block(table._tbl)
         table.style = "Table Grid"
         self._apply_table_borders(table)
-        alignments = {
-            "right": WD_ALIGN_PARAGRAPH.RIGHT,
-            "center": WD_ALIGN_PARAGRAPH.CENTER,
-        }
-        for row_index, values in enumerate(self._table_rows):
-            for column_index, value in enumerate(values):
-                paragraph = table.cell(row_index, column_index).paragraphs[0]
-                run = paragraph.add_run(value)
-                if row_index == 0:
-                    run.bold = True
-                column_alignment = (
-                    self._table_alignments[column_index]
-                    if column_index < len(self._table_alignments)
-                    else None
-                )
-                paragraph.alignment = alignments.get(
-                    column_alignment or "", WD_ALIGN_PARAGRAPH.LEFT
-                )
-        self._table_rows = None
+        # Same even split of the text width that add_table gives its grid.
+        width = str(Emu(self.document._block_width // columns).twips)
+        justification = [
+            _TABLE_ALIGNMENTS.get(
+                (self._table_alignments[column] if column < len(self._table_alignments) else None)
+                or "",
+                WD_ALIGN_PARAGRAPH.LEFT,
+            )
+            for column in range(columns)
+        ]
+        header = [_table_cell(width, jc, bold=True) for jc in justification]
+        body = [_table_cell(width, jc, bold=False) for jc in justification]
+        # A short row leaves its trailing cells empty and unaligned, exactly
+        # as a pre-allocated grid would.
+        empty = _table_cell(width, None, bold=False)
+        tbl = table._tbl
+        for row_index, values in enumerate(rows):
+            prototypes = header if row_index == 0 else body
+            row = OxmlElement("w:tr")
+            for column in range(columns):
+                if column >= len(values):
+                    row.append(copy.deepcopy(empty))
+                    continue
+                cell = copy.deepcopy(prototypes[column])
+                if values[column]:
+                    _set_run_text(cell[-1][-1], values[column])
+                row.append(cell)
+            tbl.append(row)
         self._table_alignments = []
 
     @staticmethod
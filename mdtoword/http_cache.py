@@ -0,0 +1,109 @@
+"""On-disk cache of remote image responses, revalidated on every use.
+
+Each entry is two files named after the SHA-256 of its URL: ``<key>.bin``
+holds the response body and ``<key>.json`` the URL with the validators the
+server sent (``ETag`` and/or ``Last-Modified``). An entry is never served
+blindly: the next request for its URL carries ``If-None-Match`` /
+``If-Modified-Since``, and only a ``304 Not Modified`` answer turns it into a
+hit. A response with neither validator cannot be revalidated and is not
+stored at all.
+
+The cache is shared between threads and processes (a batch converts on a
+process pool); see ``mdtoword.disk_cache``. An entry that disappears between
+lookup and read is just a miss. Eviction is least-recently-used by the
+body's mtime, which a hit refreshes, and runs after each store until the
+bodies fit in ``max_bytes``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from .atomic_io import write_atomically
+from .disk_cache import evict_least_recently_used
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A stored response: where its body lives and how to revalidate it."""
+
+    body_path: Path
+    etag: str | None
+    last_modified: str | None
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers that ask the server to confirm this copy."""
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """A size-capped directory of remote image responses."""
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.json", self.directory / f"{key}.bin"
+
+    def lookup(self, url: str) -> CachedResponse | None:
+        """The stored response for *url*, or None if there is none usable."""
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(meta, dict) or meta.get("url") != url or not body_path.is_file():
+            return None
+        etag, last_modified = meta.get("etag"), meta.get("last_modified")
+        if etag is None and last_modified is None:
+            return None
+        return CachedResponse(body_path, etag, last_modified)
+
+    def read(self, entry: CachedResponse) -> bytes | None:
+        """The body of a revalidated *entry*, marking it recently used.
+
+        None if the entry was evicted since ``lookup`` -- by another process
+        sharing the directory, say -- and must be fetched afresh.
+        """
+        try:
+            body = entry.body_path.read_bytes()
+            os.utime(entry.body_path)
+        except OSError:
+            return None
+        return body
+
+    def store(self, url: str, body: bytes, headers: Any) -> None:
+        """Keep *body* if the response carried a validator, then evict.
+
+        *headers* is the response's header mapping. A body larger than the
+        whole cache is not stored. Failing to write is not an error: the
+        image was fetched, it just will not be cached.
+        """
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if (etag is None and last_modified is None) or len(body) > self.max_bytes:
+            return
+        meta_path, body_path = self._paths(url)
+        meta = {"url": url, "etag": etag, "last_modified": last_modified}
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Body first: a reader that finds the metadata finds its body too.
+            write_atomically(body_path, body)
+            write_atomically(meta_path, json.dumps(meta).encode("utf-8"))
+            evict_least_recently_used(self.directory, self.max_bytes, ".bin", (".json",))
+        except OSError:
+            pass
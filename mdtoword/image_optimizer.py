@@ -0,0 +1,216 @@
+"""Shrink images before they are embedded in a document.
+
+A screenshot is often a 4K PNG, and ``add_picture`` embeds it byte for byte
+at whatever size its DPI implies -- usually far wider than the page. With an
+``ImageOptimizer`` the renderer instead fits each picture to the text column
+and hands its pixels here first:
+
+* pixels beyond ``max_dpi`` at the picture's displayed size are resampled
+  away (the displayed size itself does not change);
+* opaque images are re-encoded as JPEG at ``jpeg_quality`` when one is set,
+  and JPEGs stay JPEG; anything with transparency stays PNG;
+* EXIF, text chunks and other metadata are dropped (the ICC colour
+  profile is kept, since it is colour, not metadata).
+
+An image that no step would change is embedded untouched, and a re-encoding
+that comes out larger than the original is discarded unless pixels were
+dropped. Results are cached by the source's SHA-1 and the settings: in
+memory for the life of the process, and in ``cache_dir`` across runs when
+one is given.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+from io import BytesIO
+import math
+import os
+from pathlib import Path
+import threading
+
+from docx.image.image import Image
+from PIL import ExifTags, Image as PillowImage
+
+from .atomic_io import write_atomically
+from .disk_cache import evict_least_recently_used
+
+_EMU_PER_INCH = 914400
+# Enough for print-quality text in a screenshot; a 4K capture fitted to a
+# 6-inch column keeps 1320 of its 3840 pixels.
+DEFAULT_MAX_DPI = 220
+# Quality used when a JPEG has to be re-encoded (because it was downscaled)
+# and no ``jpeg_quality`` was asked for.
+_DEFAULT_JPEG_QUALITY = 90
+# Budget for optimized images kept in memory across renders.
+_MEMORY_CACHE_BYTES = 64 * 1024 * 1024
+DEFAULT_DISK_CACHE_BYTES = 256 * 1024 * 1024
+# Part of every cache key; bumped when a fix changes what an image becomes,
+# so that results cached by the old code are not served any more.
+_CACHE_VERSION = 2
+
+
+@dataclass(frozen=True)
+class ImageOptimizer:
+    """Settings of the optimization stage; see the module docstring."""
+
+    max_dpi: int = DEFAULT_MAX_DPI
+    jpeg_quality: int | None = None
+    cache_dir: Path | None = None
+    cache_max_bytes: int = DEFAULT_DISK_CACHE_BYTES
+
+    def __post_init__(self) -> None:
+        if self.max_dpi < 1:
+            raise ValueError(f"max_dpi must be at least 1, got {self.max_dpi}")
+        if self.jpeg_quality is not None and not 1 <= self.jpeg_quality <= 95:
+            raise ValueError(
+                f"jpeg_quality must be between 1 and 95, got {self.jpeg_quality}"
+            )
+
+    def fit(self, image: Image, max_width: int) -> tuple[Image, int, int]:
+        """The image to embed for *image*, and its displayed width and height.
+
+        *max_width* is the text column in EMU: a picture wider than that is
+        shown at the column's width, as Word itself would size it on insert.
+        """
+        width, height = image.width, image.height
+        if width > max_width:
+            width, height = max_width, round(height * max_width / width)
+        return self._optimized(image, width), width, height
+
+    def _optimized(self, image: Image, width: int) -> Image:
+        global _memory_bytes
+        key = f"{_CACHE_VERSION}-{image.sha1}-{width}-{self.max_dpi}-{self.jpeg_quality}"
+        with _memory_lock:
+            cached = _memory.get(key)
+            if cached is not None:
+                _memory.move_to_end(key)
+                return cached
+
+        blob = self._read_disk(key)
+        if blob is None:
+            try:
+                blob = _reencode(image, width, self.max_dpi, self.jpeg_quality) or b""
+            except Exception:
+                # Pillow could not make sense of it; python-docx could, so
+                # the original is still perfectly embeddable.
+                blob = b""
+            self._write_disk(key, blob)
+        # An empty result means "embed the original as it is".
+        optimized = Image.from_blob(blob) if blob else image
+
+        with _memory_lock:
+            if key not in _memory and len(optimized.blob) <= _MEMORY_CACHE_BYTES:
+                _memory[key] = optimized
+                _memory_bytes += len(optimized.blob)
+                while _memory_bytes > _MEMORY_CACHE_BYTES:
+                    _, evicted = _memory.popitem(last=False)
+                    _memory_bytes -= len(evicted.blob)
+        return optimized
+
+    def _disk_path(self, key: str) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{hashlib.sha256(key.encode()).hexdigest()}.img"
+
+    def _read_disk(self, key: str) -> bytes | None:
+        path = self._disk_path(key)
+        if path is None:
+            return None
+        try:
+            blob = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        return blob
+
+    def _write_disk(self, key: str, blob: bytes) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomically(path, blob)
+            evict_least_recently_used(path.parent, self.cache_max_bytes, ".img")
+        except OSError:
+            pass
+
+
+_memory: OrderedDict[str, Image] = OrderedDict()
+_memory_bytes = 0
+_memory_lock = threading.Lock()
+
+
+def _has_alpha(picture: PillowImage.Image) -> bool:
+    # ``transparency`` is a palette index for "P", and a colour key (PNG
+    # tRNS) for "RGB", "L" and "I": either way some pixels are see-through.
+    return (
+        picture.mode in ("RGBA", "LA", "PA", "RGBa", "La")
+        or "transparency" in picture.info
+    )
+
+
+def _reencode(
+    image: Image, width: int, max_dpi: int, jpeg_quality: int | None
+) -> bytes | None:
+    """*image* re-encoded to be shown *width* EMU wide, or None to keep it.
+
+    Images whose EXIF orientation rotates them are kept as they are: the
+    displayed size was computed from the stored, unrotated pixels, and
+    applying the rotation would stretch the picture into that box.
+    """
+    inches = width / _EMU_PER_INCH
+    target_px = max(1, math.ceil(inches * max_dpi))
+    with PillowImage.open(BytesIO(image.blob)) as opened:
+        if getattr(opened, "n_frames", 1) > 1:
+            # Animated: re-encoding would keep only the first frame.
+            return None
+        if opened.getexif().get(ExifTags.Base.Orientation, 1) != 1:
+            return None
+        source_format = opened.format
+        icc_profile = opened.info.get("icc_profile")
+        picture: PillowImage.Image = opened
+        resized = picture.width > target_px
+        if resized:
+            # A colour key (``transparency`` on "RGB" or "L") would not survive
+            # resampling, which blends the key into its neighbours: turn it
+            # into an alpha channel first.
+            if picture.mode not in ("RGB", "RGBA", "L", "LA") or (
+                picture.mode in ("RGB", "L") and _has_alpha(picture)
+            ):
+                picture = picture.convert("RGBA" if _has_alpha(picture) else "RGB")
+            height = max(1, round(picture.height * target_px / picture.width))
+            picture = picture.resize((target_px, height), PillowImage.Resampling.LANCZOS)
+
+        # Record the displayed size in the file too: the new pixels span the
+        # same inches.
+        dpi = picture.width / inches
+        options: dict = {"dpi": (dpi, dpi)}
+        if icc_profile:
+            options["icc_profile"] = icc_profile
+        output = BytesIO()
+        if not _has_alpha(picture) and (jpeg_quality is not None or source_format == "JPEG"):
+            if picture.mode not in ("RGB", "L"):
+                picture = picture.convert("RGB")
+            picture.save(
+                output,
+                "JPEG",
+                quality=jpeg_quality or _DEFAULT_JPEG_QUALITY,
+                optimize=True,
+                **options,
+            )
+        else:
+            picture.save(output, "PNG", optimize=True, **options)
+    blob = output.getvalue()
+    if not resized and len(blob) >= len(image.blob):
+        return None
+    return blob
+
+
+def clear_optimized_images() -> None:
+    """Forget every optimized image kept in memory (not those in ``cache_dir``)."""
+    global _memory_bytes
+    with _memory_lock:
+        _memory.clear()
+        _memory_bytes = 0
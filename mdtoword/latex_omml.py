@@ -12,8 +12,11 @@ can report it instead of silently emitting wrong output.
 
 from __future__ import annotations
 
+from collections import OrderedDict
+import copy
 import re
-from typing import Any, Callable, Optional
+import threading
+from typing import Any, Callable, NamedTuple, Optional
 
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
@@ -23,6 +26,15 @@ class UnsupportedLatexError(ValueError):
     """Raised when a LaTeX construct has no OMML equivalent here."""
 
 
+class OmmlCacheInfo(NamedTuple):
+    """Counters of the formula cache behind :func:`latex_to_omml`."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
 _SYMBOLS = {
     "alpha": "α", "beta": "β", "gamma": "γ", "delta": "δ",
     "epsilon": "ε", "varepsilon": "ε", "zeta": "ζ", "eta": "η",
@@ -1048,9 +1060,86 @@ def omml_children(latex: str) -> list[Any]:
     return elements
 
 
+# Distinct formulas kept compiled, per thread. Documents repeat a small
+# working set (`$x$`, `$n$`, the same display equations in every chapter), so
+# this covers a whole batch while staying a few megabytes at worst.
+_COMPILED_FORMULAS = 1024
+
+
+class _FormulaCache(threading.local):
+    """One thread's compiled formulas, least recently used first.
+
+    Per thread, like the renderer's templates: prototypes are deep-copied on
+    every use, and deep-copying one lxml tree from several threads at once
+    is not something lxml promises to survive.
+    """
+
+    def __init__(self) -> None:
+        self.compiled: OrderedDict[str, Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.generation = _cache_generation
+
+
+# Bumped by ``clear_omml_cache``; a thread whose cache is older drops it on
+# its next lookup, so clearing reaches every thread, not only the caller.
+_cache_generation = 0
+_formula_cache = _FormulaCache()
+
+
+def _compile(latex: str) -> Any:
+    """The <m:oMath> prototype for *latex*, or the message it was rejected with.
+
+    Rejections are cached alongside successes: an unsupported formula repeated
+    through a document would otherwise be re-parsed every time only to fail
+    the same way. The prototype belongs to the calling thread's cache, so
+    callers must never hand it out without copying it.
+    """
+    cache = _formula_cache
+    if cache.generation != _cache_generation:
+        cache.__init__()
+    compiled = cache.compiled.get(latex)
+    if compiled is not None:
+        cache.compiled.move_to_end(latex)
+        cache.hits += 1
+        return compiled
+    cache.misses += 1
+    try:
+        children = omml_children(latex)
+    except UnsupportedLatexError as error:
+        compiled = str(error)
+    else:
+        compiled = _el("oMath")
+        for child in children:
+            compiled.append(child)
+    cache.compiled[latex] = compiled
+    if len(cache.compiled) > _COMPILED_FORMULAS:
+        cache.compiled.popitem(last=False)
+    return compiled
+
+
 def latex_to_omml(latex: str) -> Any:
-    """Parse a LaTeX math string into a single <m:oMath> element."""
-    math = _el("oMath")
-    for child in omml_children(latex):
-        math.append(child)
-    return math
+    """Parse a LaTeX math string into a single <m:oMath> element.
+
+    Results are memoized per formula string in each thread; every call
+    still returns an element of its own, free to be inserted into a
+    document.
+    """
+    compiled = _compile(latex)
+    if isinstance(compiled, str):
+        raise UnsupportedLatexError(compiled)
+    return copy.deepcopy(compiled)
+
+
+def omml_cache_info() -> OmmlCacheInfo:
+    """Hit/miss counters and fill level of the calling thread's formula cache."""
+    cache = _formula_cache
+    if cache.generation != _cache_generation:
+        cache.__init__()
+    return OmmlCacheInfo(cache.hits, cache.misses, _COMPILED_FORMULAS, len(cache.compiled))
+
+
+def clear_omml_cache() -> None:
+    """Drop every memoized formula, in every thread, and reset the counters."""
+    global _cache_generation
+    _cache_generation += 1
@@ -0,0 +1,112 @@
+"""Live preview of a Markdown draft: its warnings and outline, kept current.
+
+``preview_content`` renders the whole document every time, which takes
+seconds on a long draft -- too slow to rerun on every keystroke. A
+``LivePreview`` splits the draft into its top-level blocks with
+``split_markdown`` and keeps what rendering each block found, keyed by
+the block's text, so an edit re-renders only the blocks it touched.
+
+Blocks are not quite independent: a link reference or footnote defined in
+one may be used in another. Finding those definitions takes only the
+block-level parse, which is kept per block too. When the set of
+definitions changes, every block is rendered afresh, as any of them might
+render differently now. Footnote bodies are reported after every block,
+in the order the footnotes are numbered, as the document would list them.
+The warnings are the same as ``preview_content`` gives, in the same order.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from .converters import ConversionError, MarkdownToWordConverter
+from .gfm_renderer import ChunkPreview, chunk_definitions, merge_definitions, split_markdown
+
+
+class PreviewResult(NamedTuple):
+    """The warnings of a draft and its outline: each heading's level and text."""
+
+    warnings: list[str]
+    headings: list[tuple[int, str]]
+
+
+class LivePreview:
+    """Warnings and outline of a draft that is being edited; see the module docstring.
+
+    Blocks are rendered with *converter*'s current settings; blocks already
+    kept are not rendered again when those change, so make a new preview then.
+    Not thread-safe: give each thread its own, or let one thread own it.
+    """
+
+    def __init__(
+        self,
+        converter: MarkdownToWordConverter,
+        source_path: Path | None = None,
+    ) -> None:
+        self.converter = converter
+        self.source_path = source_path
+        self._definitions: dict[str, tuple[dict[str, Any], list[str]]] = {}
+        self._previews: dict[str, ChunkPreview] = {}
+        self._env_key: object = None
+
+    def update(
+        self, content: str, cancelled: Callable[[], bool] | None = None
+    ) -> PreviewResult | None:
+        """Preview *content*, rendering only the blocks not seen before.
+
+        *cancelled* is polled between blocks; once it returns true the
+        preview stops and returns None. Blocks rendered by then are kept.
+        A block that fails to render raises ``ConversionError``, as
+        ``preview_content`` would.
+        """
+        chunks = list(split_markdown(content.splitlines(keepends=True), 0))
+
+        definitions = {
+            chunk: self._definitions.get(chunk) or chunk_definitions(chunk) for chunk in chunks
+        }
+        self._definitions = definitions
+        env = merge_definitions(definitions[chunk] for chunk in chunks)
+        env_key = (
+            sorted(
+                (label, ref["href"], ref["title"]) for label, ref in env["references"].items()
+            ),
+            sorted(env["footnotes"]["refs"]),
+        )
+        if env_key != self._env_key:
+            self._previews = {}
+            self._env_key = env_key
+
+        missing = list(dict.fromkeys(chunk for chunk in chunks if chunk not in self._previews))
+        if missing:
+            try:
+                rendered = self.converter.renderer().preview_chunks(
+                    missing, env, self.source_path, cancelled
+                )
+            except Exception as error:
+                raise ConversionError(str(error)) from error
+            self._previews.update(zip(missing, rendered))
+            if len(rendered) < len(missing):
+                return None
+        # Forget blocks the draft no longer has.
+        self._previews = {chunk: self._previews[chunk] for chunk in chunks}
+        return _assemble([self._previews[chunk] for chunk in chunks])
+
+
+def _assemble(previews: list[ChunkPreview]) -> PreviewResult:
+    warnings: list[str] = []
+    headings: list[tuple[int, str]] = []
+    bodies: dict[str, list[str]] = {}
+    for preview in previews:
+        warnings.extend(preview.warnings)
+        headings.extend(preview.headings)
+        # The last definition of a footnote is the one the list shows.
+        bodies.update(preview.definitions)
+    numbered: set[str] = set()
+    for preview in previews:
+        for label in preview.footnotes:
+            if label not in numbered:
+                numbered.add(label)
+                warnings.extend(bodies.get(label, []))
+    return PreviewResult(warnings, headings)
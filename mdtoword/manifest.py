@@ -0,0 +1,220 @@
+"""Манифест инкрементальной пересборки: что и из чего уже сконвертировано.
+
+Манифест — JSON-файл ``MANIFEST_NAME`` в каталоге результатов, по записи на
+каждый записанный туда файл. Запись хранит отпечатки всего, от чего результат
+зависит: исходника, прочитанных рендером локальных изображений (включая
+ненайденные — их появление тоже меняет документ), самого результата и
+настроек конвертера вместе с кодом конвертации. Пока все отпечатки сходятся,
+файл пересобирать незачем.
+
+Отпечаток файла — размер, ``mtime_ns`` и SHA-256. Размер и время — быстрый
+путь: совпали — файл не читается вовсе; разошлись — решает хэш, так что
+``touch`` или повторный checkout без изменений пересборку не вызывает.
+
+Манифест — только кэш. Испорченный или чужой файл читается как пустой,
+и всё просто пересобирается заново.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from functools import lru_cache
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+from . import __version__
+from .atomic_io import write_atomically
+
+MANIFEST_NAME = ".mdtoword-manifest.json"
+_FORMAT = 1
+_READ_CHUNK = 1 << 20
+
+# Модули, код которых определяет содержимое результата: их правка должна
+# инвалидировать всё, что собрано прежней версией.
+_CONVERSION_MODULES = (
+    "converters.py",
+    "docx_writer.py",
+    "gfm_renderer.py",
+    "image_optimizer.py",
+    "latex_omml.py",
+)
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as stream:
+        while chunk := stream.read(_READ_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _code_fingerprint() -> str:
+    """Отпечаток исходников ``_CONVERSION_MODULES``.
+
+    В замороженной сборке (PyInstaller) исходников на диске нет; тогда код
+    определяет версия пакета — сборка другой версии собрана из другого кода.
+    """
+    digest = hashlib.sha256()
+    package = Path(__file__).parent
+    try:
+        for name in _CONVERSION_MODULES:
+            digest.update((package / name).read_bytes())
+    except OSError:
+        return f"version:{__version__}"
+    return digest.hexdigest()
+
+
+def options_key(converter: object) -> str:
+    """Отпечаток настроек конвертера и кода, которым он конвертирует."""
+    state = {name: repr(value) for name, value in vars(converter).items()}
+    state["converter"] = type(converter).__name__
+    state["code"] = _code_fingerprint()
+    state["format"] = str(_FORMAT)
+    return hashlib.sha256(json.dumps(state, sort_keys=True).encode()).hexdigest()
+
+
+def _stamp(path: Path) -> list[Any] | None:
+    """Отпечаток файла для записи в манифест; None — файла нет."""
+    try:
+        stat = path.stat()
+        return [stat.st_size, stat.st_mtime_ns, _sha256(path)]
+    except OSError:
+        return None
+
+
+def _matches(path: Path, recorded: list[Any] | None) -> bool:
+    """Совпадает ли файл с отпечатком; обновляет ``recorded`` по быстрому пути."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return recorded is None
+    if recorded is None:
+        return False
+    size, mtime_ns, sha256 = recorded
+    if (stat.st_size, stat.st_mtime_ns) == (size, mtime_ns):
+        return True
+    if stat.st_size != size:
+        return False
+    try:
+        if _sha256(path) != sha256:
+            return False
+    except OSError:
+        return False
+    # Содержимое то же, сменилось только время: запоминаем новое, чтобы в
+    # следующий раз не хэшировать файл заново.
+    recorded[1] = stat.st_mtime_ns
+    return True
+
+
+class Manifest:
+    """Манифест одного каталога результатов."""
+
+    def __init__(self, directory: Path) -> None:
+        self.path = directory / MANIFEST_NAME
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("format") == _FORMAT:
+            entries = data.get("entries")
+            if isinstance(entries, dict):
+                self._entries = entries
+
+    def current(self, source: Path, output: Path, options: str) -> list[str] | None:
+        """Варнинги прошлой сборки, если *output* актуален, иначе None."""
+        entry = self._entries.get(output.name)
+        if entry is None:
+            return None
+        before = json.dumps(entry, sort_keys=True)
+        try:
+            fresh = (
+                entry["source_path"] == str(source)
+                and entry["options"] == options
+                and _matches(output, entry["output"])
+                and _matches(source, entry["source"])
+                and all(
+                    _matches(Path(image), stamp)
+                    for image, stamp in entry["images"].items()
+                )
+            )
+        except (KeyError, TypeError, ValueError, AttributeError):
+            fresh = False
+        if not fresh:
+            return None
+        if json.dumps(entry, sort_keys=True) != before:
+            # _matches освежил mtime файла, содержимое которого не менялось.
+            self._dirty = True
+        return list(entry.get("warnings", []))
+
+    def images(self, output: Path) -> list[Path]:
+        """Локальные изображения, прочитанные при записанной сборке *output*."""
+        entry = self._entries.get(output.name)
+        try:
+            return [Path(image) for image in entry["images"]] if entry else []
+        except (KeyError, TypeError):
+            return []
+
+    def record(
+        self,
+        source: Path,
+        output: Path,
+        options: str,
+        images: Iterable[Path],
+        warnings: list[str],
+    ) -> None:
+        """Запомнить только что записанный результат."""
+        self._entries[output.name] = {
+            "source_path": str(source),
+            "options": options,
+            "source": _stamp(source),
+            "output": _stamp(output),
+            "images": {str(image): _stamp(image) for image in dict.fromkeys(images)},
+            "warnings": warnings,
+        }
+        self._dirty = True
+
+    def forget(self, output: Path) -> None:
+        """Забыть результат, который больше нельзя считать актуальным."""
+        if self._entries.pop(output.name, None) is not None:
+            self._dirty = True
+
+    def save(self) -> None:
+        """Записать манифест атомарно: во временный файл и переименованием."""
+        if not self._dirty:
+            return
+        payload = json.dumps(
+            {"format": _FORMAT, "entries": self._entries}, ensure_ascii=False
+        )
+        write_atomically(self.path, payload.encode("utf-8"))
+        self._dirty = False
+
+
+class Manifests:
+    """Манифесты всех каталогов, куда пишет один прогон."""
+
+    def __init__(self) -> None:
+        self._by_directory: dict[Path, Manifest] = {}
+
+    def for_output(self, output: Path) -> Manifest:
+        directory = output.parent
+        manifest = self._by_directory.get(directory)
+        if manifest is None:
+            manifest = self._by_directory[directory] = Manifest(directory)
+        return manifest
+
+    def save(self) -> None:
+        """Сохранить изменённые манифесты.
+
+        Несохранённый манифест стоит лишь лишней пересборки в следующий раз,
+        поэтому сбой записи не превращается в отказ уже выполненного прогона.
+        """
+        for manifest in self._by_directory.values():
+            try:
+                manifest.save()
+            except OSError:
+                pass
@@ -4,6 +4,31 @@
 нельзя ни при импорте, ни во время работы. Все диагностические сообщения
 должны идти в stderr.
 
+Инструменты асинхронны: вся работа с файлами и рендер уходят в потоки, и
+длинный прогон не держит цикл событий — остальные вызовы, например дешёвый
+``preview_markdown``, обслуживаются одновременно с ним. Сколько вызовов
+делают такую работу разом, ограничивает ``_call_limiter`` (ключ
+``--max-concurrent-calls``): каждый прогон держит свой пул процессов и
+документы в памяти, и без предела их число росло бы с числом клиентов.
+
+Процессы-воркеры пакетной конвертации живут столько же, сколько сервер
+(``_shared_pool``): их запуск и прогрев оплачиваются один раз, и прогон
+начинает конвертировать сразу. Воркер перезапускается после
+``--worker-max-jobs`` файлов или когда его память превысит
+``--worker-max-memory``. Воркер к тому же помнит отрендеренные блоки
+документов (``reuse_blocks``): повторная конвертация правленого файла
+рендерит заново только изменённые блоки.
+
+Каждый файл прогона конвертируется под пределом времени
+(``--file-timeout``) и памяти (``--file-memory-limit``): патологический
+документ не подвесит сервер и не уронит его по нехватке памяти — воркер
+убивается, файл попадает в ``failed`` с причиной, остальные конвертируются
+дальше.
+
+``start_watch`` запускает наблюдателя (``mdtoword.watch.Watcher``): он
+живёт дольше вызова, пересобирает через тот же пул только затронутые
+правкой документы и останавливается ``stop_watch`` или вместе с сервером.
+
 Контракт инструментов — только пути к файлам. Содержимое документов через
 границу MCP не передаётся: docx — бинарный формат, а Markdown ссылается на
 изображения относительными путями, которые вне файловой системы теряют смысл.
@@ -11,10 +36,19 @@
 
 from __future__ import annotations
 
+import argparse
+import asyncio
+from collections.abc import Callable, Iterable, Iterator
+import os
 from pathlib import Path
+import secrets
+import sys
+import threading
+from typing import Annotated, Literal
 
+import anyio
 from docx.shared import Pt
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 from pydantic import BaseModel, Field
 
 from .converters import (
@@ -22,10 +56,66 @@ from .converters import (
     MarkdownToWordConverter,
     WordToMarkdownConverter,
 )
-from .workflow import discover_sources, resolve_output_paths
+from .batch import (
+    BatchProgress,
+    Converter,
+    FileLimits,
+    FileOutcome,
+    new_worker_pool,
+    run_pipeline,
+    summarize,
+)
+from .image_optimizer import DEFAULT_MAX_DPI, ImageOptimizer
+from .watch import DEFAULT_DEBOUNCE_SECONDS, Watcher
+from .worker_pool import DEFAULT_MAX_JOBS, DEFAULT_MAX_RSS_BYTES, WorkerPool
+from .workflow import OutputAllocator, iter_sources
 
 mcp = FastMCP("mdtoword")
 
+DEFAULT_MAX_CONCURRENT_CALLS = 4
+DEFAULT_FILE_TIMEOUT_SECONDS = 300
+DEFAULT_FILE_MEMORY_LIMIT_MB = 2048
+# Общий для всех вызовов предел: сколько из них одновременно рендерят или
+# конвертируют. Остальные ждут свободного места, не занимая поток.
+_call_limiter = anyio.CapacityLimiter(DEFAULT_MAX_CONCURRENT_CALLS)
+# Верхняя граница параметра workers. Сверх размера общего пула (по числу
+# ядер) прогон всё равно не параллелится: пул под него не растёт.
+MAX_WORKERS = 64
+_Workers = Annotated[int | None, Field(ge=1, le=MAX_WORKERS)]
+
+# Пул процессов-воркеров на всё время жизни сервера; см. docstring модуля.
+_pool: WorkerPool | None = None
+_pool_lock = threading.Lock()
+_pool_limits: dict[str, int | None] = {}
+# Пределы на один файл прогона; задаются в main. Без main (тесты, встраивание)
+# пределов нет, и одиночный файл конвертируется прямо в вызывающем процессе.
+_file_limits = FileLimits()
+# Каталог дискового кэша пережатых изображений (``ImageOptimizer.cache_dir``);
+# задаётся в main (``--image-cache-dir``). Кэш в памяти теряется с каждым
+# перезапуском воркера, а этот переживает и воркеры, и сам сервер. Без main
+# остаётся только кэш в памяти.
+_image_cache_dir: Path | None = None
+
+
+def _default_image_cache_dir() -> Path:
+    """Каталог кэша пользователя: не общий ``/tmp``, куда может писать кто угодно."""
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "mdtoword" / "optimized-images"
+
+
+def _shared_pool() -> WorkerPool:
+    """Общий пул воркеров; поднимается при первом обращении."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = new_worker_pool(**_pool_limits)
+        return _pool
+
 
 class ConvertedFile(BaseModel):
     """One successfully converted file."""
@@ -36,6 +126,16 @@ class ConvertedFile(BaseModel):
         default_factory=list,
         description="Non-fatal issues; the output was still written",
     )
+    output_bytes: int | None = Field(
+        default=None, description="Size of the output file in bytes"
+    )
+    save_seconds: float | None = Field(
+        default=None,
+        description=(
+            "Time spent writing the output (packing the ZIP for .docx); "
+            "null for unchanged files, which were not written"
+        ),
+    )
 
 
 class FailedFile(BaseModel):
@@ -45,6 +145,17 @@ class FailedFile(BaseModel):
     error: str = Field(description="Why this file could not be converted")
 
 
+class RemoteImageCacheStats(BaseModel):
+    """How the on-disk cache of remote images served one run."""
+
+    hits: int = Field(
+        description="Images the server confirmed unchanged (HTTP 304), taken from the cache"
+    )
+    misses: int = Field(
+        description="Images downloaded in full: not cached yet, changed, or not cacheable"
+    )
+
+
 class ConversionReport(BaseModel):
     """The result of a batch conversion."""
 
@@ -63,6 +174,86 @@ class ConversionReport(BaseModel):
         default_factory=list,
         description="Files that could not be converted, each with the reason",
     )
+    unchanged: list[ConvertedFile] = Field(
+        default_factory=list,
+        description=(
+            "Files skipped because their output was already up to date "
+            "(incremental=true only); warnings are the ones recorded when "
+            "that output was written"
+        ),
+    )
+    remote_image_cache: RemoteImageCacheStats | None = Field(
+        default=None,
+        description="Remote image cache counters; only set when remote_image_cache was given",
+    )
+    job_id: str | None = Field(
+        default=None,
+        description=(
+            "Set when the batch was started with background=true: pass it to "
+            "batch_status for progress and the final report. The call itself "
+            "then returns at once, with sources_found 0 and empty lists."
+        ),
+    )
+
+
+class BatchJobStatus(BaseModel):
+    """Progress of a batch started with background=true."""
+
+    job_id: str = Field(description="The id returned when the batch was started")
+    state: Literal["running", "done", "failed"] = Field(
+        description=(
+            "running, done (report is set), or failed (error is set; the "
+            "batch could not run at all)"
+        )
+    )
+    sources_found: int = Field(
+        description="Files found so far; final once discovery_complete is true"
+    )
+    discovery_complete: bool = Field(
+        description="Whether the inputs have been scanned completely"
+    )
+    files_done: int = Field(
+        description="Files finished so far: converted, failed or unchanged"
+    )
+    bytes_written: int = Field(description="Total size of the outputs written so far")
+    last_file: str | None = Field(
+        default=None, description="The source file finished most recently"
+    )
+    error: str | None = Field(
+        default=None,
+        description="Why the batch failed as a whole; per-file failures are in report.failed",
+    )
+    report: ConversionReport | None = Field(
+        default=None, description="The final report, once state is done"
+    )
+
+
+class WatchStatus(BaseModel):
+    """State of a watcher started with start_watch."""
+
+    watch_id: str = Field(description="The id returned by start_watch")
+    state: Literal["running", "stopped", "failed"] = Field(
+        description="running, stopped (by stop_watch), or failed (error is set)"
+    )
+    backend: Literal["inotify", "polling"] = Field(
+        description="How changes are noticed: inotify events, or polling every second"
+    )
+    sources_watched: int = Field(description="Markdown files currently kept converted")
+    passes: int = Field(
+        description="Conversion passes so far, the initial full one included"
+    )
+    converted: int = Field(description="Outputs written so far, over all passes")
+    failed: int = Field(description="Failed conversions so far, over all passes")
+    last_report: ConversionReport | None = Field(
+        default=None,
+        description=(
+            "The report of the most recent pass: only the files that pass "
+            "converted, failed or found unchanged"
+        ),
+    )
+    error: str | None = Field(
+        default=None, description="Why the watcher stopped, when state is failed"
+    )
 
 
 class PreviewedFile(BaseModel):
@@ -95,13 +286,24 @@ class PreviewReport(BaseModel):
     )
 
 
-def _resolve_inputs(inputs: list[str], mode: str) -> list[Path]:
-    """Развернуть переданные пути в отсортированный список исходных файлов."""
+def _resolve_inputs(
+    inputs: list[str],
+    mode: str,
+    include: list[str] | None = None,
+    exclude: list[str] | None = None,
+) -> Iterator[Path]:
+    """Развернуть переданные пути в поток исходных файлов.
+
+    Файлы идут по мере обхода, в порядке ``workflow.iter_sources``, так что
+    конвертация начинается, не дожидаясь конца обхода всего дерева.
+    """
     if not inputs:
         raise ValueError(
             "inputs must not be empty; pass at least one file or directory path"
         )
-    return discover_sources([Path(item).expanduser() for item in inputs], mode)
+    return iter_sources(
+        [Path(item).expanduser() for item in inputs], mode, include or (), exclude or ()
+    )
 
 
 def _resolve_image_roots(inputs: list[str]) -> list[Path]:
@@ -129,6 +331,21 @@ def _resolve_image_roots(inputs: list[str]) -> list[Path]:
     return roots
 
 
+def _plan_outputs(
+    sources: Iterable[Path], output_dir: str | None, suffix: str
+) -> Iterator[tuple[Path, Path]]:
+    """Назначить каждому исходнику путь результата по мере их поступления.
+
+    Каталог назначения создаётся при первом исходнике: если не нашлось
+    ни одного, он не появляется вовсе.
+    """
+    allocator: OutputAllocator | None = None
+    for source in sources:
+        if allocator is None:
+            allocator = OutputAllocator(_prepare_output_dir(output_dir), suffix)
+        yield source, allocator.allocate(source)
+
+
 def _prepare_output_dir(output_dir: str | None) -> Path | None:
     """Подготовить каталог назначения; None означает «рядом с исходником»."""
     if output_dir is None:
@@ -141,7 +358,7 @@ def _prepare_output_dir(output_dir: str | None) -> Path | None:
 
 
 @mcp.tool()
-def markdown_to_word(
+async def markdown_to_word(
     inputs: list[str],
     output_dir: str | None = None,
     font_name: str = "Times New Roman",
@@ -149,11 +366,26 @@ def markdown_to_word(
     footnotes_heading: str = "Footnotes",
     fetch_remote_images: bool = False,
     image_root: str | None = None,
+    workers: _Workers = None,
+    incremental: bool = False,
+    remote_image_cache: str | None = None,
+    max_image_dpi: int | None = None,
+    jpeg_quality: int | None = None,
+    compression: Literal["stored", "fast", "default", "best"] = "default",
+    include: list[str] | None = None,
+    exclude: list[str] | None = None,
+    background: bool = False,
+    ctx: Context | None = None,
 ) -> ConversionReport:
     """Convert Markdown files to Word .docx documents.
 
     `inputs` accepts files and directories mixed together; directories are
-    scanned recursively for .md and .markdown files.
+    scanned recursively for .md and .markdown files. `exclude` takes glob
+    patterns for files and directories to skip while scanning (e.g.
+    `["node_modules", ".git"]`), matched against the name and against the
+    path relative to the scanned directory; with `include`, only files
+    matching one of its patterns are taken. Files named directly in
+    `inputs` are always converted.
 
     Supports GitHub Flavored Markdown: headings, emphasis, lists, task lists,
     tables, blockquotes, code blocks, footnotes, links and images. LaTeX math
@@ -167,6 +399,26 @@ def markdown_to_word(
     this only for Markdown from a source you trust, since the server fetches
     using its own network access.
 
+    Pass `remote_image_cache` (a directory) to keep fetched images on disk
+    between calls. A cached image is still revalidated on every use with a
+    conditional request (ETag / Last-Modified), so a changed image is
+    fetched again; the least recently used entries are evicted once the
+    cache exceeds 256 MiB. The result's `remote_image_cache` counts how many
+    images the cache served.
+
+    Images are embedded byte for byte by default. Pass `max_image_dpi` (e.g.
+    150 or 220) and/or `jpeg_quality` (1-95) to shrink them first: every
+    picture is fitted to the page width, pixels beyond `max_image_dpi` at
+    that size are dropped, metadata is stripped, and with `jpeg_quality`
+    opaque images become JPEGs of that quality. Transparent images stay PNG.
+    Shrunk images are cached on the server's disk by content and settings,
+    so converting the same pictures again does not re-encode them.
+
+    `compression` trades file size for save speed: `"stored"` does not
+    compress at all, `"fast"` compresses text lightly and stores images as
+    they are, `"best"` compresses hardest. `"default"` matches what Word
+    tooling usually writes.
+
     Images referenced by a local filesystem path are only read from within
     the paths passed in `inputs`: a directory input allows images anywhere
     under it, a file input allows images only next to it (in its parent
@@ -182,12 +434,32 @@ def markdown_to_word(
     relative `output_dir` resolves against the server process's working
     directory, not the caller's — pass an absolute path.
 
+    Files are converted in parallel by `workers` processes, one per CPU core
+    by default; pass `workers=1` to convert them one after another. The
+    server's worker pool holds one process per CPU core and does not grow,
+    so a larger `workers` (at most 64) converts no more files at once. The
+    result lists files in the same order either way. Conversion starts as
+    soon as the first files are found, while large directory trees are
+    still being scanned.
+
+    With `incremental=true`, a manifest file (`.mdtoword-manifest.json`) in
+    each output directory records what every output was built from: the
+    source, the local images it references, and the conversion options.
+    Outputs whose inputs have not changed since are skipped and listed under
+    `unchanged` instead of `converted`. A document that embeds images fetched
+    over HTTP(S) is always rebuilt, since a URL cannot be checked for changes.
+
+    While it runs, the call sends MCP progress notifications (files done
+    out of files found, bytes written, the file just finished) to clients
+    that ask for them. For batches that may outlast your client's timeout,
+    pass `background=true`: the call then returns at once with only
+    `job_id` set, and `batch_status` reports progress and, once done, this
+    same report.
+
     Check `sources_found` in the result: 0 means the paths matched no
     Markdown files at all.
     """
-    sources = _resolve_inputs(inputs, "md_to_word")
-    output_directory = _prepare_output_dir(output_dir) if sources else None
-    outputs = resolve_output_paths(sources, output_directory, ".docx")
+    sources = _resolve_inputs(inputs, "md_to_word", include, exclude)
     image_roots = (
         [Path(image_root).expanduser().resolve()]
         if image_root is not None
@@ -199,19 +471,47 @@ def markdown_to_word(
         footnotes_heading,
         allow_remote_images=fetch_remote_images,
         image_roots=image_roots,
+        http_cache_dir=(
+            None
+            if remote_image_cache is None
+            else Path(remote_image_cache).expanduser().resolve()
+        ),
+        image_optimizer=(
+            None
+            if max_image_dpi is None and jpeg_quality is None
+            else ImageOptimizer(
+                max_image_dpi or DEFAULT_MAX_DPI, jpeg_quality, _image_cache_dir
+            )
+        ),
+        compression=compression,
+        reuse_blocks=True,
+    )
+    return await _convert_batch(
+        _plan_outputs(sources, output_dir, ".docx"),
+        converter,
+        workers,
+        incremental,
+        background,
+        ctx,
     )
-    return _run_batch(sources, outputs, converter)
 
 
 @mcp.tool()
-def word_to_markdown(
+async def word_to_markdown(
     inputs: list[str],
     output_dir: str | None = None,
+    workers: _Workers = None,
+    incremental: bool = False,
+    include: list[str] | None = None,
+    exclude: list[str] | None = None,
+    background: bool = False,
+    ctx: Context | None = None,
 ) -> ConversionReport:
     """Convert Word .docx documents to Markdown files.
 
     `inputs` accepts files and directories mixed together; directories are
-    scanned recursively for .docx files.
+    scanned recursively for .docx files, filtered by `include` / `exclude`
+    as in `markdown_to_word`.
 
     This direction is LOSSY. It extracts headings (from `Heading N` styles),
     bold and italic runs, and tables. Everything else — lists, images,
@@ -224,23 +524,34 @@ def word_to_markdown(
     relative `output_dir` resolves against the server process's working
     directory, not the caller's — pass an absolute path.
 
+    Files are converted in parallel by `workers` processes, one per CPU core
+    by default, `incremental=true` skips up-to-date outputs, and progress
+    and `background=true` work, all exactly as in `markdown_to_word`.
+
     Check `sources_found` in the result: 0 means the paths matched no
     .docx files at all.
     """
-    sources = _resolve_inputs(inputs, "word_to_md")
-    output_directory = _prepare_output_dir(output_dir) if sources else None
-    outputs = resolve_output_paths(sources, output_directory, ".md")
-    return _run_batch(sources, outputs, WordToMarkdownConverter())
+    sources = _resolve_inputs(inputs, "word_to_md", include, exclude)
+    return await _convert_batch(
+        _plan_outputs(sources, output_dir, ".md"),
+        WordToMarkdownConverter(),
+        workers,
+        incremental,
+        background,
+        ctx,
+    )
 
 
 @mcp.tool()
-def preview_markdown(
+async def preview_markdown(
     inputs: list[str],
     font_name: str = "Times New Roman",
     font_size: float = 12,
     footnotes_heading: str = "Footnotes",
     fetch_remote_images: bool = False,
     image_root: str | None = None,
+    include: list[str] | None = None,
+    exclude: list[str] | None = None,
 ) -> PreviewReport:
     """Check what Markdown would lose in Word, without writing any file.
 
@@ -262,8 +573,11 @@ def preview_markdown(
     a directory input allows images anywhere under it, a file input allows
     images only next to it, not in sibling directories. Pass `image_root`
     to widen the allowed root when your images live elsewhere.
+
+    Directories in `inputs` are scanned with the same `include` / `exclude`
+    patterns as `markdown_to_word`.
     """
-    sources = _resolve_inputs(inputs, "md_to_word")
+    sources = _resolve_inputs(inputs, "md_to_word", include, exclude)
     image_roots = (
         [Path(image_root).expanduser().resolve()]
         if image_root is not None
@@ -276,8 +590,16 @@ def preview_markdown(
         allow_remote_images=fetch_remote_images,
         image_roots=image_roots,
     )
-    report = PreviewReport(sources_found=len(sources))
+    return await anyio.to_thread.run_sync(
+        _preview, sources, converter, limiter=_call_limiter
+    )
+
+
+def _preview(sources: Iterable[Path], converter: MarkdownToWordConverter) -> PreviewReport:
+    """Отрендерить все файлы вхолостую, собрав варнинги и отказы."""
+    report = PreviewReport(sources_found=0)
     for source in sources:
+        report.sources_found += 1
         try:
             warnings = converter.preview_file(source)
         except ConversionError as error:
@@ -289,30 +611,399 @@ def preview_markdown(
     return report
 
 
-def _run_batch(
-    sources: list[Path],
-    outputs: dict[Path, Path],
-    converter: MarkdownToWordConverter | WordToMarkdownConverter,
+@mcp.tool()
+async def batch_status(job_id: str, wait_seconds: float = 0) -> BatchJobStatus:
+    """Report on a batch started with `background=true`.
+
+    Returns how far the batch has got and, once `state` is `done`, its full
+    report -- the same one the conversion tool would have returned. Pass
+    `wait_seconds` (at most 60) to wait that long for the batch to finish
+    before answering, instead of polling in a tight loop.
+
+    Finished batches are remembered for the server's lifetime, up to the
+    32 most recent; an older `job_id` is an error.
+    """
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        raise ValueError(f"Unknown job_id {job_id!r}; it may have expired")
+    if wait_seconds > 0 and not job.finished.is_set():
+        await anyio.to_thread.run_sync(
+            job.finished.wait, min(wait_seconds, _MAX_WAIT_SECONDS)
+        )
+    return job.status()
+
+
+@mcp.tool()
+async def start_watch(
+    inputs: list[str],
+    output_dir: str | None = None,
+    font_name: str = "Times New Roman",
+    font_size: float = 12,
+    footnotes_heading: str = "Footnotes",
+    image_root: str | None = None,
+    include: list[str] | None = None,
+    exclude: list[str] | None = None,
+    debounce_seconds: float = DEFAULT_DEBOUNCE_SECONDS,
+) -> WatchStatus:
+    """Keep Word copies of Markdown files in sync as the files change.
+
+    Converts `inputs` once, like `markdown_to_word` with `incremental=true`,
+    then keeps watching in the background: whenever a Markdown file is
+    edited, added or renamed, or a local image it shows changes, only the
+    affected documents are converted again. Bursts of changes (a save that
+    touches several files, a `git checkout`) are merged into one pass that
+    starts after `debounce_seconds` without further changes. Changes come
+    from inotify where the OS offers it, and from polling every second
+    otherwise.
+
+    `inputs`, `output_dir`, `include`, `exclude`, `image_root` and the font
+    arguments mean what they mean for `markdown_to_word`; remote images are
+    never fetched. The call returns at once, before the first pass is done:
+    use `watch_status` for progress and `stop_watch` to end it. Watchers
+    run until stopped or until the server exits.
+    """
+    if not inputs:
+        raise ValueError(
+            "inputs must not be empty; pass at least one file or directory path"
+        )
+    image_roots = (
+        [Path(image_root).expanduser().resolve()]
+        if image_root is not None
+        else _resolve_image_roots(inputs)
+    )
+    converter = MarkdownToWordConverter(
+        font_name,
+        Pt(font_size),
+        footnotes_heading,
+        allow_remote_images=False,
+        image_roots=image_roots,
+        reuse_blocks=True,
+    )
+    watch = _Watch(
+        Watcher(
+            [Path(item).expanduser() for item in inputs],
+            converter,
+            _prepare_output_dir(output_dir),
+            include or (),
+            exclude or (),
+            workers=None,
+            debounce=debounce_seconds,
+            pool=_shared_pool(),
+            limits=_file_limits,
+        )
+    )
+    return watch.status()
+
+
+@mcp.tool()
+async def watch_status(watch_id: str) -> WatchStatus:
+    """Report on a watcher started with `start_watch`.
+
+    Counts cover every pass since the watcher started; `last_report` is
+    the report of the most recent pass alone, in the shape
+    `markdown_to_word` returns.
+    """
+    return _find_watch(watch_id).status()
+
+
+@mcp.tool()
+async def stop_watch(watch_id: str) -> WatchStatus:
+    """Stop a watcher started with `start_watch` and report its final state.
+
+    A pass under way converts no further files. The outputs already
+    written stay as they are.
+    """
+    watch = _find_watch(watch_id)
+    await anyio.to_thread.run_sync(watch.stop)
+    return watch.status()
+
+
+async def _convert_batch(
+    jobs: Iterable[tuple[Path, Path]],
+    converter: Converter,
+    workers: int | None,
+    incremental: bool,
+    background: bool,
+    ctx: Context | None,
 ) -> ConversionReport:
-    """Сконвертировать все файлы, не прерываясь на отдельных отказах."""
-    report = ConversionReport(sources_found=len(sources))
-    for source in sources:
+    """Провести прогон в фоне или дождаться его, сообщая клиенту о ходе.
+
+    Сам прогон идёт в отдельном потоке: цикл событий тем временем отправляет
+    уведомления о прогрессе, иначе клиент не увидел бы их до самого конца.
+    """
+    if background:
+        job = _BatchJob(
+            lambda progress: _run_batch(jobs, converter, workers, incremental, progress)
+        )
+        return ConversionReport(sources_found=0, job_id=job.id)
+
+    notify = None
+    if ctx is not None:
+
+        def notify(progress: BatchProgress) -> None:
+            anyio.from_thread.run(_report_progress, ctx, progress)
+
+    return await anyio.to_thread.run_sync(
+        _run_batch,
+        jobs,
+        converter,
+        workers,
+        incremental,
+        BatchProgress(notify),
+        limiter=_call_limiter,
+    )
+
+
+async def _report_progress(ctx: Context, progress: BatchProgress) -> None:
+    found, done, written, complete, last = progress.snapshot()
+    counted = f"{done} of {found}" if complete else f"{done} of {found}+"
+    await ctx.report_progress(
+        done,
+        found if complete else None,
+        f"{counted} files, {written} bytes written; last: {last}",
+    )
+
+
+# Фоновые прогоны: по id, в порядке запуска. Закончившиеся хранятся, пока
+# их не вытеснят более новые, — итог должен дождаться, пока его заберут.
+_jobs: dict[str, _BatchJob] = {}
+_jobs_lock = threading.Lock()
+_FINISHED_JOBS_KEPT = 32
+_MAX_WAIT_SECONDS = 60
+
+
+class _BatchJob:
+    """Прогон, запущенный с background=true: своя задача, ход и итог.
+
+    Задача живёт в цикле событий сервера дольше вызова, который её
+    запустил, и занимает место в ``_call_limiter`` наравне с остальными.
+    Создаётся только изнутри цикла событий.
+    """
+
+    def __init__(self, run: Callable[[BatchProgress], ConversionReport]) -> None:
+        self.id = secrets.token_hex(8)
+        self.progress = BatchProgress()
+        self.finished = threading.Event()
+        self.report: ConversionReport | None = None
+        self.error: str | None = None
+        with _jobs_lock:
+            finished = [key for key, job in _jobs.items() if job.finished.is_set()]
+            for key in finished[: max(0, len(finished) - _FINISHED_JOBS_KEPT + 1)]:
+                del _jobs[key]
+            _jobs[self.id] = self
+        # Ссылка на задачу держится здесь: asyncio хранит лишь слабую.
+        self._task = asyncio.get_running_loop().create_task(
+            anyio.to_thread.run_sync(self._run, run, limiter=_call_limiter)
+        )
+
+    def _run(self, run: Callable[[BatchProgress], ConversionReport]) -> None:
         try:
-            warnings = converter.convert_file(source, outputs[source])
-        except ConversionError as error:
-            report.failed.append(FailedFile(source=str(source), error=str(error)))
+            report = run(self.progress)
+            report.job_id = self.id
+            self.report = report
+        except Exception as error:
+            self.error = str(error) or type(error).__name__
+        finally:
+            self.finished.set()
+
+    def status(self) -> BatchJobStatus:
+        found, done, written, complete, last = self.progress.snapshot()
+        if not self.finished.is_set():
+            state = "running"
         else:
-            report.converted.append(
-                ConvertedFile(
-                    source=str(source), output=str(outputs[source]), warnings=warnings
-                )
-            )
-    return report
+            state = "failed" if self.error is not None else "done"
+        return BatchJobStatus(
+            job_id=self.id,
+            state=state,
+            sources_found=found,
+            discovery_complete=complete,
+            files_done=done,
+            bytes_written=written,
+            last_file=None if last is None else str(last),
+            error=self.error,
+            report=self.report,
+        )
 
 
-def main() -> None:
+# Наблюдатели start_watch: по id, пока их не остановят. Остановленные
+# хранятся, как и фоновые прогоны, чтобы их итог ещё можно было запросить.
+_watches: dict[str, _Watch] = {}
+_watches_lock = threading.Lock()
+_STOPPED_WATCHES_KEPT = 32
+
+
+class _Watch:
+    """Наблюдатель, запущенный start_watch, и то, чем кончилась его работа."""
+
+    def __init__(self, watcher: Watcher) -> None:
+        self.id = secrets.token_hex(8)
+        self.watcher = watcher
+        self.stopped = False
+        with _watches_lock:
+            ended = [key for key, watch in _watches.items() if not watch.watcher.is_alive()]
+            for key in ended[: max(0, len(ended) - _STOPPED_WATCHES_KEPT + 1)]:
+                del _watches[key]
+            _watches[self.id] = self
+        watcher.start()
+
+    def stop(self) -> None:
+        self.stopped = True
+        self.watcher.stop()
+
+    def status(self) -> WatchStatus:
+        watcher = self.watcher
+        if watcher.error is not None:
+            state = "failed"
+        elif self.stopped or not watcher.is_alive():
+            state = "stopped"
+        else:
+            state = "running"
+        outcomes = watcher.last_outcomes
+        return WatchStatus(
+            watch_id=self.id,
+            state=state,
+            backend=watcher.backend,
+            sources_watched=len(watcher.sources),
+            passes=watcher.passes,
+            converted=watcher.converted,
+            failed=watcher.failed,
+            last_report=_report(outcomes, watcher.converter) if outcomes else None,
+            error=watcher.error,
+        )
+
+
+def _find_watch(watch_id: str) -> _Watch:
+    with _watches_lock:
+        watch = _watches.get(watch_id)
+    if watch is None:
+        raise ValueError(f"Unknown watch_id {watch_id!r}; it may have expired")
+    return watch
+
+
+def _stop_watches() -> None:
+    """Остановить всех наблюдателей; они пишут через общий пул воркеров."""
+    with _watches_lock:
+        watches = list(_watches.values())
+    for watch in watches:
+        watch.stop()
+
+
+def _run_batch(
+    jobs: Iterable[tuple[Path, Path]],
+    converter: Converter,
+    workers: int | None = None,
+    incremental: bool = False,
+    progress: BatchProgress | None = None,
+) -> ConversionReport:
+    """Сконвертировать все файлы, не прерываясь на отдельных отказах."""
+    outcomes = run_pipeline(
+        jobs, converter, workers, incremental, progress, _shared_pool(), _file_limits
+    )
+    return _report(outcomes, converter)
+
+
+def _report(outcomes: list[FileOutcome], converter: Converter) -> ConversionReport:
+    """Свести итоги по файлам в отчёт инструмента (``batch.summarize``)."""
+    return ConversionReport.model_validate(
+        summarize(
+            outcomes,
+            isinstance(converter, MarkdownToWordConverter)
+            and converter.http_cache_dir is not None,
+        )
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
     """Запустить сервер на транспорте stdio."""
-    mcp.run()
+    global _file_limits, _image_cache_dir
+    parser = argparse.ArgumentParser(
+        prog="python -m mdtoword.mcp_server", description="MDtoWord MCP server (stdio)"
+    )
+    parser.add_argument(
+        "--max-concurrent-calls",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENT_CALLS,
+        metavar="N",
+        help=(
+            "how many tool calls may render or convert at the same time; "
+            f"the rest wait (default: {DEFAULT_MAX_CONCURRENT_CALLS})"
+        ),
+    )
+    parser.add_argument(
+        "--worker-max-jobs",
+        type=int,
+        default=DEFAULT_MAX_JOBS,
+        metavar="N",
+        help=f"restart a worker process after N files (default: {DEFAULT_MAX_JOBS})",
+    )
+    parser.add_argument(
+        "--worker-max-memory",
+        type=int,
+        default=DEFAULT_MAX_RSS_BYTES // (1024 * 1024),
+        metavar="MB",
+        help=(
+            "restart a worker process once its peak memory exceeds this; "
+            "0 disables the check (default: %(default)s)"
+        ),
+    )
+    parser.add_argument(
+        "--file-timeout",
+        type=float,
+        default=DEFAULT_FILE_TIMEOUT_SECONDS,
+        metavar="SECONDS",
+        help=(
+            "fail a file whose conversion takes longer than this; "
+            "0 disables the limit (default: %(default)s)"
+        ),
+    )
+    parser.add_argument(
+        "--file-memory-limit",
+        type=int,
+        default=DEFAULT_FILE_MEMORY_LIMIT_MB,
+        metavar="MB",
+        help=(
+            "fail a file whose conversion pushes its worker's peak memory past "
+            "this; 0 disables the limit, which is never enforced on Windows "
+            "(default: %(default)s)"
+        ),
+    )
+    parser.add_argument(
+        "--image-cache-dir",
+        default=str(_default_image_cache_dir()),
+        metavar="DIR",
+        help=(
+            "keep images shrunk by max_image_dpi / jpeg_quality here between "
+            "runs; an empty string keeps them in memory only (default: %(default)s)"
+        ),
+    )
+    arguments = parser.parse_args(argv)
+    if arguments.max_concurrent_calls < 1:
+        parser.error("--max-concurrent-calls must be at least 1")
+    if arguments.worker_max_jobs < 1:
+        parser.error("--worker-max-jobs must be at least 1")
+    if arguments.file_timeout < 0:
+        parser.error("--file-timeout must not be negative")
+    if arguments.file_memory_limit < 0:
+        parser.error("--file-memory-limit must not be negative")
+    _call_limiter.total_tokens = arguments.max_concurrent_calls
+    _pool_limits.update(
+        max_jobs=arguments.worker_max_jobs,
+        max_rss_bytes=arguments.worker_max_memory * 1024 * 1024 or None,
+    )
+    _file_limits = FileLimits(
+        arguments.file_timeout or None,
+        arguments.file_memory_limit * 1024 * 1024 or None,
+    )
+    if arguments.image_cache_dir:
+        _image_cache_dir = Path(arguments.image_cache_dir).expanduser().resolve()
+    # Воркеры стартуют и прогреваются, пока клиент ещё только подключается.
+    pool = _shared_pool()
+    try:
+        mcp.run()
+    finally:
+        _stop_watches()
+        pool.close(cancel_queued=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,522 @@
+"""Watch mode: keep the Word outputs of a Markdown tree current as it changes.
+
+A ``Watcher`` converts its inputs once, as an incremental batch would, then
+waits for changes and re-converts only the documents they affect: a
+Markdown file that was edited, added or renamed into place, or every
+document that shows an image that changed. Changes come from inotify on
+Linux and from polling elsewhere (or where inotify runs out of watches):
+every ``poll_interval`` seconds the watched files are ``stat``-ed, and a
+directory is listed again only once its own mtime says an entry came or
+went.
+
+Events arrive in bursts -- an editor's save, a ``git checkout`` -- so a
+pass starts only after ``debounce`` seconds without a new one, or at the
+latest ``_MAX_COALESCE_SECONDS`` after the first. Every pass is an
+incremental ``run_pipeline`` over the affected files, so the manifest in
+each output directory stays current, and an event that changed nothing
+(a ``touch``, a save without edits) converts nothing.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable, Iterable, Sequence
+import ctypes
+from fnmatch import fnmatch
+import os
+from pathlib import Path
+import select
+import struct
+import sys
+import threading
+import time
+
+from docx.shared import Pt
+
+from .batch import BatchProgress, FileLimits, FileOutcome, run_pipeline
+from .converters import MarkdownToWordConverter
+from .worker_pool import WorkerPool
+from .workflow import OutputAllocator, iter_sources, supported_suffixes
+
+DEFAULT_DEBOUNCE_SECONDS = 0.5
+DEFAULT_POLL_SECONDS = 1.0
+# A steady stream of events still gets converted this often.
+_MAX_COALESCE_SECONDS = 5.0
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = (
+    _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+# Changed paths, and whether directories changed too, so that the inputs
+# have to be scanned again for files that came or went.
+_Changes = tuple[set[Path], bool]
+
+
+class _InotifyChanges:
+    """Changes reported by the kernel, for every watched directory."""
+
+    backend = "inotify"
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(None, use_errno=True)
+        try:
+            self._add_watch = libc.inotify_add_watch
+            self._rm_watch = libc.inotify_rm_watch
+            init = libc.inotify_init1
+        except AttributeError:
+            raise OSError("inotify is not available on this platform") from None
+        self._fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._wake_read, self._wake_write = os.pipe()
+        # Guards the descriptors: a wake must never write to one closed already.
+        self._lock = threading.Lock()
+        self._closed = False
+        self._directories: dict[int, Path] = {}
+        self._watches: dict[Path, int] = {}
+
+    def watch(self, directories: set[Path], files: set[Path]) -> None:
+        """Watch exactly *directories*; files are seen through their directory."""
+        for directory in set(self._watches) - directories:
+            self._rm_watch(self._fd, self._watches.pop(directory))
+        for directory in directories - set(self._watches):
+            descriptor = self._add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+            if descriptor < 0:
+                error = ctypes.get_errno()
+                if error in (2, 20):  # ENOENT, ENOTDIR: gone already
+                    continue
+                raise OSError(error, os.strerror(error), str(directory))
+            self._watches[directory] = descriptor
+            self._directories[descriptor] = directory
+
+    def wait(self, timeout: float | None) -> _Changes:
+        readable, _, _ = select.select([self._fd, self._wake_read], [], [], timeout)
+        if self._wake_read in readable:
+            os.read(self._wake_read, 64)
+        if self._fd not in readable:
+            return set(), False
+        changed: set[Path] = set()
+        rescan = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                descriptor, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & _IN_Q_OVERFLOW:
+                    rescan = True
+                    continue
+                directory = self._directories.get(descriptor)
+                if mask & _IN_IGNORED:
+                    self._directories.pop(descriptor, None)
+                    if directory is not None and self._watches.get(directory) == descriptor:
+                        del self._watches[directory]
+                    continue
+                if directory is None:
+                    continue
+                if mask & (_IN_ISDIR | _IN_DELETE_SELF | _IN_MOVE_SELF):
+                    rescan = True
+                if name:
+                    changed.add(directory / os.fsdecode(name))
+        return changed, rescan
+
+    def wake(self) -> None:
+        with self._lock:
+            if not self._closed:
+                os.write(self._wake_write, b"\0")
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                for descriptor in (self._fd, self._wake_read, self._wake_write):
+                    os.close(descriptor)
+
+
+class _PollingChanges:
+    """Changes found by comparing ``stat`` results every *interval* seconds."""
+
+    backend = "polling"
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._woken = threading.Event()
+        self._files: dict[Path, tuple[int, int] | None] = {}
+        self._directories: dict[Path, int | None] = {}
+
+    def watch(self, directories: set[Path], files: set[Path]) -> None:
+        """Compare *files* and *directories* with how they are now.
+
+        Paths watched already keep the state they were last seen in, so a
+        change made while a pass was converting is still found by the next
+        poll.
+        """
+        self._files = {path: self._files.get(path, _signature(path)) for path in files}
+        self._directories = {
+            path: self._directories.get(path, _directory_mtime(path)) for path in directories
+        }
+
+    def wait(self, timeout: float | None) -> _Changes:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, max(0.0, deadline - time.monotonic()))
+            if self._woken.wait(delay):
+                self._woken.clear()
+                return set(), False
+            changed = set()
+            for path, signature in self._files.items():
+                current = _signature(path)
+                if current != signature:
+                    self._files[path] = current
+                    changed.add(path)
+            rescan = False
+            for path, mtime in self._directories.items():
+                current = _directory_mtime(path)
+                if current != mtime:
+                    self._directories[path] = current
+                    rescan = True
+            if changed or rescan:
+                return changed, rescan
+            if deadline is not None and time.monotonic() >= deadline:
+                return set(), False
+
+    def wake(self) -> None:
+        self._woken.set()
+
+    def close(self) -> None:
+        pass
+
+
+def _signature(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _directory_mtime(path: Path) -> int | None:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _tree_directories(root: Path, exclude: Sequence[str]) -> set[Path]:
+    """*root* and every directory under it that ``iter_sources`` would enter."""
+    directories = {root}
+    for directory, names, _ in os.walk(root):
+        relative = os.path.relpath(directory, root)
+        prefix = "" if relative == "." else relative.replace(os.sep, "/") + "/"
+        names[:] = [
+            name
+            for name in names
+            if not any(
+                fnmatch(name, pattern) or fnmatch(prefix + name, pattern)
+                for pattern in exclude
+            )
+            and not os.path.islink(os.path.join(directory, name))
+        ]
+        directories.update(Path(directory, name) for name in names)
+    return directories
+
+
+class Watcher(threading.Thread):
+    """Converts *inputs* once, then again wherever they change; see the module docstring.
+
+    *inputs*, *output_dir*, *include* and *exclude* mean what they mean for
+    a batch; the output of a document stays the same for as long as the
+    watcher runs. *workers*, *pool* and *limits* are passed on to
+    ``run_pipeline`` for every pass. *on_pass* is called from the
+    watcher's thread with the outcomes of every pass that converted or
+    skipped anything. *polling* forces polling even where inotify works.
+    """
+
+    def __init__(
+        self,
+        inputs: Iterable[Path],
+        converter: MarkdownToWordConverter,
+        output_dir: Path | None = None,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+        workers: int | None = 1,
+        debounce: float = DEFAULT_DEBOUNCE_SECONDS,
+        poll_interval: float = DEFAULT_POLL_SECONDS,
+        polling: bool = False,
+        on_pass: Callable[[list[FileOutcome]], None] | None = None,
+        pool: WorkerPool | None = None,
+        limits: FileLimits | None = None,
+    ) -> None:
+        super().__init__(name="mdtoword-watch", daemon=True)
+        self.inputs = [Path(path).expanduser().resolve() for path in inputs]
+        if not any(path.exists() for path in self.inputs):
+            raise ValueError("none of the paths to watch exists")
+        if debounce < 0 or poll_interval <= 0:
+            raise ValueError("debounce must not be negative and poll_interval must be positive")
+        self.converter = converter
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.workers = workers
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.on_pass = on_pass
+        self.pool = pool
+        self.limits = limits
+        self.changes: _InotifyChanges | _PollingChanges = _PollingChanges(poll_interval)
+        if not polling:
+            try:
+                self.changes = _InotifyChanges()
+            except OSError:
+                pass
+        # Counters for whoever watches the watcher; written by its thread only.
+        self.passes = 0
+        self.converted = 0
+        self.failed = 0
+        self.last_outcomes: list[FileOutcome] = []
+        self.error: str | None = None
+        self._allocator = OutputAllocator(
+            None if output_dir is None else Path(output_dir).expanduser().resolve(), ".docx"
+        )
+        # Every source ever seen keeps its output, even while it is gone: a
+        # file renamed away and back must not come back as "name (2).docx".
+        self._outputs: dict[Path, Path] = {}
+        self._sources: list[Path] = []
+        # The local images each source showed when it was last converted,
+        # and the other way round: the sources that show each image.
+        self._images: dict[Path, set[Path]] = {}
+        self._users: dict[Path, set[Path]] = {}
+        self._tree_directories: set[Path] = set()
+        self._suffixes = supported_suffixes("md_to_word")
+        self._stopping = threading.Event()
+        self._progress: BatchProgress | None = None
+
+    @property
+    def backend(self) -> str:
+        """``"inotify"`` or ``"polling"``."""
+        return self.changes.backend
+
+    @property
+    def sources(self) -> list[Path]:
+        """The Markdown files being kept converted, in discovery order."""
+        return list(self._sources)
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop watching; a pass under way converts no further files."""
+        self._stopping.set()
+        progress = self._progress
+        if progress is not None:
+            progress.cancel()
+        self.changes.wake()
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self) -> None:
+        try:
+            self._pass(set(), rescan=True)
+            while not self._stopping.is_set():
+                changed, rescan = self._collect()
+                if self._stopping.is_set():
+                    break
+                self._pass(changed, rescan)
+        except Exception as error:
+            self.error = str(error) or type(error).__name__
+        finally:
+            self.changes.close()
+
+    def _collect(self) -> _Changes:
+        """Wait for a change, then for a quiet spell, merging everything seen."""
+        changed, rescan = self.changes.wait(None)
+        first = quiet = time.monotonic()
+        while not self._stopping.is_set():
+            remaining = min(quiet + self.debounce, first + _MAX_COALESCE_SECONDS)
+            remaining -= time.monotonic()
+            if remaining <= 0:
+                break
+            more, more_rescan = self.changes.wait(remaining)
+            if more or more_rescan:
+                changed |= more
+                rescan |= more_rescan
+                quiet = time.monotonic()
+        return changed, rescan
+
+    def _pass(self, changed: set[Path], rescan: bool) -> None:
+        known = set(self._sources)
+        # A Markdown file the watcher does not know may be a new source, and
+        # one it knows may be gone.
+        rescan = rescan or any(
+            path.suffix.lower() in self._suffixes and (path not in known or not path.is_file())
+            for path in changed
+        )
+        affected = {path for path in changed if path in known}
+        for path in changed:
+            affected.update(self._users.get(path, ()))
+        if rescan:
+            self._tree_directories = set()
+            for path in self.inputs:
+                if path.is_dir():
+                    self._tree_directories |= _tree_directories(path, self.exclude)
+            found = list(iter_sources(self.inputs, "md_to_word", self.include, self.exclude))
+            for source in found:
+                if source not in self._outputs:
+                    self._outputs[source] = self._allocator.allocate(source)
+                if source not in known:
+                    affected.add(source)
+            self._sources = found
+            known = set(found)
+            for source in set(self._images) - known:
+                del self._images[source]
+        jobs = [
+            (source, self._outputs[source])
+            for source in self._sources
+            if source in affected and source.is_file()
+        ]
+        self._watch()
+        if not jobs:
+            return
+
+        self._progress = BatchProgress()
+        if self._stopping.is_set():
+            return
+        outcomes = run_pipeline(
+            jobs,
+            self.converter,
+            self.workers,
+            incremental=True,
+            progress=self._progress,
+            pool=self.pool,
+            limits=self.limits,
+        )
+        for outcome in outcomes:
+            self._images[outcome.source] = {
+                Path(os.path.abspath(image)) for image in outcome.local_images
+            }
+        self._watch()
+        self.passes += 1
+        self.converted += sum(
+            1 for outcome in outcomes if outcome.error is None and not outcome.unchanged
+        )
+        self.failed += sum(1 for outcome in outcomes if outcome.error is not None)
+        self.last_outcomes = outcomes
+        if self.on_pass is not None:
+            self.on_pass(outcomes)
+
+    def _watch(self) -> None:
+        self._users = {}
+        for source, images in self._images.items():
+            for image in images:
+                self._users.setdefault(image, set()).add(source)
+        files = set(self._sources) | set(self._users)
+        directories = self._tree_directories | {path.parent for path in files}
+        directories = {path for path in directories if path.is_dir()}
+        try:
+            self.changes.watch(directories, files)
+        except OSError:
+            # Usually ENOSPC: the tree outgrew fs.inotify.max_user_watches.
+            # Polling has no such limit, so the watcher carries on with it.
+            if isinstance(self.changes, _PollingChanges):
+                raise
+            self.changes.close()
+            self.changes = _PollingChanges(self.poll_interval)
+            if self._stopping.is_set():
+                self.changes.wake()
+            self.changes.watch(directories, files)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Watch from the command line until Ctrl+C."""
+    parser = argparse.ArgumentParser(
+        prog="python -m mdtoword watch",
+        description="Convert Markdown files to Word, and again whenever they "
+        "or the images they show change.",
+    )
+    parser.add_argument("inputs", nargs="+", type=Path, help="files and directories to watch")
+    parser.add_argument(
+        "-o", "--output-dir", type=Path, help="write every .docx here instead of next to its source"
+    )
+    parser.add_argument("--font", default="Times New Roman", help="default font name")
+    parser.add_argument("--size", type=float, default=12, help="default font size in points")
+    parser.add_argument(
+        "--include", action="append", default=[], metavar="GLOB", help="only convert matching files"
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="skip matching files and directories",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE_SECONDS,
+        help="seconds without changes before converting (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--poll",
+        type=float,
+        metavar="SECONDS",
+        help="poll every SECONDS instead of using inotify",
+    )
+    args = parser.parse_args(argv)
+
+    def report(outcomes: list[FileOutcome]) -> None:
+        for outcome in outcomes:
+            if outcome.error is not None:
+                print(f"failed     {outcome.source}: {outcome.error}", file=sys.stderr)
+            elif not outcome.unchanged:
+                print(f"converted  {outcome.source} -> {outcome.output}", flush=True)
+
+    try:
+        watcher = Watcher(
+            args.inputs,
+            MarkdownToWordConverter(args.font, Pt(args.size), reuse_blocks=True),
+            output_dir=args.output_dir,
+            include=args.include,
+            exclude=args.exclude,
+            debounce=args.debounce,
+            poll_interval=DEFAULT_POLL_SECONDS if args.poll is None else args.poll,
+            polling=args.poll is not None,
+            on_pass=report,
+        )
+    except ValueError as error:
+        parser.error(str(error))
+    print(f"watching with {watcher.backend}; Ctrl+C stops", flush=True)
+    watcher.start()
+    try:
+        while watcher.is_alive():
+            watcher.join(0.5)
+    except KeyboardInterrupt:
+        watcher.stop()
+    if watcher.error is not None:
+        print(f"watching stopped: {watcher.error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,386 @@
+"""A pool of warm worker processes that outlives a single batch.
+
+``ProcessPoolExecutor`` treats its workers as interchangeable and fragile:
+it cannot retire one worker that has grown too large, and a worker that
+dies takes the whole executor down with it. This pool gives every worker
+process its own thread in the parent, which hands it one job at a time
+over a pipe, so each worker can be replaced on its own:
+
+* after ``max_jobs`` jobs, or once its peak RSS passes ``max_rss_bytes``
+  (where the platform reports it), the worker is retired and a fresh one
+  started straight away, before the next job needs it;
+* a worker that dies mid-job fails only that job, with ``WorkerCrashed``,
+  and is replaced the same way.
+
+A job can also carry its own limits, which is what makes a worker an
+isolation boundary rather than just a speed-up:
+
+* ``timeout`` -- seconds of wall-clock time from the moment a ready worker
+  takes the job; past it the worker is killed and the job fails with
+  ``JobTimedOut``;
+* ``max_rss_bytes`` -- a watchdog thread in the worker ends it the moment
+  its peak RSS passes the limit, and the job fails with
+  ``JobOutOfMemory``. Peak RSS comes from ``/proc`` or ``getrusage``, so
+  this limit is not enforced on Windows. A worker whose peak is already above a job's
+  limit is replaced before it takes that job.
+
+Workers are started when the pool is created and run ``initializer``
+before their first job -- imports, parser and template set-up -- so a
+long-lived pool turns that start-up cost into a one-off. Jobs are
+top-level functions and their arguments, pickled to the worker; the
+result is pickled back.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from concurrent.futures import Future
+import multiprocessing
+from multiprocessing.connection import Connection
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+DEFAULT_MAX_JOBS = 100
+DEFAULT_MAX_RSS_BYTES = 1024 * 1024 * 1024
+# How long a retired worker gets to exit on its own before it is killed.
+_EXIT_GRACE_SECONDS = 5
+# How often a worker's watchdog compares its peak RSS with the job's limit.
+_MEMORY_CHECK_SECONDS = 0.05
+# The exit code a worker's watchdog ends it with; distinguishes "over the
+# memory limit" from any other death.
+_OUT_OF_MEMORY_EXIT_CODE = 86
+
+
+# A queued job: the future to settle, the function, its arguments, and its
+# timeout and memory limit.
+_Job = tuple[Future[Any], Callable[..., Any], tuple, float | None, int | None]
+
+
+class WorkerCrashed(Exception):
+    """The worker process running a job exited before returning a result."""
+
+
+class JobTimedOut(Exception):
+    """A job ran past its timeout, and its worker was killed."""
+
+    def __init__(self, seconds: float) -> None:
+        super().__init__(f"job exceeded its time limit of {seconds:g} s")
+        self.seconds = seconds
+
+
+class JobOutOfMemory(Exception):
+    """A job pushed its worker's memory past the job's limit."""
+
+    def __init__(self, limit_bytes: int) -> None:
+        super().__init__(f"job exceeded its memory limit of {limit_bytes} bytes")
+        self.limit_bytes = limit_bytes
+
+
+def _peak_rss() -> int | None:
+    """This process's peak resident set size in bytes, if the OS reports it."""
+    # On Linux ``ru_maxrss`` survives exec, so a spawned worker would report
+    # its parent's peak; VmHWM belongs to the worker's own address space.
+    try:
+        with open("/proc/self/status", "rb") as status:
+            for line in status:
+                if line.startswith(b"VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux and the BSDs, bytes on macOS.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# The memory limit of the job a worker is running; read by its watchdog.
+_memory_limit: int | None = None
+
+
+def _watch_memory() -> None:
+    while True:
+        limit = _memory_limit
+        if limit is not None:
+            peak = _peak_rss()
+            if peak is not None and peak > limit:
+                os._exit(_OUT_OF_MEMORY_EXIT_CODE)
+        time.sleep(_MEMORY_CHECK_SECONDS)
+
+
+def _serve(connection: Connection, initializer: Callable[[], None] | None) -> None:
+    """Body of a worker process: run jobs until told to stop."""
+    global _memory_limit
+    if initializer is not None:
+        initializer()
+    if _peak_rss() is not None:
+        threading.Thread(target=_watch_memory, name="memory-watchdog", daemon=True).start()
+    # Ready: time spent starting up is not charged to the first job.
+    try:
+        connection.send(_peak_rss())
+    except OSError:
+        return  # retired before it was ever used
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        function, args, _memory_limit = job
+        try:
+            reply = (True, function(*args))
+        except Exception as error:
+            reply = (False, error)
+        peak = _peak_rss()
+        if _memory_limit is not None and peak is not None and peak > _memory_limit:
+            # Finished between two checks of the watchdog: still over.
+            os._exit(_OUT_OF_MEMORY_EXIT_CODE)
+        _memory_limit = None
+        connection.send((*reply, peak))
+
+
+class WorkerPool:
+    """Warm worker processes shared by any number of callers.
+
+    ``submit`` may be called from several threads at once; jobs queue in
+    the parent and go to whichever worker frees up first.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        initializer: Callable[[], None] | None = None,
+        max_jobs: int = DEFAULT_MAX_JOBS,
+        max_rss_bytes: int | None = DEFAULT_MAX_RSS_BYTES,
+    ) -> None:
+        if size < 1:
+            raise ValueError(f"size must be at least 1, got {size}")
+        if max_jobs < 1:
+            raise ValueError(f"max_jobs must be at least 1, got {max_jobs}")
+        self.initializer = initializer
+        self.max_jobs = max_jobs
+        self.max_rss_bytes = max_rss_bytes
+        # spawn, not fork, on every platform: the MCP server is multithreaded
+        # (anyio), and forking a multithreaded process can hand the child a
+        # lock some other thread was holding. Windows and macOS spawn anyway.
+        self._context = multiprocessing.get_context("spawn")
+        self._jobs: queue.SimpleQueue[_Job | None] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._workers: list[_Worker] = []
+        self._closed = False
+        self.ensure_size(size)
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return len(self._workers)
+
+    def ensure_size(self, size: int) -> None:
+        """Grow the pool to at least *size* workers; it never shrinks."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("the worker pool is closed")
+            while len(self._workers) < size:
+                worker = _Worker(self)
+                self._workers.append(worker)
+                worker.start()
+
+    def submit(
+        self,
+        function: Callable[..., Any],
+        *args: Any,
+        timeout: float | None = None,
+        max_rss_bytes: int | None = None,
+    ) -> Future[Any]:
+        """Run ``function(*args)`` in a worker; *function* must be top-level.
+
+        *timeout* and *max_rss_bytes* limit this job alone; see the module
+        docstring.
+        """
+        future: Future[Any] = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("the worker pool is closed")
+            self._jobs.put((future, function, args, timeout, max_rss_bytes))
+        return future
+
+    def worker_pids(self) -> list[int]:
+        """Process ids of the current workers, for diagnostics and tests."""
+        with self._lock:
+            workers = list(self._workers)
+        return [pid for worker in workers if (pid := worker.pid) is not None]
+
+    def close(self, cancel_queued: bool = False) -> None:
+        """Stop every worker once the queued jobs are done.
+
+        With *cancel_queued*, jobs no worker has started yet are cancelled
+        instead; jobs already running still finish.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers)
+        if cancel_queued:
+            while True:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None:
+                    job[0].cancel()
+        for _ in workers:
+            self._jobs.put(None)
+        for worker in workers:
+            worker.join()
+
+    def __enter__(self) -> WorkerPool:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class _Worker(threading.Thread):
+    """The parent-side thread that owns one worker process."""
+
+    def __init__(self, pool: WorkerPool) -> None:
+        super().__init__(name="mdtoword-worker", daemon=True)
+        self._pool = pool
+        self._process: multiprocessing.process.BaseProcess | None = None
+        self._connection: Connection | None = None
+        self._jobs_done = 0
+        self._spawn()
+
+    @property
+    def pid(self) -> int | None:
+        process = self._process
+        return None if process is None else process.pid
+
+    def run(self) -> None:
+        while True:
+            job = self._pool._jobs.get()
+            if job is None:
+                break
+            future, function, args, timeout, max_rss_bytes = job
+            if future.set_running_or_notify_cancel():
+                self._run_job(future, function, args, timeout, max_rss_bytes)
+        self._retire()
+
+    def _run_job(
+        self,
+        future: Future[Any],
+        function: Callable[..., Any],
+        args: tuple,
+        timeout: float | None,
+        max_rss_bytes: int | None,
+    ) -> None:
+        if max_rss_bytes is not None and (self._peak_rss or 0) > max_rss_bytes:
+            # Already past the limit: the watchdog would end it at once.
+            self._replace(retire=True)
+        if not self._await_ready(future):
+            return
+        assert self._process is not None and self._connection is not None
+        try:
+            self._connection.send((function, args, max_rss_bytes))
+        except Exception as error:
+            # Nothing was written: pickling happens before sending.
+            future.set_exception(error)
+            return
+        if timeout is not None and not self._connection.poll(timeout):
+            self._process.kill()
+            self._process.join()
+            future.set_exception(JobTimedOut(timeout))
+            self._replace(retire=False)
+            return
+        try:
+            succeeded, result, self._peak_rss = self._connection.recv()
+        except (EOFError, OSError):
+            self._process.join()
+            if self._process.exitcode == _OUT_OF_MEMORY_EXIT_CODE and max_rss_bytes:
+                future.set_exception(JobOutOfMemory(max_rss_bytes))
+            else:
+                future.set_exception(
+                    WorkerCrashed(f"worker process exited with code {self._process.exitcode}")
+                )
+            self._replace(retire=False)
+            return
+        if succeeded:
+            future.set_result(result)
+        else:
+            future.set_exception(result)
+        # Recycling happens after the result is out, so it never delays one.
+        self._jobs_done += 1
+        limit = self._pool.max_rss_bytes
+        if self._jobs_done >= self._pool.max_jobs or (
+            limit is not None and self._peak_rss is not None and self._peak_rss > limit
+        ):
+            self._replace(retire=True)
+
+    def _await_ready(self, future: Future[Any]) -> bool:
+        """Wait for a fresh worker to finish starting up; False if it died."""
+        if self._ready:
+            return True
+        assert self._process is not None and self._connection is not None
+        try:
+            self._peak_rss = self._connection.recv()
+            self._ready = True
+        except (EOFError, OSError):
+            self._process.join()
+            future.set_exception(
+                WorkerCrashed(
+                    f"worker process exited with code {self._process.exitcode} "
+                    "while starting up"
+                )
+            )
+            self._replace(retire=False)
+            return False
+        return True
+
+    def _spawn(self) -> None:
+        parent_end, child_end = self._pool._context.Pipe()
+        process = self._pool._context.Process(
+            target=_serve,
+            args=(child_end, self._pool.initializer),
+            name="mdtoword-worker",
+            daemon=True,
+        )
+        process.start()
+        child_end.close()
+        self._process, self._connection = process, parent_end
+        self._jobs_done = 0
+        # Not a readiness flag: stays None where peak RSS cannot be measured.
+        self._ready = False
+        self._peak_rss: int | None = None
+
+    def _replace(self, retire: bool) -> None:
+        if retire:
+            self._retire()
+        elif self._connection is not None:
+            self._connection.close()
+        self._spawn()
+
+    def _retire(self) -> None:
+        process, connection = self._process, self._connection
+        self._process = self._connection = None
+        if process is None or connection is None:
+            return
+        try:
+            connection.send(None)
+        except OSError:
+            pass
+        connection.close()
+        process.join(_EXIT_GRACE_SECONDS)
+        if process.is_alive():
+            process.kill()
+            process.join()
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
-from collections.abc import Iterable, Sequence
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from fnmatch import fnmatch
+import os
 from pathlib import Path
 
+# Listing directories is I/O-bound, and on a network mount mostly waiting on
+# round trips, so more threads than cores pay off.
+_DISCOVERY_WORKERS = 16
 
 _SUPPORTED_SUFFIXES = {
     "md_to_word": frozenset({".md", ".markdown"}),
@@ -18,43 +24,179 @@ def supported_suffixes(mode: str) -> frozenset[str]:
         raise ValueError(f"Unsupported conversion mode: {mode}") from error
 
 
-def discover_sources(paths: Iterable[Path], mode: str) -> list[Path]:
-    """Recursively collect unique, supported source files in canonical order."""
+def discover_sources(
+    paths: Iterable[Path],
+    mode: str,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+) -> list[Path]:
+    """Recursively collect unique, supported source files in canonical order.
+
+    The same files as ``iter_sources``, collected and sorted.
+    """
+    return sorted(set(iter_sources(paths, mode, include, exclude)))
+
+
+def iter_sources(
+    paths: Iterable[Path],
+    mode: str,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+) -> Iterator[Path]:
+    """Yield unique, supported source files as soon as they are found.
+
+    Directories are walked with ``os.scandir`` on a thread pool: every
+    subdirectory is listed as soon as its parent has been, concurrently
+    with its siblings, and the type of each entry comes from the directory
+    listing instead of a ``stat`` per file. Files are still yielded in a
+    fixed order -- inputs in sorted order, each directory depth-first by
+    name -- which is the canonical order of ``discover_sources`` except
+    where a symlink leads elsewhere. Symlinked files are followed,
+    symlinked directories are not, as with ``Path.rglob``.
+
+    *include* and *exclude* are glob patterns matched against an entry's
+    name and against its path relative to the scanned directory, e.g.
+    ``node_modules``, ``.git`` or ``drafts/*.md``. An excluded directory is
+    not entered at all; with *include*, only files matching one of its
+    patterns are kept. Files passed explicitly in *paths* are always kept.
+    """
     suffixes = supported_suffixes(mode)
-    sources: set[Path] = set()
-
-    for path in paths:
-        if path.is_file():
-            candidates = (path,)
-        elif path.is_dir():
-            candidates = path.rglob("*")
-        else:
-            continue
+    seen: set[Path] = set()
+    pool = ThreadPoolExecutor(_DISCOVERY_WORKERS)
+    walker = _Walker(pool, suffixes, tuple(include), tuple(exclude))
+    try:
+        for path in sorted({path.resolve() for path in paths}):
+            if path.is_file():
+                candidates: Iterable[Path] = (
+                    (path,) if path.suffix.lower() in suffixes else ()
+                )
+            elif path.is_dir():
+                candidates = walker.walk(path)
+            else:
+                continue
+            for candidate in candidates:
+                if candidate not in seen:
+                    seen.add(candidate)
+                    yield candidate
+    finally:
+        # A consumer that stops early must not wait for the rest of the tree.
+        pool.shutdown(cancel_futures=True)
+
+
+# A directory listing: its matching files and, for every subdirectory, the
+# pending listing of that subdirectory, all in name order.
+_Listing = list["Path | Future[_Listing]"]
+
+
+class _Walker:
+    """Lists directory trees in parallel and replays them in order."""
+
+    def __init__(
+        self,
+        pool: ThreadPoolExecutor,
+        suffixes: frozenset[str],
+        include: tuple[str, ...],
+        exclude: tuple[str, ...],
+    ) -> None:
+        self._pool = pool
+        self._suffixes = suffixes
+        self._include = include
+        self._exclude = exclude
+
+    def walk(self, root: Path) -> Iterator[Path]:
+        stack: list[Iterator[Path | Future[_Listing]]] = [
+            iter([self._pool.submit(self._scan, root, "")])
+        ]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+            elif isinstance(item, Future):
+                stack.append(iter(item.result()))
+            else:
+                yield item
+
+    def _scan(self, directory: Path, relative: str) -> _Listing:
+        """List one directory, submitting the listing of its subdirectories.
+
+        *directory* is already resolved, so its entries need resolving only
+        when they are symlinks themselves.
+        """
+        listing: _Listing = []
+        try:
+            with os.scandir(directory) as scan:
+                entries = sorted(scan, key=lambda entry: os.path.normcase(entry.name))
+        except OSError:
+            # Unreadable directories are skipped, as rglob skips them.
+            return listing
+        for entry in entries:
+            entry_relative = f"{relative}{entry.name}"
+            if self._matches(self._exclude, entry.name, entry_relative):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    listing.append(
+                        self._pool.submit(
+                            self._scan, directory / entry.name, f"{entry_relative}/"
+                        )
+                    )
+                    continue
+                if (
+                    os.path.splitext(entry.name)[1].lower() not in self._suffixes
+                    or not entry.is_file()
+                ):
+                    continue
+            except OSError:
+                continue
+            except RuntimeError:
+                # The pool was shut down: nobody is waiting for this walk.
+                return listing
+            if self._include and not self._matches(
+                self._include, entry.name, entry_relative
+            ):
+                continue
+            path = directory / entry.name
+            listing.append(path.resolve() if entry.is_symlink() else path)
+        return listing
+
+    @staticmethod
+    def _matches(patterns: tuple[str, ...], name: str, relative: str) -> bool:
+        return any(
+            fnmatch(name, pattern) or fnmatch(relative, pattern) for pattern in patterns
+        )
+
+
+class OutputAllocator:
+    """Allocates output paths one input at a time, avoiding batch collisions.
+
+    Feeding it inputs in a fixed order gives the same paths as
+    ``resolve_output_paths`` on the same list, so inputs can be allocated
+    as they are discovered.
+    """
+
+    def __init__(self, output_directory: Path | None, suffix: str) -> None:
+        self._output_directory = output_directory
+        self._suffix = suffix
+        self._allocated: set[Path] = set()
+
+    def allocate(self, source: Path) -> Path:
+        directory = (
+            self._output_directory if self._output_directory is not None else source.parent
+        )
+        candidate = directory / f"{source.stem}{self._suffix}"
+        index = 2
 
-        for candidate in candidates:
-            if candidate.is_file() and candidate.suffix.lower() in suffixes:
-                sources.add(candidate.resolve())
+        while candidate in self._allocated:
+            candidate = directory / f"{source.stem} ({index}){self._suffix}"
+            index += 1
 
-    return sorted(sources)
+        self._allocated.add(candidate)
+        return candidate
 
 
 def resolve_output_paths(
     inputs: Sequence[Path], output_directory: Path | None, suffix: str
 ) -> dict[Path, Path]:
     """Allocate one output path for every input without batch name collisions."""
-    allocated: set[Path] = set()
-    outputs: dict[Path, Path] = {}
-
-    for source in inputs:
-        directory = output_directory if output_directory is not None else source.parent
-        candidate = directory / f"{source.stem}{suffix}"
-        index = 2
-
-        while candidate in allocated:
-            candidate = directory / f"{source.stem} ({index}){suffix}"
-            index += 1
-
-        allocated.add(candidate)
-        outputs[source] = candidate
-
-    return outputs
+    allocator = OutputAllocator(output_directory, suffix)
+    return {source: allocator.allocate(source) for source in inputs}
@@ -0,0 +1,206 @@
+"""Тесты пакетного движка.
+
+Как и ``tests/test_converters.py``, модуль не импортирует ни ``mdtoword.app``,
+ни ``mdtoword.mcp_server``: движок обязан работать без PyQt6 и без SDK ``mcp``.
+"""
+
+from pathlib import Path
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from docx import Document
+
+from mdtoword.batch import (
+    BatchProgress,
+    FileLimits,
+    new_worker_pool,
+    run_batch,
+    run_pipeline,
+)
+from mdtoword.converters import MarkdownToWordConverter
+from mdtoword.workflow import resolve_output_paths
+
+
+class RunBatchTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.root = Path(self._tmpdir.name)
+
+    def write_sources(self) -> list[Path]:
+        first = self.root / "a.md"
+        broken = self.root / "b.md"
+        last = self.root / "c.md"
+        first.write_text("# Первый", encoding="utf-8")
+        broken.write_bytes(b"\xff\xfe\x00 invalid utf-8")
+        last.write_text("![diagram](missing.png)", encoding="utf-8")
+        return [first, broken, last]
+
+    def test_parallel_batch_keeps_source_order_and_isolates_failures(self) -> None:
+        sources = self.write_sources()
+        outputs = resolve_output_paths(sources, None, ".docx")
+
+        outcomes = run_batch(sources, outputs, MarkdownToWordConverter(), workers=2)
+
+        self.assertEqual([outcome.source for outcome in outcomes], sources)
+        self.assertIsNone(outcomes[0].error)
+        self.assertTrue(outcomes[1].error)
+        self.assertEqual(outcomes[2].warnings, ["Image not found: missing.png"])
+        self.assertEqual(Document(str(outputs[sources[0]])).paragraphs[0].text, "Первый")
+        self.assertFalse(outputs[sources[1]].exists())
+
+    def test_parallel_and_sequential_batches_report_the_same_outcomes(self) -> None:
+        sources = self.write_sources()
+        outputs = resolve_output_paths(sources, None, ".docx")
+        converter = MarkdownToWordConverter()
+
+        parallel = run_batch(sources, outputs, converter, workers=3)
+        sequential = run_batch(sources, outputs, converter, workers=1)
+
+        self.assertEqual(parallel, sequential)
+
+    def test_pipeline_converts_while_jobs_are_still_arriving(self) -> None:
+        sources = []
+        for name in ("a", "b", "c"):
+            source = self.root / f"{name}.md"
+            source.write_text(f"# {name}", encoding="utf-8")
+            sources.append(source)
+        outputs = resolve_output_paths(sources, None, ".docx")
+
+        def discovery():
+            yield sources[0], outputs[sources[0]]
+            yield sources[1], outputs[sources[1]]
+            # Последний файл «находится» только после того, как первый уже
+            # сконвертирован: без потоковой обработки этого не дождаться.
+            deadline = time.monotonic() + 60
+            while not outputs[sources[0]].exists():
+                self.assertLess(time.monotonic(), deadline, "nothing converted yet")
+                time.sleep(0.05)
+            yield sources[2], outputs[sources[2]]
+
+        outcomes = run_pipeline(discovery(), MarkdownToWordConverter(), workers=2)
+
+        self.assertEqual([outcome.source for outcome in outcomes], sources)
+        self.assertTrue(all(outcome.error is None for outcome in outcomes))
+
+    def test_a_warm_pool_is_reused_across_batches(self) -> None:
+        sources = self.write_sources()
+        outputs = resolve_output_paths(sources, None, ".docx")
+        converter = MarkdownToWordConverter()
+        pool = new_worker_pool(2)
+        self.addCleanup(pool.close)
+        jobs = [(source, outputs[source]) for source in sources]
+
+        first = run_pipeline(jobs, converter, workers=2, pool=pool)
+        pids = pool.worker_pids()
+        second = run_pipeline(jobs, converter, workers=2, pool=pool)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first, run_batch(sources, outputs, converter, workers=1))
+        self.assertEqual(pool.worker_pids(), pids)
+
+    def test_a_shared_pool_is_not_grown_past_its_size(self) -> None:
+        sources = self.write_sources()
+        outputs = resolve_output_paths(sources, None, ".docx")
+        converter = MarkdownToWordConverter()
+        pool = new_worker_pool(1)
+        self.addCleanup(pool.close)
+
+        outcomes = run_pipeline(
+            [(source, outputs[source]) for source in sources],
+            converter,
+            workers=500,
+            pool=pool,
+        )
+
+        self.assertEqual(pool.size, 1)
+        self.assertEqual(outcomes, run_batch(sources, outputs, converter, workers=1))
+
+    def test_the_converter_goes_to_each_worker_once(self) -> None:
+        sources = self.write_sources()
+        outputs = resolve_output_paths(sources, None, ".docx")
+        converter = MarkdownToWordConverter()
+        # Воркер заменяется после каждого файла: новому конвертер не знаком.
+        pool = new_worker_pool(1, max_jobs=1)
+        self.addCleanup(pool.close)
+        submitted = []
+        submit = pool.submit
+
+        def spy(function, key, payload, *args, **limits):
+            submitted.append(payload is not None)
+            return submit(function, key, payload, *args, **limits)
+
+        with mock.patch.object(pool, "submit", spy):
+            outcomes = run_pipeline(
+                [(source, outputs[source]) for source in sources],
+                converter,
+                workers=1,
+                pool=pool,
+                limits=FileLimits(seconds=60),
+            )
+
+        self.assertEqual(outcomes, run_batch(sources, outputs, converter, workers=1))
+        # Первая задача несёт конвертер, две следующие — сначала без него.
+        self.assertEqual(submitted, [True, False, True, False, True])
+
+    def test_a_file_over_its_time_limit_fails_with_the_reason(self) -> None:
+        sources = []
+        for name in ("a", "b"):
+            source = self.root / f"{name}.md"
+            source.write_text(
+                "# Заголовок\n\n| a | b |\n| - | - |\n| 1 | 2 |\n", encoding="utf-8"
+            )
+            sources.append(source)
+        outputs = resolve_output_paths(sources, None, ".docx")
+
+        # Никакой рендер docx не укладывается в миллисекунду.
+        outcomes = run_batch(
+            sources,
+            outputs,
+            MarkdownToWordConverter(),
+            workers=1,
+            limits=FileLimits(seconds=0.001),
+        )
+
+        self.assertEqual([outcome.source for outcome in outcomes], sources)
+        self.assertEqual(
+            [outcome.error for outcome in outcomes],
+            ["Conversion timed out after 0.001 s"] * 2,
+        )
+
+    def test_a_file_within_its_limits_converts_as_usual(self) -> None:
+        sources = self.write_sources()
+        outputs = resolve_output_paths(sources, None, ".docx")
+        converter = MarkdownToWordConverter()
+
+        limited = run_batch(
+            sources, outputs, converter, workers=1, limits=FileLimits(60, 2**31)
+        )
+
+        self.assertEqual(limited, run_batch(sources, outputs, converter, workers=1))
+
+    def test_a_cancelled_pipeline_finishes_only_the_files_it_started(self) -> None:
+        sources = self.write_sources()
+        outputs = resolve_output_paths(sources, None, ".docx")
+        # Отмена сразу после первого готового файла.
+        progress = BatchProgress(lambda progress: progress.cancel())
+
+        outcomes = run_pipeline(
+            ((source, outputs[source]) for source in sources),
+            MarkdownToWordConverter(),
+            workers=1,
+            progress=progress,
+        )
+
+        self.assertEqual([outcome.source for outcome in outcomes], sources[:1])
+        self.assertFalse(outputs[sources[2]].exists())
+
+    def test_worker_count_below_one_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            run_batch([], {}, MarkdownToWordConverter(), workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+"""Тесты командной строки ``python -m mdtoword convert``.
+
+Как и ``tests/test_batch.py``, модуль не импортирует ни ``mdtoword.app``, ни
+``mdtoword.mcp_server`` напрямую: командная строка работает без PyQt6 и SDK
+``mcp``. Сверка с ``ConversionReport`` пропускается, если SDK не установлен.
+"""
+
+from contextlib import redirect_stderr, redirect_stdout
+import io
+import json
+import multiprocessing
+from pathlib import Path
+import runpy
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from docx import Document
+
+from mdtoword.cli import main
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+class ConvertCommandTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.root = Path(self._tmpdir.name).resolve()
+        (self.root / "docs" / "guide").mkdir(parents=True)
+        (self.root / "docs" / "intro.md").write_text(
+            "# Введение\n\n![схема](missing.png)\n", encoding="utf-8"
+        )
+        (self.root / "docs" / "guide" / "setup.md").write_text(
+            "# Установка\n", encoding="utf-8"
+        )
+
+    def run_cli(self, *argv: str) -> tuple[int, str, str]:
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            status = main(list(argv))
+        return status, stdout.getvalue(), stderr.getvalue()
+
+    def test_json_report_lists_every_converted_file(self) -> None:
+        status, stdout, _ = self.run_cli(str(self.root / "docs"), "--json", "--jobs", "1")
+
+        report = json.loads(stdout)
+        self.assertEqual(status, 0)
+        self.assertEqual(report["sources_found"], 2)
+        self.assertEqual(
+            [entry["source"] for entry in report["converted"]],
+            [str(self.root / "docs" / "guide" / "setup.md"), str(self.root / "docs" / "intro.md")],
+        )
+        self.assertEqual(report["converted"][1]["warnings"], ["Image not found: missing.png"])
+        self.assertEqual(
+            Document(self.root / "docs" / "intro.docx").paragraphs[0].text, "Введение"
+        )
+
+    def test_json_report_has_the_shape_of_the_mcp_report(self) -> None:
+        try:
+            from mdtoword.mcp_server import ConversionReport
+        except ImportError:  # pragma: no cover
+            self.skipTest("SDK mcp не установлен")
+        _, stdout, _ = self.run_cli(str(self.root / "docs"), "--json", "--jobs", "1")
+
+        report = json.loads(stdout)
+        self.assertEqual(ConversionReport.model_validate(report).model_dump(), report)
+
+    def test_incremental_run_reports_up_to_date_files_as_unchanged(self) -> None:
+        output_dir = self.root / "out"
+        arguments = (str(self.root / "docs"), "-o", str(output_dir), "--incremental")
+        self.run_cli(*arguments)
+
+        status, stdout, _ = self.run_cli(*arguments, "--json")
+
+        report = json.loads(stdout)
+        self.assertEqual(status, 0)
+        self.assertEqual(report["converted"], [])
+        self.assertEqual(
+            sorted(Path(entry["output"]).name for entry in report["unchanged"]),
+            ["intro.docx", "setup.docx"],
+        )
+
+    def test_a_failed_file_makes_the_exit_status_one(self) -> None:
+        (self.root / "docs" / "broken.docx").write_bytes(b"not a zip archive")
+
+        status, stdout, stderr = self.run_cli(str(self.root / "docs"), "--to-markdown")
+
+        self.assertEqual(status, 1)
+        self.assertIn("broken.docx", stderr)
+        self.assertIn("0 converted, 0 unchanged, 1 failed", stdout)
+
+    def test_inputs_matching_nothing_make_the_exit_status_one(self) -> None:
+        status, _, stderr = self.run_cli(str(self.root / "нет-такого"))
+
+        self.assertEqual(status, 1)
+        self.assertIn("no supported files", stderr)
+        self.assertFalse((self.root / "out").exists())
+
+    def test_zero_jobs_is_a_usage_error(self) -> None:
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit) as raised:
+            main([str(self.root / "docs"), "--jobs", "0"])
+
+        self.assertEqual(raised.exception.code, 2)
+
+    def test_an_output_dir_that_cannot_be_created_is_a_usage_error(self) -> None:
+        (self.root / "out").write_text("это файл, а не папка", encoding="utf-8")
+        stderr = io.StringIO()
+
+        with redirect_stderr(stderr), self.assertRaises(SystemExit) as raised:
+            main([str(self.root / "docs"), "-o", str(self.root / "out" / "word")])
+
+        self.assertEqual(raised.exception.code, 2)
+        self.assertIn("--output-dir", stderr.getvalue())
+
+    def test_module_entry_point_converts_in_parallel_without_the_gui(self) -> None:
+        # Воркеры (spawn) исполняют __main__ заново: GUI не должен попасть ни
+        # в них, ни в сам процесс командной строки.
+        script = (
+            "import runpy, sys\n"
+            "sys.argv = ['mdtoword', 'convert', sys.argv[1], '--jobs', '2', '--json']\n"
+            "try:\n"
+            "    runpy.run_module('mdtoword', run_name='__main__', alter_sys=True)\n"
+            "finally:\n"
+            "    loaded = [m for m in ('PyQt6', 'mcp') if m in sys.modules]\n"
+            "    print(loaded, file=sys.stderr)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script, str(self.root / "docs")],
+            capture_output=True,
+            text=True,
+            cwd=_REPO_ROOT,
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(len(json.loads(result.stdout)["converted"]), 2)
+        self.assertTrue(result.stderr.rstrip().endswith("[]"), result.stderr)
+
+    def test_module_entry_point_calls_freeze_support_before_dispatching(self) -> None:
+        # В собранном exe воркер — это тот же exe; без freeze_support() он
+        # дошёл бы до разбора аргументов и открыл GUI.
+        calls = []
+
+        def convert(argv: list[str]) -> int:
+            calls.append("convert")
+            return 0
+
+        with (
+            mock.patch.object(
+                multiprocessing, "freeze_support", side_effect=lambda: calls.append("freeze")
+            ),
+            mock.patch("mdtoword.cli.main", convert),
+            mock.patch.object(sys, "argv", ["mdtoword", "convert", "x.md"]),
+            self.assertRaises(SystemExit),
+        ):
+            runpy.run_module("mdtoword", run_name="__main__")
+
+        self.assertEqual(calls, ["freeze", "convert"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,8 @@
 from pathlib import Path
+import sys
 import unittest
 
-from mdtoword.workflow import discover_sources, resolve_output_paths
+from mdtoword.workflow import discover_sources, iter_sources, resolve_output_paths
 
 
 class ConversionWorkflowTests(unittest.TestCase):
@@ -20,6 +21,68 @@ class ConversionWorkflowTests(unittest.TestCase):
 
         self.assertEqual(discovered, [first.resolve(), second.resolve()])
 
+    def test_exclude_prunes_directories_and_include_filters_files(self):
+        root = Path(self._tmpdir.name)
+        for relative in (
+            "docs/guide.md",
+            "docs/drafts/wip.md",
+            "node_modules/pkg/README.md",
+            ".git/notes.md",
+            "CHANGELOG.md",
+        ):
+            path = root / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("# test", encoding="utf-8")
+
+        excluded = discover_sources([root], "md_to_word", exclude=["node_modules", ".git"])
+        included = discover_sources(
+            [root], "md_to_word", include=["docs/*.md"], exclude=["drafts"]
+        )
+
+        self.assertEqual(
+            excluded,
+            [
+                (root / relative).resolve()
+                for relative in ("CHANGELOG.md", "docs/drafts/wip.md", "docs/guide.md")
+            ],
+        )
+        self.assertEqual(included, [(root / "docs/guide.md").resolve()])
+
+    def test_sources_stream_in_canonical_order(self):
+        root = Path(self._tmpdir.name)
+        for relative in ("b.md", "a/z.md", "a.md", "a/b/c.md", "ab/x.md"):
+            path = root / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("# test", encoding="utf-8")
+
+        streamed = list(iter_sources([root / "ab", root], "md_to_word"))
+
+        self.assertEqual(streamed, discover_sources([root], "md_to_word"))
+
+    def test_explicit_files_bypass_the_patterns(self):
+        root = Path(self._tmpdir.name)
+        source = root / "notes.md"
+        source.write_text("# test", encoding="utf-8")
+
+        discovered = discover_sources([source], "md_to_word", exclude=["*.md"])
+
+        self.assertEqual(discovered, [source.resolve()])
+
+    @unittest.skipIf(sys.platform == "win32", "symlinks need privileges on Windows")
+    def test_symlinked_files_are_followed_and_symlinked_directories_are_not(self):
+        root = Path(self._tmpdir.name)
+        real = root / "real"
+        real.mkdir()
+        (real / "doc.md").write_text("# test", encoding="utf-8")
+        tree = root / "tree"
+        tree.mkdir()
+        (tree / "linked.md").symlink_to(real / "doc.md")
+        (tree / "linked-dir").symlink_to(real, target_is_directory=True)
+
+        discovered = discover_sources([tree], "md_to_word")
+
+        self.assertEqual(discovered, [(real / "doc.md").resolve()])
+
     def test_selected_output_directory_allocates_collision_suffixes(self):
         root = Path(self._tmpdir.name)
         left = root / "left" / "report.md"
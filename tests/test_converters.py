@@ -4,11 +4,14 @@
 от PyQt6, и этот файл — исполняемое доказательство того, что не зависит.
 """
 
+from io import BytesIO
+import os
 from pathlib import Path
 import subprocess
 import sys
 import tempfile
 import unittest
+from unittest import mock
 
 from docx import Document
 
@@ -43,6 +46,29 @@ class MarkdownToWordConverterTests(unittest.TestCase):
         self.assertEqual(warnings, ["Image not found: missing.png"])
         self.assertTrue(output.is_file())
 
+    def test_convert_reports_the_size_and_save_time_of_the_output(self) -> None:
+        source = self.root / "source.md"
+        source.write_text("# Заголовок", encoding="utf-8")
+        output = self.root / "source.docx"
+
+        result = MarkdownToWordConverter().convert(source, output)
+
+        self.assertEqual(result.output_bytes, output.stat().st_size)
+        self.assertGreater(result.save_seconds, 0)
+
+    def test_convert_content_writes_into_a_stream_with_the_chosen_compression(self) -> None:
+        stored, deflated = BytesIO(), BytesIO()
+
+        MarkdownToWordConverter(compression="stored").convert_content("# Заголовок", stored)
+        MarkdownToWordConverter(compression="best").convert_content("# Заголовок", deflated)
+
+        self.assertGreater(len(stored.getvalue()), len(deflated.getvalue()))
+        self.assertEqual(Document(stored).paragraphs[0].text, "Заголовок")
+
+    def test_unknown_compression_is_rejected_up_front(self) -> None:
+        with self.assertRaises(ValueError):
+            MarkdownToWordConverter(compression="zstd")
+
     def test_missing_source_raises_conversion_error(self) -> None:
         missing = self.root / "нет-такого.md"
         with self.assertRaises(OSError) as underlying:
@@ -65,13 +91,71 @@ class MarkdownToWordConverterTests(unittest.TestCase):
     def test_unwritable_output_raises_conversion_error(self) -> None:
         source = self.root / "source.md"
         source.write_text("# Заголовок", encoding="utf-8")
-        # Каталог вместо файла: python-docx не может писать поверх директории.
+        # Каталог вместо файла: переименовать поверх директории нельзя.
         blocked = self.root / "blocked.docx"
         blocked.mkdir()
 
         with self.assertRaises(ConversionError):
             MarkdownToWordConverter().convert_file(source, blocked)
 
+    def test_interrupted_save_keeps_the_previous_output(self) -> None:
+        source = self.root / "source.md"
+        source.write_text("# Заголовок", encoding="utf-8")
+        output = self.root / "source.docx"
+        output.write_bytes(b"previous")
+
+        def fail_midway(document, stream, compression) -> None:
+            stream.write(b"PK\x03\x04 truncated")
+            raise OSError("disk full")
+
+        with mock.patch("mdtoword.converters.save_document", fail_midway):
+            with self.assertRaises(ConversionError):
+                MarkdownToWordConverter().convert_file(source, output)
+
+        self.assertEqual(output.read_bytes(), b"previous")
+        self.assertEqual(
+            sorted(path.name for path in self.root.iterdir()), ["source.docx", "source.md"]
+        )
+
+    @unittest.skipIf(sys.platform == "win32", "POSIX permissions")
+    def test_output_gets_the_usual_permissions(self) -> None:
+        output = self.root / "out.docx"
+        umask = os.umask(0o022)
+        self.addCleanup(os.umask, umask)
+
+        MarkdownToWordConverter().convert_content("# Заголовок", output)
+
+        self.assertEqual(output.stat().st_mode & 0o777, 0o644)
+
+    def test_files_above_the_threshold_are_streamed_to_the_same_document(self) -> None:
+        source = self.root / "source.md"
+        source.write_text(
+            "# Заголовок\n\nСноска[^1].\n\n![diagram](missing.png)\n\n[^1]: Текст сноски.\n",
+            encoding="utf-8",
+        )
+        whole = self.root / "whole.docx"
+        streamed = self.root / "streamed.docx"
+
+        whole_warnings = MarkdownToWordConverter().convert_file(source, whole)
+        streamed_warnings = MarkdownToWordConverter(streaming_threshold=0).convert_file(
+            source, streamed
+        )
+
+        self.assertEqual(streamed_warnings, whole_warnings)
+        self.assertEqual(
+            [p.text for p in Document(str(streamed)).paragraphs],
+            [p.text for p in Document(str(whole)).paragraphs],
+        )
+
+    def test_non_utf8_source_raises_conversion_error_when_streamed(self) -> None:
+        source = self.root / "source.md"
+        source.write_bytes(b"\xff\xfe\x00 invalid utf-8")
+
+        with self.assertRaises(ConversionError):
+            MarkdownToWordConverter(streaming_threshold=0).convert_file(
+                source, self.root / "out.docx"
+            )
+
     def test_font_settings_reach_the_rendered_document(self) -> None:
         output = self.root / "styled.docx"
 
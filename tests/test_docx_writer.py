@@ -0,0 +1,77 @@
+from io import BytesIO
+from pathlib import Path
+import tempfile
+import unittest
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+from docx import Document
+from docx.shared import Pt
+
+from mdtoword.docx_writer import COMPRESSION_LEVELS, save_document
+from mdtoword.gfm_renderer import GfmDocxRenderer
+
+_MINIMAL_PNG = (
+    b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01"
+    b"\x08\x06\x00\x00\x00\x1f\x15\xc4\x89\x00\x00\x00\nIDATx\x9cc\x00\x01"
+    b"\x00\x00\x05\x00\x01\x05-\xb4\x00\x00\x00\x00\x00IEND\xaeB`\x82"
+)
+
+
+class SaveDocumentTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        root = Path(self._tmpdir.name)
+        (root / "logo.png").write_bytes(_MINIMAL_PNG)
+        markdown = "# Заголовок\n\n" + "Абзац с [ссылкой](https://example.com).\n\n" * 200
+        self.document, _ = GfmDocxRenderer("Arial", Pt(12)).render(
+            markdown + "![logo](logo.png)", source_path=root / "source.md"
+        )
+
+    def save(self, compression: str) -> bytes:
+        buffer = BytesIO()
+        save_document(self.document, buffer, compression)
+        self.assertFalse(buffer.closed)
+        return buffer.getvalue()
+
+    def test_every_level_writes_the_same_package_as_python_docx(self) -> None:
+        reference = BytesIO()
+        self.document.save(reference)
+        with ZipFile(reference) as expected:
+            members = {name: expected.read(name) for name in expected.namelist()}
+
+        for compression in COMPRESSION_LEVELS:
+            with self.subTest(compression=compression):
+                with ZipFile(BytesIO(self.save(compression))) as written:
+                    self.assertEqual(written.namelist(), list(members))
+                    for name, data in members.items():
+                        self.assertEqual(written.read(name), data, name)
+
+    def test_levels_trade_size_for_speed(self) -> None:
+        sizes = {level: len(self.save(level)) for level in COMPRESSION_LEVELS}
+
+        self.assertGreater(sizes["stored"], sizes["fast"])
+        self.assertGreater(sizes["fast"], sizes["default"])
+        self.assertGreaterEqual(sizes["default"], sizes["best"])
+
+    def test_fast_stores_images_and_deflates_xml(self) -> None:
+        with ZipFile(BytesIO(self.save("fast"))) as written:
+            methods = {info.filename: info.compress_type for info in written.infolist()}
+
+        self.assertEqual(methods["word/media/image1.png"], ZIP_STORED)
+        self.assertEqual(methods["word/document.xml"], ZIP_DEFLATED)
+
+    def test_a_saved_file_opens_again(self) -> None:
+        path = Path(self._tmpdir.name) / "out.docx"
+
+        save_document(self.document, path, "best")
+
+        self.assertEqual(Document(str(path)).paragraphs[0].text, "Заголовок")
+
+    def test_unknown_level_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            save_document(self.document, BytesIO(), "maximum")
+
+
+if __name__ == "__main__":
+    unittest.main()
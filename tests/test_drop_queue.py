@@ -1,3 +1,5 @@
+import threading
+import time
 import unittest
 from unittest.mock import patch
 import tempfile
@@ -13,6 +15,14 @@ from mdtoword.theme import ThemeManager
 from mdtoword.app import ConverterGUI, DropFileList
 
 
+def convert_and_wait(window):
+    """Запустить конвертацию очереди и дождаться её итога в главном потоке."""
+    window._convert_files()
+    if window._batch is not None:
+        window._batch.wait()
+    QApplication.processEvents()
+
+
 class DropFileListTests(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -241,22 +251,25 @@ class DropFileListTests(unittest.TestCase):
             a_md.write_text("# a", encoding="utf-8")
             b_md.write_text("# b", encoding="utf-8")
             window._add_sources([str(a_md)])
+            # Один воркер: файлы конвертируются в потоке прогона, и подмена
+            # метода конвертера действует (в процесс-воркер она не попадёт).
+            window.workers = 1
 
-            original_convert_file = window.converter.convert_file
+            original_convert = window.converter.convert
             calls: list[Path] = []
 
             def mutate_then_convert(source, output):
                 calls.append(source)
                 if len(calls) == 1:
                     window.selected_files.append(b_md.resolve())
-                return original_convert_file(source, output)
+                return original_convert(source, output)
 
             with patch.object(
-                window.converter, "convert_file", side_effect=mutate_then_convert
+                window.converter, "convert", side_effect=mutate_then_convert
             ), patch("mdtoword.app.QMessageBox.information") as mock_info, patch(
                 "mdtoword.app.QMessageBox.warning"
             ) as mock_warning:
-                window._convert_files()
+                convert_and_wait(window)
 
             self.assertEqual(calls, [a_md.resolve()])
             self.assertTrue((Path(directory) / "a.docx").exists())
@@ -276,8 +289,9 @@ class DropFileListTests(unittest.TestCase):
             a_md.write_text("# a", encoding="utf-8")
             b_md.write_text("# b", encoding="utf-8")
             window._add_sources([str(a_md), str(b_md)])
+            window.workers = 1
 
-            original_convert_file = window.converter.convert_file
+            original_convert = window.converter.convert
             mid_run_states = []
 
             def record_then_convert(source, output):
@@ -293,14 +307,14 @@ class DropFileListTests(unittest.TestCase):
                         "accept_drops": window.acceptDrops(),
                     }
                 )
-                return original_convert_file(source, output)
+                return original_convert(source, output)
 
             with patch.object(
-                window.converter, "convert_file", side_effect=record_then_convert
+                window.converter, "convert", side_effect=record_then_convert
             ), patch("mdtoword.app.QMessageBox.information") as mock_info, patch(
                 "mdtoword.app.QMessageBox.warning"
             ) as mock_warning:
-                window._convert_files()
+                convert_and_wait(window)
 
             self.assertEqual(len(mid_run_states), 2)
             for state in mid_run_states:
@@ -322,7 +336,7 @@ class DropFileListTests(unittest.TestCase):
             with patch("mdtoword.app.QMessageBox.information") as mock_info, patch(
                 "mdtoword.app.QMessageBox.warning"
             ) as mock_warning:
-                window._convert_files()
+                convert_and_wait(window)
 
             self.assertTrue(window.progress.isHidden())
             self.assertTrue(window.convert_button.isEnabled())
@@ -338,6 +352,76 @@ class DropFileListTests(unittest.TestCase):
             )
             self.assertEqual(mock_info.call_count, 1)
 
+    def test_batch_conversion_runs_off_the_ui_thread_and_can_be_cancelled(self):
+        with tempfile.TemporaryDirectory() as directory:
+            settings = QSettings(
+                str(Path(directory) / "theme.ini"),
+                QSettings.Format.IniFormat,
+            )
+            window = ConverterGUI(theme_manager=ThemeManager(settings=settings))
+            a_md = Path(directory) / "a.md"
+            b_md = Path(directory) / "b.md"
+            a_md.write_text("# a", encoding="utf-8")
+            b_md.write_text("# b", encoding="utf-8")
+            window._add_sources([str(a_md), str(b_md)])
+            window.workers = 1
+
+            original_convert = window.converter.convert
+            started = threading.Event()
+            release = threading.Event()
+
+            def held_convert(source, output):
+                started.set()
+                release.wait(30)
+                return original_convert(source, output)
+
+            with patch.object(
+                window.converter, "convert", side_effect=held_convert
+            ), patch("mdtoword.app.QMessageBox.information") as mock_info:
+                window._convert_files()
+                # Первый файл ещё конвертируется, а окно уже вернуло управление.
+                self.assertTrue(started.wait(30))
+                self.assertTrue(window.cancel_button.isVisibleTo(window))
+                window.cancel_button.click()
+                release.set()
+                window._batch.wait()
+                QApplication.processEvents()
+
+            self.assertTrue((Path(directory) / "a.docx").exists())
+            self.assertFalse((Path(directory) / "b.docx").exists())
+            self.assertEqual(mock_info.call_count, 1)
+            self.assertIn("1", mock_info.call_args.args[2])
+            self.assertEqual(window.status_label.text(), "Конвертация отменена")
+            self.assertFalse(window.cancel_button.isVisibleTo(window))
+            self.assertTrue(window.convert_button.isEnabled())
+
+    def test_text_tab_preview_renders_in_the_background_after_a_pause(self):
+        with tempfile.TemporaryDirectory() as directory:
+            settings = QSettings(
+                str(Path(directory) / "theme.ini"),
+                QSettings.Format.IniFormat,
+            )
+            window = ConverterGUI(theme_manager=ThemeManager(settings=settings))
+            self.addCleanup(window.close)
+
+            window.text_input.setPlainText("# Старый\n\n![a](old.png)")
+            # Ввод лишь взводит таймер: рендер ждёт паузы в наборе.
+            self.assertTrue(window._preview_timer.isActive())
+            self.assertEqual(window.preview_output.toPlainText(), "")
+            window._request_preview()
+            window.text_input.setPlainText("# Заголовок\n\n![diagram](missing.png)")
+            window._request_preview()
+
+            deadline = time.monotonic() + 30
+            while window._preview_result is None and time.monotonic() < deadline:
+                QApplication.processEvents()
+                time.sleep(0.01)
+
+            preview = window.preview_output.toPlainText()
+            self.assertIn("Заголовок", preview)
+            self.assertIn("Image not found: missing.png", preview)
+            self.assertNotIn("old.png", preview)
+
     def test_translations_include_localized_footnotes_heading(self):
         with tempfile.TemporaryDirectory() as directory:
             settings = QSettings(
@@ -388,7 +472,7 @@ class DropFileListTests(unittest.TestCase):
             window._add_sources([str(source)])
 
             with patch("mdtoword.app.QMessageBox.warning") as mock_warning:
-                window._convert_files()
+                convert_and_wait(window)
 
             self.assertEqual(mock_warning.call_count, 1)
             message = mock_warning.call_args.args[2]
@@ -409,7 +493,7 @@ class DropFileListTests(unittest.TestCase):
             window._add_sources([str(source)])
 
             with patch("mdtoword.app.QMessageBox.warning") as mock_warning:
-                window._convert_files()
+                convert_and_wait(window)
 
             self.assertEqual(mock_warning.call_count, 1)
             message = mock_warning.call_args.args[2]
@@ -429,7 +513,7 @@ class DropFileListTests(unittest.TestCase):
             with patch("mdtoword.app.QMessageBox.warning") as mock_warning, patch(
                 "mdtoword.app.QMessageBox.information"
             ) as mock_info:
-                window._convert_files()
+                convert_and_wait(window)
 
             self.assertEqual(mock_info.call_count, 0)
             self.assertEqual(mock_warning.call_count, 1)
@@ -1,5 +1,7 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 import tempfile
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -10,7 +12,17 @@ from docx.oxml.ns import qn
 from docx.shared import Pt
 from docx.shared import RGBColor
 
-from mdtoword.gfm_renderer import _MAX_REMOTE_IMAGE_BYTES, GfmDocxRenderer, _is_remote_target
+from mdtoword.gfm_renderer import (
+    _MAX_REMOTE_IMAGE_BYTES,
+    GfmDocxRenderer,
+    _is_remote_target,
+    block_cache_info,
+    clear_block_cache,
+    clear_image_cache,
+    image_cache_info,
+    markdown_parser,
+    split_markdown,
+)
 
 
 _MATH_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/math}"
@@ -448,6 +460,20 @@ class GfmDocxRendererTests(unittest.TestCase):
         self.assertEqual(body.cells[1].paragraphs[0].alignment, WD_ALIGN_PARAGRAPH.RIGHT)
         self.assertEqual(body.cells[2].paragraphs[0].alignment, WD_ALIGN_PARAGRAPH.CENTER)
 
+    def test_table_rows_fill_a_full_grid_with_bold_header(self):
+        body = "".join(f"| r{row} | v{row} |\n" for row in range(2000))
+        document, _ = GfmDocxRenderer("Times New Roman", Pt(12)).render(
+            "| name | value | note |\n|---|---|:-:|\n| short |\n| a\tb | 2 |   x   |\n" + body
+        )
+        table = document.tables[0]
+        self.assertEqual(len(table.rows), 2003)
+        self.assertEqual([cell.text for cell in table.rows[1].cells], ["short", "", ""])
+        self.assertEqual([cell.text for cell in table.rows[2].cells], ["a\tb", "2", "x"])
+        self.assertEqual(table.rows[2002].cells[1].text, "v1999")
+        self.assertTrue(table.rows[0].cells[0].paragraphs[0].runs[0].bold)
+        self.assertIsNone(table.rows[1].cells[0].paragraphs[0].runs[0].bold)
+        self.assertEqual(table.rows[2].cells[2].paragraphs[0].alignment, WD_ALIGN_PARAGRAPH.CENTER)
+
     def test_table_cell_math_is_kept_verbatim_with_a_warning(self):
         document, warnings = GfmDocxRenderer("Times New Roman", Pt(12)).render(
             "| formula | plain |\n|---|---|\n| $x^2$ | c |\n"
@@ -1165,5 +1191,476 @@ class GfmDocxRendererTests(unittest.TestCase):
         self.assertEqual(len(renderer.document.inline_shapes), 1)
 
 
+class DocumentTemplateCacheTests(unittest.TestCase):
+    def test_each_render_gets_its_own_document(self):
+        renderer = GfmDocxRenderer("Arial", Pt(12))
+        first, _ = renderer.render("First")
+        second, _ = renderer.render("Second")
+
+        self.assertIsNot(first, second)
+        self.assertEqual([p.text for p in first.paragraphs], ["First"])
+        self.assertEqual([p.text for p in second.paragraphs], ["Second"])
+
+    def test_editing_a_returned_document_does_not_leak_into_the_next(self):
+        renderer = GfmDocxRenderer("Arial", Pt(12))
+        first, _ = renderer.render("First")
+        first.styles["Normal"].font.name = "Courier New"
+
+        second, _ = GfmDocxRenderer("Arial", Pt(12)).render("Second")
+
+        self.assertEqual(second.styles["Normal"].font.name, "Arial")
+
+    def test_templates_are_keyed_by_font_and_size(self):
+        small, _ = GfmDocxRenderer("Arial", Pt(10)).render("x")
+        large, _ = GfmDocxRenderer("Arial", Pt(14)).render("x")
+        georgia, _ = GfmDocxRenderer("Georgia", Pt(10)).render("x")
+
+        self.assertEqual(small.styles["Normal"].font.size, Pt(10))
+        self.assertEqual(large.styles["Normal"].font.size, Pt(14))
+        self.assertEqual(georgia.styles["Normal"].font.name, "Georgia")
+
+
+class ImageCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        clear_image_cache()
+        self.addCleanup(clear_image_cache)
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.source = Path(self._tmpdir.name) / "source.md"
+        self.logo = Path(self._tmpdir.name) / "logo.png"
+        self.logo.write_bytes(_MINIMAL_PNG)
+
+    @staticmethod
+    def _media(document):
+        return [
+            part.blob for part in document.part.package.parts
+            if part.partname.startswith("/word/media/")
+        ]
+
+    def test_a_repeated_image_is_read_once_and_stored_once(self):
+        renderer = GfmDocxRenderer("Arial", Pt(12))
+
+        document, warnings = renderer.render(
+            "![logo](logo.png)\n\n![again](logo.png)", source_path=self.source
+        )
+        second, _ = renderer.render("![logo](./logo.png)", source_path=self.source)
+
+        self.assertEqual(warnings, [])
+        self.assertEqual(len(document.inline_shapes), 2)
+        self.assertEqual(self._media(document), [_MINIMAL_PNG])
+        self.assertEqual(self._media(second), [_MINIMAL_PNG])
+        self.assertEqual(image_cache_info()[:3], (2, 1, 1))
+
+    def test_paths_copies_and_urls_of_one_image_share_a_single_part(self):
+        (self.logo.parent / "copy.png").write_bytes(_MINIMAL_PNG)
+        markdown = "\n\n".join(
+            ["![logo](logo.png)"] * 48
+            + ["![copy](copy.png)", "![remote](https://example.invalid/logo.png)"]
+        )
+
+        with patch("mdtoword.gfm_renderer.urlopen") as mock_urlopen:
+            mock_urlopen.return_value = _urlopen_response(_MINIMAL_PNG)
+            document, warnings = GfmDocxRenderer("Arial", Pt(12)).render(
+                markdown, source_path=self.source
+            )
+
+        self.assertEqual(warnings, [])
+        self.assertEqual(len(document.inline_shapes), 50)
+        self.assertEqual(self._media(document), [_MINIMAL_PNG])
+        targets = {
+            shape._inline.graphic.graphicData.pic.blipFill.blip.embed
+            for shape in document.inline_shapes
+        }
+        self.assertEqual(len(targets), 1)
+
+    def test_a_changed_file_is_read_again(self):
+        renderer = GfmDocxRenderer("Arial", Pt(12))
+        renderer.render("![logo](logo.png)", source_path=self.source)
+        changed = _MINIMAL_PNG + b"\x00"
+        self.logo.write_bytes(changed)
+
+        document, _ = renderer.render("![logo](logo.png)", source_path=self.source)
+
+        self.assertEqual(self._media(document), [changed])
+        self.assertEqual(image_cache_info().misses, 2)
+
+    def test_saved_document_keeps_every_picture(self):
+        output = Path(self._tmpdir.name) / "out.docx"
+        document, _ = GfmDocxRenderer("Arial", Pt(12)).render(
+            "![a](logo.png) ![b](logo.png)", source_path=self.source
+        )
+        document.save(str(output))
+
+        reopened = Document(str(output))
+
+        self.assertEqual(len(reopened.inline_shapes), 2)
+        ids = [shape._inline.docPr.id for shape in reopened.inline_shapes]
+        self.assertEqual(len(set(ids)), 2)
+
+    def test_a_remote_image_is_fetched_once_per_render(self):
+        renderer = GfmDocxRenderer("Arial", Pt(12))
+        markdown = "![a](https://example.invalid/x.png) ![b](https://example.invalid/x.png)"
+
+        with patch("mdtoword.gfm_renderer.urlopen") as mock_urlopen:
+            mock_urlopen.side_effect = lambda *args, **kwargs: _urlopen_response(
+                _MINIMAL_PNG
+            )
+            document, warnings = renderer.render(markdown)
+            renderer.render(markdown)
+
+        self.assertEqual(warnings, [])
+        self.assertEqual(len(document.inline_shapes), 2)
+        self.assertEqual(mock_urlopen.call_count, 2)
+
+
+class RemoteImagePrefetchTests(unittest.TestCase):
+    """Prefetching against a real local HTTP server.
+
+    Every image request waits at a barrier sized to the number of distinct
+    URLs, so the render only gets all of its images if they really were
+    requested at the same time -- fetched one by one, the first request
+    would time out at the barrier and come back as an error.
+    """
+
+    def start_server(self, parties: int) -> str:
+        barrier = threading.Barrier(parties, timeout=5)
+        requests: list[str] = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                requests.append(self.path)
+                try:
+                    barrier.wait()
+                except threading.BrokenBarrierError:
+                    self.send_error(503)
+                    return
+                body = _MINIMAL_PNG
+                if self.path == "/huge.png":
+                    body = b"x" * (_MAX_REMOTE_IMAGE_BYTES + 1)
+                self.send_response(200)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.requests = requests
+        return f"http://127.0.0.1:{server.server_port}"
+
+    def test_distinct_urls_are_fetched_concurrently_and_once_each(self):
+        base = self.start_server(parties=3)
+        markdown = (
+            f"![a]({base}/a.png) ![b]({base}/b.png)\n\n"
+            f"| c |\n|---|\n| ![c]({base}/c.png) |\n\n"
+            f"![a again]({base}/a.png)"
+        )
+
+        document, warnings = GfmDocxRenderer("Arial", Pt(12)).render(markdown)
+
+        self.assertEqual(warnings, [])
+        self.assertEqual(sorted(self.requests), ["/a.png", "/b.png", "/c.png"])
+        self.assertEqual(len(document.inline_shapes), 3)
+
+    def test_streamed_chunks_prefetch_their_own_images(self):
+        base = self.start_server(parties=2)
+        with tempfile.TemporaryDirectory() as directory:
+            source = Path(directory) / "source.md"
+            source.write_text(
+                f"![a]({base}/a.png) ![b]({base}/b.png)\n\n"
+                f"![c]({base}/c.png) ![d]({base}/d.png)\n",
+                encoding="utf-8",
+            )
+
+            renderer = GfmDocxRenderer("Arial", Pt(12))
+            document, warnings = renderer.render_file(source, chunk_chars=1)
+
+        self.assertEqual(warnings, [])
+        self.assertEqual(
+            renderer.remote_images, [f"{base}/{name}.png" for name in "abcd"]
+        )
+
+    def test_reused_blocks_fetch_their_images_together(self):
+        # По картинке на блок: по отдельности каждый блок скачивал бы свою
+        # в одиночку, и первый запрос не дождался бы остальных у барьера.
+        base = self.start_server(parties=3)
+        markdown = "\n\n".join(f"![{name}]({base}/{name}.png)" for name in "abc")
+        renderer = GfmDocxRenderer("Arial", Pt(12), reuse_blocks=True)
+
+        for _ in range(2):
+            document, warnings = renderer.render(markdown)
+
+            self.assertEqual(warnings, [])
+            self.assertEqual(len(document.inline_shapes), 3)
+        self.assertEqual(len(self.requests), 6)
+
+    def test_size_cap_still_applies_to_prefetched_responses(self):
+        base = self.start_server(parties=2)
+
+        _, warnings = GfmDocxRenderer("Arial", Pt(12)).render(
+            f"![a]({base}/a.png) ![huge]({base}/huge.png)"
+        )
+
+        self.assertEqual(
+            warnings,
+            [
+                f"Remote image too large: {base}/huge.png (exceeds the "
+                f"{_MAX_REMOTE_IMAGE_BYTES}-byte limit; not embedded)"
+            ],
+        )
+
+    def test_nothing_is_fetched_when_remote_images_are_disallowed(self):
+        base = self.start_server(parties=2)
+
+        _, warnings = GfmDocxRenderer("Arial", Pt(12), allow_remote_images=False).render(
+            f"![a]({base}/a.png) ![b]({base}/b.png)"
+        )
+
+        self.assertEqual(self.requests, [])
+        self.assertEqual(len(warnings), 2)
+
+
+class MarkdownParserCacheTests(unittest.TestCase):
+    def test_the_same_thread_and_configuration_reuse_one_parser(self):
+        self.assertIs(markdown_parser(), markdown_parser())
+        self.assertIsNot(markdown_parser(), markdown_parser(linkify=False))
+
+    def test_each_thread_gets_its_own_parser(self):
+        # linkify-it keeps match state on the instance, so a parser must
+        # never be shared between threads.
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(markdown_parser()))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(len(seen), 1)
+        self.assertIsNot(seen[0], markdown_parser())
+
+    def test_repeated_renders_do_not_leak_footnotes_between_documents(self):
+        renderer = GfmDocxRenderer("Arial", Pt(12))
+        first, _ = renderer.render("Text[^1]\n\n[^1]: First note.\n")
+        second, _ = renderer.render("No notes here.")
+
+        self.assertIn("First note.", "\n".join(p.text for p in first.paragraphs))
+        self.assertEqual([p.text for p in second.paragraphs], ["No notes here."])
+
+
+# Every construct ``split_markdown`` must not cut through, with blank lines
+# inside each, plus definitions and footnotes used before they are defined.
+_STREAMED_MARKDOWN = """# Release notes
+
+See [the guide][guide] and the footnotes[^late] and[^early].
+
+[^early]: Defined early,
+    continued after an indent.
+
+- first item
+
+- second item
+  continued
+
+  still the second item
+
+```text
+fenced
+
+code
+```
+
+$$
+a + b
+
+$$
+
+\\begin{align}
+a &= b \\\\
+
+c &= d
+\\end{align}
+
+| a | b |
+|---|---|
+| 1 | 2 |
+
+    indented
+
+    code
+
+Reused [^late] note and https://example.org/linkified.
+
+[guide]: https://example.com/guide "Guide"
+
+[^late]: Defined last.
+
+Both again after their definitions[^early][^late].
+"""
+
+
+class StreamedRenderingTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.source = Path(self._tmpdir.name) / "notes.md"
+        self.source.write_text(_STREAMED_MARKDOWN, encoding="utf-8")
+
+    def test_chunks_split_only_between_independent_blocks(self):
+        chunks = list(split_markdown(_STREAMED_MARKDOWN.splitlines(keepends=True), 1))
+
+        self.assertEqual("".join(chunks), _STREAMED_MARKDOWN)
+        self.assertGreater(len(chunks), 5)
+        for first, last in (
+            ("- first item", "still the second item"),
+            ("```text", "code\n```"),
+            ("$$\na + b", "\n$$\n"),
+            ("\\begin{align}", "\\end{align}"),
+            ("    indented", "    code"),
+        ):
+            with self.subTest(block=first):
+                self.assertTrue(
+                    any(first in chunk and last in chunk for chunk in chunks)
+                )
+
+    def test_large_chunks_keep_the_whole_source_together(self):
+        self.assertEqual(
+            list(split_markdown(_STREAMED_MARKDOWN.splitlines(keepends=True))),
+            [_STREAMED_MARKDOWN],
+        )
+
+    def test_streamed_render_matches_a_whole_render(self):
+        whole, whole_warnings = GfmDocxRenderer("Arial", Pt(12)).render(
+            _STREAMED_MARKDOWN, source_path=self.source
+        )
+        streamed, streamed_warnings = GfmDocxRenderer("Arial", Pt(12)).render_file(
+            self.source, chunk_chars=1
+        )
+
+        self.assertEqual(streamed.element.body.xml, whole.element.body.xml)
+        self.assertEqual(streamed_warnings, whole_warnings)
+        self.assertEqual(
+            [p.text for p in streamed.paragraphs][-3:],
+            ["Defined last.", "[early] ", "Defined early,\ncontinued after an indent."],
+        )
+        links = {
+            rel.target_ref for rel in streamed.part.rels.values() if rel.is_external
+        }
+        self.assertEqual(links, {"https://example.com/guide", "https://example.org/linkified"})
+
+
+class BlockReuseTests(unittest.TestCase):
+    def setUp(self):
+        clear_block_cache()
+        self.addCleanup(clear_block_cache)
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.source = Path(self._tmpdir.name) / "notes.md"
+        self.logo = Path(self._tmpdir.name) / "logo.png"
+        self.logo.write_bytes(_MINIMAL_PNG)
+        self.markdown = (
+            _STREAMED_MARKDOWN
+            + "\n![logo](logo.png) and ![missing](missing.png)\n"
+            + "\nA [second link](https://example.com/second), ![logo](logo.png) again.\n"
+        )
+
+    def _render(self, markdown):
+        return GfmDocxRenderer("Arial", Pt(12), reuse_blocks=True).render(
+            markdown, source_path=self.source
+        )
+
+    @staticmethod
+    def _relationships(document):
+        return sorted(
+            (rel.rId, rel.reltype, rel.target_ref) for rel in document.part.rels.values()
+        )
+
+    def test_reused_blocks_render_the_same_document_as_a_whole_render(self):
+        whole, whole_warnings = GfmDocxRenderer("Arial", Pt(12)).render(
+            self.markdown, source_path=self.source
+        )
+
+        first, first_warnings = self._render(self.markdown)
+        misses = block_cache_info().misses
+        second, second_warnings = self._render(self.markdown)
+
+        self.assertEqual(block_cache_info().misses, misses)
+        self.assertGreater(block_cache_info().hits, 0)
+        for document, warnings in ((first, first_warnings), (second, second_warnings)):
+            self.assertEqual(document.element.body.xml, whole.element.body.xml)
+            self.assertEqual(self._relationships(document), self._relationships(whole))
+            self.assertEqual(warnings, whole_warnings)
+
+    def test_only_the_edited_block_is_rendered_again(self):
+        self._render(self.markdown)
+        before = block_cache_info()
+        edited = self.markdown.replace("- first item", "- first [item](https://example.com/item)")
+
+        document, warnings = self._render(edited)
+
+        # Новый блок списка — единственный промах.
+        self.assertEqual(block_cache_info().misses, before.misses + 1)
+        clear_block_cache()
+        fresh, fresh_warnings = self._render(edited)
+        self.assertEqual(document.element.body.xml, fresh.element.body.xml)
+        self.assertEqual(self._relationships(document), self._relationships(fresh))
+        self.assertEqual(warnings, fresh_warnings)
+
+    def test_a_changed_definition_renders_every_block_again(self):
+        self._render(self.markdown)
+        before = block_cache_info()
+
+        self._render(self.markdown + "\n[extra]: https://example.com/extra\n")
+
+        self.assertEqual(block_cache_info().hits, before.hits)
+
+    def test_a_block_whose_image_changed_on_disk_is_rendered_again(self):
+        self._render("![logo](logo.png)")
+        changed = _MINIMAL_PNG + b"\x00"
+        self.logo.write_bytes(changed)
+        (self.logo.parent / "missing.png").write_bytes(_MINIMAL_PNG)
+
+        document, warnings = self._render(self.markdown)
+
+        self.assertEqual(warnings, [])
+        media = [
+            part.blob for part in document.part.package.parts
+            if part.partname.startswith("/word/media/")
+        ]
+        self.assertIn(changed, media)
+
+    def test_blocks_with_fetched_images_are_not_kept(self):
+        markdown = "# Title\n\n![remote](https://example.invalid/x.png)\n"
+
+        with patch("mdtoword.gfm_renderer.urlopen") as mock_urlopen:
+            mock_urlopen.side_effect = lambda *args, **kwargs: _urlopen_response(
+                _MINIMAL_PNG
+            )
+            self._render(markdown)
+            document, warnings = self._render(markdown)
+
+        self.assertEqual(warnings, [])
+        self.assertEqual(len(document.inline_shapes), 1)
+        self.assertEqual(mock_urlopen.call_count, 2)
+        self.assertEqual(block_cache_info().hits, 1)
+
+    def test_render_file_reuses_blocks_too(self):
+        self.source.write_text(self.markdown, encoding="utf-8")
+        whole, whole_warnings = GfmDocxRenderer("Arial", Pt(12)).render_file(self.source)
+
+        renderer = GfmDocxRenderer("Arial", Pt(12), reuse_blocks=True)
+        renderer.render_file(self.source)
+        document, warnings = renderer.render_file(self.source)
+
+        self.assertEqual(document.element.body.xml, whole.element.body.xml)
+        self.assertEqual(warnings, whole_warnings)
+        self.assertEqual(
+            [path.name for path in renderer.local_images],
+            ["logo.png", "missing.png", "logo.png"],
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,158 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+from pathlib import Path
+import tempfile
+import threading
+import unittest
+
+from docx.shared import Pt
+
+from mdtoword.gfm_renderer import GfmDocxRenderer
+from mdtoword.http_cache import HttpCache
+
+_MINIMAL_PNG = (
+    b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01"
+    b"\x08\x06\x00\x00\x00\x1f\x15\xc4\x89\x00\x00\x00\nIDATx\x9cc\x00\x01"
+    b"\x00\x00\x05\x00\x01\x05-\xb4\x00\x00\x00\x00\x00IEND\xaeB`\x82"
+)
+
+
+class _ImageServer:
+    """A local HTTP server with one image per path and real validators.
+
+    ``images`` maps a path to ``(body, etag)``; an etag of None serves the
+    body without any validator. Every request is logged with the
+    conditional header it carried, and a matching ``If-None-Match`` gets a
+    bodiless 304, as a real server would answer.
+    """
+
+    def __init__(self) -> None:
+        self.images: dict[str, tuple[bytes, str | None]] = {}
+        self.requests: list[tuple[str, str | None]] = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                condition = self.headers.get("If-None-Match")
+                server.requests.append((self.path, condition))
+                body, etag = server.images[self.path]
+                if etag is not None and condition == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                if etag is not None:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self._httpd.server_port}"
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class RemoteImageCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.cache = HttpCache(Path(self._tmpdir.name) / "cache")
+        self.server = _ImageServer()
+        self.addCleanup(self.server.close)
+
+    def render(self, *paths: str) -> GfmDocxRenderer:
+        renderer = GfmDocxRenderer("Arial", Pt(12), http_cache=self.cache)
+        markdown = " ".join(f"![image]({self.server.base}{path})" for path in paths)
+        _, warnings = renderer.render(markdown)
+        self.assertEqual(warnings, [])
+        return renderer
+
+    @staticmethod
+    def media(renderer: GfmDocxRenderer) -> list[bytes]:
+        return [
+            part.blob for part in renderer.document.part.package.parts
+            if part.partname.startswith("/word/media/")
+        ]
+
+    def test_an_unchanged_image_is_revalidated_and_served_from_disk(self) -> None:
+        self.server.images["/a.png"] = (_MINIMAL_PNG, '"v1"')
+
+        first = self.render("/a.png")
+        second = self.render("/a.png")
+
+        self.assertEqual(self.server.requests, [("/a.png", None), ("/a.png", '"v1"')])
+        self.assertEqual((first.http_cache_hits, first.http_cache_misses), (0, 1))
+        self.assertEqual((second.http_cache_hits, second.http_cache_misses), (1, 0))
+        self.assertEqual(self.media(second), [_MINIMAL_PNG])
+
+    def test_a_changed_image_is_downloaded_and_replaces_the_copy(self) -> None:
+        changed = _MINIMAL_PNG + b"\x00"
+        self.server.images["/a.png"] = (_MINIMAL_PNG, '"v1"')
+        self.render("/a.png")
+        self.server.images["/a.png"] = (changed, '"v2"')
+
+        second = self.render("/a.png")
+        third = self.render("/a.png")
+
+        self.assertEqual(self.media(second), [changed])
+        self.assertEqual(second.http_cache_misses, 1)
+        self.assertEqual(self.server.requests[-1], ("/a.png", '"v2"'))
+        self.assertEqual(third.http_cache_hits, 1)
+
+    def test_prefetched_images_go_through_the_cache_too(self) -> None:
+        self.server.images["/a.png"] = (_MINIMAL_PNG, '"a"')
+        self.server.images["/b.png"] = (_MINIMAL_PNG + b"\x00", '"b"')
+        self.render("/a.png", "/b.png")
+
+        second = self.render("/a.png", "/b.png")
+
+        self.assertEqual(second.http_cache_hits, 2)
+
+    def test_a_response_without_validators_is_not_stored(self) -> None:
+        self.server.images["/a.png"] = (_MINIMAL_PNG, None)
+
+        self.render("/a.png")
+        second = self.render("/a.png")
+
+        self.assertEqual(self.server.requests, [("/a.png", None), ("/a.png", None)])
+        self.assertEqual(second.http_cache_misses, 1)
+        self.assertFalse(self.cache.directory.exists())
+
+
+class EvictionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.cache = HttpCache(Path(self._tmpdir.name), max_bytes=250)
+
+    def store(self, url: str, age: int) -> None:
+        self.cache.store(url, b"x" * 100, {"ETag": '"1"'})
+        entry = self.cache.lookup(url)
+        os.utime(entry.body_path, ns=(age, age))
+
+    def test_least_recently_used_entries_go_first(self) -> None:
+        self.store("https://example.invalid/old", age=1_000)
+        self.store("https://example.invalid/used", age=2_000)
+        self.cache.read(self.cache.lookup("https://example.invalid/old"))
+
+        self.cache.store("https://example.invalid/new", b"x" * 100, {"ETag": '"1"'})
+
+        self.assertIsNotNone(self.cache.lookup("https://example.invalid/old"))
+        self.assertIsNone(self.cache.lookup("https://example.invalid/used"))
+        self.assertIsNotNone(self.cache.lookup("https://example.invalid/new"))
+
+    def test_a_body_larger_than_the_cache_is_not_stored(self) -> None:
+        self.cache.store("https://example.invalid/huge", b"x" * 251, {"ETag": '"1"'})
+
+        self.assertIsNone(self.cache.lookup("https://example.invalid/huge"))
+
+
+if __name__ == "__main__":
+    unittest.main()
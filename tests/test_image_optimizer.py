@@ -0,0 +1,128 @@
+from io import BytesIO
+from pathlib import Path
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from docx.shared import Inches, Pt
+from PIL import Image as PillowImage, PngImagePlugin
+
+from mdtoword.gfm_renderer import GfmDocxRenderer, clear_image_cache
+from mdtoword.image_optimizer import ImageOptimizer, clear_optimized_images
+
+
+def _png(width: int, height: int, mode: str = "RGB", dpi: int = 72, **info) -> bytes:
+    # A gradient rather than a flat fill, so resampling and recompression
+    # have real pixels to work on.
+    picture = PillowImage.linear_gradient("L").resize((width, height)).convert(mode)
+    text = PngImagePlugin.PngInfo()
+    for key, value in info.items():
+        text.add_text(key, value)
+    output = BytesIO()
+    picture.save(output, "PNG", dpi=(dpi, dpi), pnginfo=text)
+    return output.getvalue()
+
+
+class ImageOptimizerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        clear_image_cache()
+        clear_optimized_images()
+        self.addCleanup(clear_optimized_images)
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.root = Path(self._tmpdir.name)
+
+    def render(self, data: bytes, optimizer: ImageOptimizer | None):
+        (self.root / "shot.png").write_bytes(data)
+        document, warnings = GfmDocxRenderer(
+            "Arial", Pt(12), image_optimizer=optimizer
+        ).render("![shot](shot.png)", source_path=self.root / "source.md")
+        self.assertEqual(warnings, [])
+        shape = document.inline_shapes[0]
+        blob = shape._inline.graphic.graphicData.pic.blipFill.blip.embed
+        part = document.part.related_parts[blob]
+        return shape, part
+
+    def test_a_screenshot_is_fitted_to_the_page_and_downsampled(self) -> None:
+        original = _png(3840, 2160)
+
+        shape, part = self.render(original, ImageOptimizer(max_dpi=100))
+
+        self.assertEqual(shape.width, Inches(6))
+        self.assertEqual(shape.height, Inches(6) * 2160 // 3840)
+        self.assertEqual(part.image.px_width, 600)
+        self.assertLess(len(part.blob), len(original))
+
+    def test_without_an_optimizer_the_image_is_embedded_as_is(self) -> None:
+        original = _png(3840, 2160)
+
+        shape, part = self.render(original, None)
+
+        self.assertEqual(part.blob, original)
+        self.assertEqual(shape.width, Inches(3840 / 72))
+
+    def test_jpeg_quality_turns_opaque_images_into_jpeg_only(self) -> None:
+        optimizer = ImageOptimizer(max_dpi=100, jpeg_quality=70)
+
+        _, opaque = self.render(_png(1200, 800), optimizer)
+        _, transparent = self.render(_png(1200, 800, mode="RGBA"), optimizer)
+
+        self.assertEqual(opaque.content_type, "image/jpeg")
+        self.assertEqual(transparent.content_type, "image/png")
+
+    def test_a_colour_keyed_png_is_not_turned_into_jpeg(self) -> None:
+        optimizer = ImageOptimizer(max_dpi=100, jpeg_quality=70)
+        for mode in ("RGB", "L"):
+            with self.subTest(mode=mode):
+                picture = PillowImage.linear_gradient("L").resize((1200, 800)).convert(mode)
+                output = BytesIO()
+                picture.save(output, "PNG", transparency=255 if mode == "L" else (255, 255, 255))
+
+                _, part = self.render(output.getvalue(), optimizer)
+
+                self.assertEqual(part.content_type, "image/png")
+                with PillowImage.open(BytesIO(part.blob)) as embedded:
+                    self.assertEqual(embedded.width, 600)
+                    self.assertTrue(
+                        embedded.mode in ("RGBA", "LA") or "transparency" in embedded.info
+                    )
+
+    def test_metadata_is_stripped_when_it_pays(self) -> None:
+        original = _png(200, 100, Comment="x" * 10_000)
+
+        shape, part = self.render(original, ImageOptimizer())
+
+        self.assertNotIn(b"Comment", part.blob)
+        self.assertEqual(part.image.px_width, 200)
+        self.assertEqual(shape.width, Inches(200 / 72))
+
+    def test_an_image_nothing_would_improve_is_kept_byte_for_byte(self) -> None:
+        original = _png(20, 10)
+
+        _, part = self.render(original, ImageOptimizer())
+
+        self.assertEqual(part.blob, original)
+
+    def test_results_are_reused_from_memory_and_from_the_cache_directory(self) -> None:
+        original = _png(1200, 800)
+        optimizer = ImageOptimizer(max_dpi=100, cache_dir=self.root / "cache")
+        self.render(original, optimizer)
+
+        with patch("mdtoword.image_optimizer._reencode") as reencode:
+            _, from_memory = self.render(original, optimizer)
+            clear_optimized_images()
+            _, from_disk = self.render(original, optimizer)
+
+        reencode.assert_not_called()
+        self.assertEqual(from_memory.image.px_width, 600)
+        self.assertEqual(from_disk.blob, from_memory.blob)
+
+    def test_out_of_range_settings_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            ImageOptimizer(max_dpi=0)
+        with self.assertRaises(ValueError):
+            ImageOptimizer(jpeg_quality=100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import io
+import threading
 import unittest
 
 from docx import Document
@@ -15,7 +16,9 @@ from mdtoword.latex_omml import (
     _SYMBOLS,
     _UPRIGHT_FUNCTIONS,
     UnsupportedLatexError,
+    clear_omml_cache,
     latex_to_omml,
+    omml_cache_info,
 )
 
 # python-docx registers a custom lxml element class per known tag, but it
@@ -973,5 +976,58 @@ class ArrayAndSubstackTests(unittest.TestCase):
             len(body.findall("m:oMath/m:nary/m:sub/m:m/m:mr", MATH_NS)), 2)
 
 
+class FormulaCacheTests(unittest.TestCase):
+    """``latex_to_omml`` memoizes per formula but never shares its output."""
+
+    def setUp(self):
+        clear_omml_cache()
+        self.addCleanup(clear_omml_cache)
+
+    def test_repeated_formula_is_a_hit_and_returns_a_fresh_element(self):
+        first = latex_to_omml(r"\frac{a}{b}")
+        second = latex_to_omml(r"\frac{a}{b}")
+
+        self.assertIsNot(first, second)
+        self.assertEqual(first.xml, second.xml)
+        info = omml_cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+
+    def test_mutating_a_result_does_not_leak_into_the_next_one(self):
+        first = latex_to_omml("x^2")
+        first.remove(first[0])
+        document = Document()
+        document.element.body.append(first)
+
+        self.assertEqual(len(latex_to_omml("x^2")), 1)
+
+    def test_unsupported_formula_is_cached_and_raised_every_time(self):
+        messages = []
+        for _ in range(2):
+            with self.assertRaises(UnsupportedLatexError) as caught:
+                latex_to_omml(r"\unknowncommand")
+            messages.append(str(caught.exception))
+
+        self.assertEqual(messages[0], messages[1])
+        self.assertIn("unknowncommand", messages[0])
+        info = omml_cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_each_thread_compiles_from_its_own_prototypes(self):
+        latex_to_omml("x^2")
+        seen = []
+
+        def other_thread():
+            latex_to_omml("x^2")
+            seen.append(omml_cache_info())
+
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        thread.join()
+
+        # Прототип другого потока не берётся: там это промах, а не попадание.
+        self.assertEqual((seen[0].hits, seen[0].misses), (0, 1))
+        self.assertEqual(omml_cache_info().misses, 1)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,84 @@
+"""Тесты живого предпросмотра: итог как у preview_content, рендер — только изменённых блоков."""
+
+import unittest
+from unittest import mock
+
+from mdtoword.converters import MarkdownToWordConverter
+from mdtoword.gfm_renderer import GfmDocxRenderer, split_markdown
+from mdtoword.live_preview import LivePreview
+
+DRAFT = """# Черновик
+
+Ссылка на сноску[^late], ![картинка](first.png) и вторая сноска[^early].
+
+![схема][diagram]
+
+## Формулы
+
+$$\\badcommand{x}$$
+
+Ещё раз[^late].
+
+[diagram]: missing.png
+
+[^early]: Тело ранней сноски с $\\alsobad$.
+
+[^late]: Тело сноски с ![картинкой](footnote.png).
+"""
+
+
+class LivePreviewTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.converter = MarkdownToWordConverter()
+        self.preview = LivePreview(self.converter)
+
+    def rendered_blocks(self, content: str) -> list[str]:
+        """Блоки, которые ``update`` отрендерил заново."""
+        original = GfmDocxRenderer.preview_chunks
+        rendered: list[str] = []
+
+        def spy(renderer, chunks, *args):
+            rendered.extend(chunks)
+            return original(renderer, chunks, *args)
+
+        with mock.patch.object(GfmDocxRenderer, "preview_chunks", spy):
+            self.preview.update(content)
+        return rendered
+
+    def test_warnings_match_a_whole_preview(self) -> None:
+        result = self.preview.update(DRAFT)
+
+        self.assertEqual(result.warnings, self.converter.preview_content(DRAFT))
+        self.assertEqual(result.headings, [(1, "Черновик"), (2, "Формулы")])
+
+    def test_an_edit_renders_only_the_block_it_touched(self) -> None:
+        self.preview.update(DRAFT)
+        edited = DRAFT.replace("## Формулы", "## Формулы и ![ещё](more.png)")
+
+        rendered = self.rendered_blocks(edited)
+
+        self.assertEqual(rendered, ["## Формулы и ![ещё](more.png)\n\n"])
+        self.assertEqual(
+            self.preview.update(edited).warnings, self.converter.preview_content(edited)
+        )
+
+    def test_a_changed_definition_renders_every_block_again(self) -> None:
+        self.preview.update(DRAFT)
+        edited = DRAFT.replace("[diagram]: missing.png", "[diagram]: elsewhere.png")
+
+        rendered = self.rendered_blocks(edited)
+
+        self.assertEqual("".join(rendered), edited)
+        self.assertIn("Image not found: elsewhere.png", self.preview.update(edited).warnings)
+
+    def test_a_cancelled_preview_returns_nothing_and_keeps_what_it_rendered(self) -> None:
+        checks = iter([False, True])
+
+        self.assertIsNone(self.preview.update(DRAFT, lambda: next(checks, True)))
+
+        blocks = list(split_markdown(DRAFT.splitlines(keepends=True), 0))
+        self.assertEqual(self.rendered_blocks(DRAFT), blocks[1:])
+
+
+if __name__ == "__main__":
+    unittest.main()
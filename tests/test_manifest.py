@@ -0,0 +1,131 @@
+"""Тесты инкрементальной пересборки по манифесту.
+
+Проверяются через ``run_batch``: манифест — деталь пакетного прогона, и
+важно именно то, какие файлы прогон пересобирает, а какие пропускает.
+"""
+
+from pathlib import Path
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import mdtoword
+from mdtoword import manifest
+from mdtoword.batch import run_batch
+from mdtoword.converters import MarkdownToWordConverter
+from mdtoword.manifest import MANIFEST_NAME
+from mdtoword.workflow import resolve_output_paths
+
+_MINIMAL_PNG = (
+    b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01"
+    b"\x08\x06\x00\x00\x00\x1f\x15\xc4\x89\x00\x00\x00\nIDATx\x9cc\x00\x01"
+    b"\x00\x00\x05\x00\x01\x05-\xb4\x00\x00\x00\x00\x00IEND\xaeB`\x82"
+)
+
+
+class IncrementalBatchTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.root = Path(self._tmpdir.name)
+        self.output_dir = self.root / "out"
+        self.output_dir.mkdir()
+        self.plain = self.root / "plain.md"
+        self.plain.write_text("# Заголовок", encoding="utf-8")
+        self.illustrated = self.root / "illustrated.md"
+        self.illustrated.write_text("![diagram](diagram.png)", encoding="utf-8")
+        self.sources = [self.illustrated, self.plain]
+
+    def run_incremental(self, converter=None):
+        outputs = resolve_output_paths(self.sources, self.output_dir, ".docx")
+        outcomes = run_batch(
+            self.sources,
+            outputs,
+            converter or MarkdownToWordConverter(),
+            workers=1,
+            incremental=True,
+        )
+        return {outcome.source.name: outcome for outcome in outcomes}
+
+    def test_second_run_skips_everything_and_keeps_the_warnings(self) -> None:
+        first = self.run_incremental()
+        output = first["plain.md"].output
+        written = output.stat().st_mtime_ns
+
+        second = self.run_incremental()
+
+        self.assertFalse(any(outcome.unchanged for outcome in first.values()))
+        self.assertTrue(all(outcome.unchanged for outcome in second.values()))
+        self.assertEqual(second["illustrated.md"].warnings, ["Image not found: diagram.png"])
+        self.assertEqual(
+            second["illustrated.md"].local_images, first["illustrated.md"].local_images
+        )
+        self.assertEqual(output.stat().st_mtime_ns, written)
+        self.assertTrue((self.output_dir / MANIFEST_NAME).is_file())
+
+    def test_edited_source_is_rebuilt_but_a_touched_one_is_not(self) -> None:
+        self.run_incremental()
+        self.plain.write_text("# Другой заголовок", encoding="utf-8")
+        stat = self.illustrated.stat()
+        os.utime(self.illustrated, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        outcomes = self.run_incremental()
+
+        self.assertFalse(outcomes["plain.md"].unchanged)
+        self.assertTrue(outcomes["illustrated.md"].unchanged)
+
+    def test_an_image_appearing_or_changing_rebuilds_the_document(self) -> None:
+        self.run_incremental()
+        image = self.root / "diagram.png"
+        image.write_bytes(_MINIMAL_PNG)
+
+        appeared = self.run_incremental()
+        image.write_bytes(_MINIMAL_PNG + b"\x00")
+        changed = self.run_incremental()
+
+        self.assertFalse(appeared["illustrated.md"].unchanged)
+        self.assertEqual(appeared["illustrated.md"].warnings, [])
+        self.assertTrue(appeared["plain.md"].unchanged)
+        self.assertFalse(changed["illustrated.md"].unchanged)
+
+    def test_other_options_or_a_missing_output_rebuild(self) -> None:
+        self.run_incremental()
+        georgia = self.run_incremental(MarkdownToWordConverter(font_name="Georgia"))
+        georgia["plain.md"].output.unlink()
+
+        again = self.run_incremental(MarkdownToWordConverter(font_name="Georgia"))
+
+        self.assertFalse(any(outcome.unchanged for outcome in georgia.values()))
+        self.assertFalse(again["plain.md"].unchanged)
+        self.assertTrue(again["illustrated.md"].unchanged)
+
+    def test_failed_files_are_retried_and_a_corrupt_manifest_is_ignored(self) -> None:
+        self.plain.write_bytes(b"\xff\xfe\x00 invalid utf-8")
+        self.run_incremental()
+        (self.output_dir / MANIFEST_NAME).write_text("{not json", encoding="utf-8")
+
+        outcomes = self.run_incremental()
+
+        self.assertTrue(outcomes["plain.md"].error)
+        self.assertFalse(outcomes["illustrated.md"].unchanged)
+
+
+class CodeFingerprintTests(unittest.TestCase):
+    def setUp(self) -> None:
+        manifest._code_fingerprint.cache_clear()
+        self.addCleanup(manifest._code_fingerprint.cache_clear)
+
+    def test_image_and_package_writing_code_is_fingerprinted(self) -> None:
+        self.assertIn("image_optimizer.py", manifest._CONVERSION_MODULES)
+        self.assertIn("docx_writer.py", manifest._CONVERSION_MODULES)
+
+    def test_a_frozen_build_without_sources_falls_back_to_the_version(self) -> None:
+        with mock.patch.object(manifest, "__file__", "/нет/такого/manifest.py"):
+            fingerprint = manifest._code_fingerprint()
+
+        self.assertEqual(fingerprint, f"version:{mdtoword.__version__}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,22 +5,31 @@
 схемами и валидацией аргументов.
 """
 
+import asyncio
 from pathlib import Path
 import os
 import tempfile
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
+from urllib.error import HTTPError
+import zipfile
 
 from docx import Document
+from PIL import Image as PillowImage
+
+from mdtoword.converters import MarkdownToWordConverter
 
 try:
     from mcp.shared.memory import (
         create_connected_server_and_client_session as client_session,
     )
 
+    from mdtoword import mcp_server
     from mdtoword.mcp_server import mcp as server
 except ImportError:  # pragma: no cover
     client_session = None
+    mcp_server = None
     server = None
 
 
@@ -103,6 +112,20 @@ class MarkdownToWordTests(McpServerTestCase):
         for entry in report["converted"]:
             self.assertTrue(Path(entry["output"]).is_file())
 
+    async def test_exclude_patterns_skip_directories_while_scanning(self) -> None:
+        (self.root / "node_modules" / "pkg").mkdir(parents=True)
+        vendored = self.root / "node_modules" / "pkg" / "README.md"
+        vendored.write_text("# Чужой", encoding="utf-8")
+        (self.root / "doc.md").write_text("# Свой", encoding="utf-8")
+
+        result = await self.call(
+            "markdown_to_word", {"inputs": [str(self.root)], "exclude": ["node_modules"]}
+        )
+
+        report = result.structuredContent
+        self.assertEqual(report["sources_found"], 1)
+        self.assertEqual(Path(report["converted"][0]["source"]).name, "doc.md")
+
     async def test_output_dir_is_created_and_used(self) -> None:
         (self.root / "doc.md").write_text("# Заголовок", encoding="utf-8")
         destination = self.root / "out" / "deep"
@@ -189,6 +212,67 @@ class MarkdownToWordTests(McpServerTestCase):
 
         self.assertTrue(result.isError)
 
+    async def test_parallel_workers_report_files_in_source_order(self) -> None:
+        names = ["c.md", "a.md", "b.md"]
+        for name in names:
+            (self.root / name).write_text(f"# {name}", encoding="utf-8")
+
+        result = await self.call(
+            "markdown_to_word", {"inputs": [str(self.root)], "workers": 2}
+        )
+
+        report = result.structuredContent
+        self.assertEqual(
+            [Path(entry["source"]).name for entry in report["converted"]],
+            sorted(names),
+        )
+
+    async def test_incremental_run_reports_up_to_date_files_as_unchanged(self) -> None:
+        (self.root / "doc.md").write_text("# Заголовок", encoding="utf-8")
+        arguments = {"inputs": [str(self.root)], "incremental": True}
+
+        first = (await self.call("markdown_to_word", arguments)).structuredContent
+        second = (await self.call("markdown_to_word", arguments)).structuredContent
+
+        self.assertEqual(len(first["converted"]), 1)
+        self.assertEqual(first["unchanged"], [])
+        self.assertEqual(second["converted"], [])
+        # Всё, кроме времени записи: пропущенный файл не записывался.
+        written = dict(first["converted"][0], save_seconds=None)
+        self.assertEqual(second["unchanged"], [written])
+
+    async def test_zero_workers_is_an_error(self) -> None:
+        (self.root / "doc.md").write_text("# Заголовок", encoding="utf-8")
+
+        result = await self.call(
+            "markdown_to_word", {"inputs": [str(self.root)], "workers": 0}
+        )
+
+        self.assertTrue(result.isError)
+
+    async def test_a_large_worker_count_does_not_grow_the_shared_pool(self) -> None:
+        for index in range(3):
+            (self.root / f"doc{index}.md").write_text("# Заголовок", encoding="utf-8")
+        size = mcp_server._shared_pool().size
+
+        result = await self.call(
+            "markdown_to_word",
+            {"inputs": [str(self.root)], "workers": mcp_server.MAX_WORKERS},
+        )
+
+        self.assertEqual(len(result.structuredContent["converted"]), 3)
+        self.assertEqual(mcp_server._shared_pool().size, size)
+
+    async def test_a_worker_count_over_the_bound_is_an_error(self) -> None:
+        (self.root / "doc.md").write_text("# Заголовок", encoding="utf-8")
+
+        result = await self.call(
+            "markdown_to_word", {"inputs": [str(self.root)], "workers": 500}
+        )
+
+        self.assertTrue(result.isError)
+        self.assertFalse((self.root / "doc.docx").exists())
+
     async def test_default_does_not_fetch_remote_images(self) -> None:
         (self.root / "doc.md").write_text(
             "![diagram](https://example.invalid/x.png)", encoding="utf-8"
@@ -217,6 +301,99 @@ class MarkdownToWordTests(McpServerTestCase):
         mock_urlopen.assert_called_once()
         self.assertEqual(result.structuredContent["converted"][0]["warnings"], [])
 
+    async def test_remote_image_cache_serves_revalidated_images_and_counts_them(self) -> None:
+        (self.root / "doc.md").write_text(
+            "![diagram](https://example.invalid/x.png)", encoding="utf-8"
+        )
+        fetched = _urlopen_response(_MINIMAL_PNG)
+        fetched.__enter__.return_value.headers = {"ETag": '"v1"'}
+        not_modified = HTTPError(
+            "https://example.invalid/x.png", 304, "Not Modified", {}, None
+        )
+        arguments = {
+            "inputs": [str(self.root / "doc.md")],
+            "fetch_remote_images": True,
+            "remote_image_cache": str(self.root / "cache"),
+        }
+
+        with patch("mdtoword.gfm_renderer.urlopen") as mock_urlopen:
+            mock_urlopen.side_effect = [fetched, not_modified]
+            first = (await self.call("markdown_to_word", arguments)).structuredContent
+            second = (await self.call("markdown_to_word", arguments)).structuredContent
+
+        revalidation = mock_urlopen.call_args_list[1].args[0]
+        self.assertEqual(revalidation.get_header("If-none-match"), '"v1"')
+        self.assertEqual(first["remote_image_cache"], {"hits": 0, "misses": 1})
+        self.assertEqual(second["remote_image_cache"], {"hits": 1, "misses": 0})
+        self.assertEqual(second["converted"][0]["warnings"], [])
+
+    async def test_report_has_no_cache_counters_without_a_cache(self) -> None:
+        (self.root / "doc.md").write_text("# Заголовок", encoding="utf-8")
+
+        result = await self.call("markdown_to_word", {"inputs": [str(self.root)]})
+
+        self.assertIsNone(result.structuredContent["remote_image_cache"])
+
+    async def test_image_settings_shrink_embedded_images(self) -> None:
+        PillowImage.new("RGB", (2400, 1200), "white").save(
+            self.root / "shot.png", dpi=(72, 72)
+        )
+        (self.root / "doc.md").write_text("![shot](shot.png)", encoding="utf-8")
+
+        result = await self.call(
+            "markdown_to_word",
+            {"inputs": [str(self.root)], "max_image_dpi": 100, "jpeg_quality": 80},
+        )
+
+        output = result.structuredContent["converted"][0]["output"]
+        (image,) = Document(output).part.package.image_parts
+        self.assertEqual(image.content_type, "image/jpeg")
+        self.assertEqual(image.image.px_width, 600)
+
+    async def test_shrunk_images_are_cached_in_the_server_image_cache(self) -> None:
+        PillowImage.new("RGB", (2400, 1200), "white").save(
+            self.root / "shot.png", dpi=(72, 72)
+        )
+        (self.root / "doc.md").write_text("![shot](shot.png)", encoding="utf-8")
+        cache = self.root / "image-cache"
+
+        with patch.object(mcp_server, "_image_cache_dir", cache):
+            await self.call(
+                "markdown_to_word", {"inputs": [str(self.root)], "max_image_dpi": 100}
+            )
+
+        self.assertEqual(len(list(cache.glob("*.img"))), 1)
+
+    async def test_compression_reaches_the_written_package(self) -> None:
+        (self.root / "doc.md").write_text("# Заголовок", encoding="utf-8")
+
+        result = await self.call(
+            "markdown_to_word", {"inputs": [str(self.root)], "compression": "stored"}
+        )
+
+        output = result.structuredContent["converted"][0]["output"]
+        with zipfile.ZipFile(output) as package:
+            methods = {info.compress_type for info in package.infolist()}
+        self.assertEqual(methods, {zipfile.ZIP_STORED})
+
+    async def test_unknown_compression_is_an_error(self) -> None:
+        (self.root / "doc.md").write_text("# Заголовок", encoding="utf-8")
+
+        result = await self.call(
+            "markdown_to_word", {"inputs": [str(self.root)], "compression": "zstd"}
+        )
+
+        self.assertTrue(result.isError)
+
+    async def test_out_of_range_jpeg_quality_is_an_error(self) -> None:
+        (self.root / "doc.md").write_text("# Заголовок", encoding="utf-8")
+
+        result = await self.call(
+            "markdown_to_word", {"inputs": [str(self.root)], "jpeg_quality": 0}
+        )
+
+        self.assertTrue(result.isError)
+
     async def test_image_outside_inputs_tree_is_refused_and_names_image_root(self) -> None:
         with tempfile.TemporaryDirectory() as outside_dir:
             outside_image = Path(outside_dir) / "secret.png"
@@ -335,6 +512,120 @@ class WordToMarkdownTests(McpServerTestCase):
         self.assertFalse(destination.exists())
 
 
+class BatchProgressTests(McpServerTestCase):
+    def write_sources(self, count: int) -> None:
+        for index in range(count):
+            (self.root / f"doc{index}.md").write_text(f"# {index}", encoding="utf-8")
+
+    async def test_progress_is_reported_per_finished_file(self) -> None:
+        self.write_sources(3)
+        notifications = []
+
+        async def on_progress(progress, total, message) -> None:
+            notifications.append((progress, total, message))
+
+        async with client_session(server._mcp_server) as client:
+            result = await client.call_tool(
+                "markdown_to_word",
+                {"inputs": [str(self.root)], "workers": 1},
+                progress_callback=on_progress,
+            )
+
+        self.assertFalse(result.isError)
+        self.assertEqual([progress for progress, _, _ in notifications], [1, 2, 3])
+        _, total, message = notifications[-1]
+        self.assertEqual(total, 3)
+        self.assertIn("doc2.md", message)
+
+    async def test_background_batch_is_polled_for_its_report(self) -> None:
+        self.write_sources(2)
+
+        started = await self.call(
+            "markdown_to_word", {"inputs": [str(self.root)], "background": True}
+        )
+        job_id = started.structuredContent["job_id"]
+        status = await self.call("batch_status", {"job_id": job_id, "wait_seconds": 60})
+
+        status = status.structuredContent
+        self.assertEqual(status["state"], "done")
+        self.assertEqual((status["sources_found"], status["files_done"]), (2, 2))
+        self.assertTrue(status["discovery_complete"])
+        self.assertEqual(status["report"]["job_id"], job_id)
+        self.assertEqual(len(status["report"]["converted"]), 2)
+        self.assertEqual(
+            status["bytes_written"],
+            sum(entry["output_bytes"] for entry in status["report"]["converted"]),
+        )
+
+    async def test_a_batch_that_cannot_run_fails_as_a_whole(self) -> None:
+        self.write_sources(1)
+        # workers=0 отклоняется ещё схемой инструмента, так что прогон
+        # срывается иначе: пул воркеров уже закрыт.
+        closed = RuntimeError("the worker pool is closed")
+
+        with patch.object(mcp_server, "_shared_pool", side_effect=closed):
+            started = await self.call(
+                "word_to_markdown", {"inputs": [str(self.root)], "background": True}
+            )
+            status = await self.call(
+                "batch_status",
+                {"job_id": started.structuredContent["job_id"], "wait_seconds": 60},
+            )
+
+        self.assertEqual(status.structuredContent["state"], "failed")
+        self.assertIn("closed", status.structuredContent["error"])
+
+    async def test_unknown_job_id_is_an_error(self) -> None:
+        result = await self.call("batch_status", {"job_id": "нет-такого"})
+
+        self.assertTrue(result.isError)
+
+    async def test_the_context_is_not_a_tool_argument(self) -> None:
+        async with client_session(server._mcp_server) as client:
+            listed = await client.list_tools()
+
+        schema = next(t.inputSchema for t in listed.tools if t.name == "markdown_to_word")
+        self.assertNotIn("ctx", schema["properties"])
+
+
+class WatchTests(McpServerTestCase):
+    async def test_a_watch_converts_edits_until_it_is_stopped(self) -> None:
+        source = self.root / "doc.md"
+        source.write_text("# Первая\n", encoding="utf-8")
+
+        started = await self.call(
+            "start_watch", {"inputs": [str(self.root)], "debounce_seconds": 0.1}
+        )
+        watch_id = started.structuredContent["watch_id"]
+        self.assertEqual(started.structuredContent["state"], "running")
+        status = await self._wait_for_passes(watch_id, 1)
+        self.assertEqual(status["sources_watched"], 1)
+        self.assertEqual(status["last_report"]["converted"][0]["source"], str(source))
+
+        source.write_text("# Вторая\n", encoding="utf-8")
+        status = await self._wait_for_passes(watch_id, 2)
+        self.assertEqual(status["converted"], 2)
+        self.assertEqual(
+            Document(self.root / "doc.docx").paragraphs[0].text, "Вторая"
+        )
+
+        stopped = await self.call("stop_watch", {"watch_id": watch_id})
+        self.assertEqual(stopped.structuredContent["state"], "stopped")
+
+    async def test_unknown_watch_id_is_an_error(self) -> None:
+        result = await self.call("watch_status", {"watch_id": "нет-такого"})
+
+        self.assertTrue(result.isError)
+
+    async def _wait_for_passes(self, watch_id: str, passes: int) -> dict:
+        for _ in range(200):
+            status = await self.call("watch_status", {"watch_id": watch_id})
+            if status.structuredContent["passes"] >= passes:
+                return status.structuredContent
+            await asyncio.sleep(0.05)
+        self.fail(f"watcher did not finish pass {passes}")
+
+
 class PreviewTests(McpServerTestCase):
     async def test_preview_reports_warnings_and_writes_no_files(self) -> None:
         (self.root / "doc.md").write_text("![diagram](missing.png)", encoding="utf-8")
@@ -415,6 +706,46 @@ class PreviewTests(McpServerTestCase):
         self.assertIn("outside the allowed root", warnings[0])
 
 
+class ConcurrencyTests(McpServerTestCase):
+    async def test_a_running_batch_does_not_block_other_calls(self) -> None:
+        (self.root / "slow.md").write_text("# Долгий", encoding="utf-8")
+        (self.root / "quick.md").write_text("# Быстрый", encoding="utf-8")
+        release = threading.Event()
+        convert = MarkdownToWordConverter.convert
+
+        def held_convert(converter, source, output):
+            release.wait(timeout=60)
+            return convert(converter, source, output)
+
+        with patch.object(MarkdownToWordConverter, "convert", held_convert):
+            batch = asyncio.create_task(
+                self.call(
+                    "markdown_to_word",
+                    {"inputs": [str(self.root / "slow.md")], "workers": 1},
+                )
+            )
+            try:
+                preview = await asyncio.wait_for(
+                    self.call("preview_markdown", {"inputs": [str(self.root / "quick.md")]}),
+                    timeout=30,
+                )
+            finally:
+                release.set()
+            converted = await batch
+
+        self.assertEqual(preview.structuredContent["sources_found"], 1)
+        self.assertEqual(len(converted.structuredContent["converted"]), 1)
+
+    def test_concurrency_limit_below_one_is_rejected(self) -> None:
+        with patch("sys.stderr"), self.assertRaises(SystemExit):
+            mcp_server.main(["--max-concurrent-calls", "0"])
+
+    def test_a_negative_file_limit_is_rejected(self) -> None:
+        for option in ("--file-timeout", "--file-memory-limit"):
+            with self.subTest(option), patch("sys.stderr"), self.assertRaises(SystemExit):
+                mcp_server.main([option, "-1"])
+
+
 class StdioProtocolTests(unittest.TestCase):
     def test_importing_the_server_writes_nothing_to_stdout(self) -> None:
         # stdout — это канал stdio-протокола: одна лишняя строка при импорте
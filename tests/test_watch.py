@@ -0,0 +1,206 @@
+"""Тесты режима наблюдения: пересобираются только затронутые изменением документы."""
+
+import ctypes
+import errno
+from pathlib import Path
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from docx import Document
+from PIL import Image
+
+from mdtoword.batch import FileOutcome
+from mdtoword.converters import MarkdownToWordConverter
+from mdtoword.watch import Watcher, _InotifyChanges, main
+
+_TIMEOUT_SECONDS = 10
+
+
+class _WatcherTests:
+    """Общие сценарии; подклассы задают способ узнавать об изменениях."""
+
+    polling = False
+
+    def setUp(self) -> None:
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.root = Path(tmpdir.name).resolve()
+        (self.root / "guide").mkdir()
+        Image.new("RGB", (4, 4), "red").save(self.root / "guide" / "logo.png")
+        (self.root / "guide" / "intro.md").write_text(
+            "# Введение\n\n![логотип](logo.png)\n", encoding="utf-8"
+        )
+        (self.root / "notes.md").write_text("# Заметки\n", encoding="utf-8")
+        self.passes: list[list[FileOutcome]] = []
+        self.pass_done = threading.Condition()
+
+    def start(self, **options) -> Watcher:
+        def on_pass(outcomes: list[FileOutcome]) -> None:
+            with self.pass_done:
+                self.passes.append(outcomes)
+                self.pass_done.notify_all()
+
+        options.setdefault("debounce", 0.1)
+        watcher = Watcher(
+            [self.root],
+            MarkdownToWordConverter(reuse_blocks=True),
+            poll_interval=0.05,
+            polling=self.polling,
+            on_pass=on_pass,
+            **options,
+        )
+        self.addCleanup(watcher.stop)
+        watcher.start()
+        self.next_pass()
+        return watcher
+
+    def next_pass(self) -> dict[str, FileOutcome]:
+        """Итоги следующего прохода по имени исходника."""
+        with self.pass_done:
+            count = len(self.passes)
+            if not self.pass_done.wait_for(
+                lambda: len(self.passes) > count, _TIMEOUT_SECONDS
+            ):
+                self.fail("the watcher did not convert anything")
+            return {outcome.source.name: outcome for outcome in self.passes[count]}
+
+    def test_the_first_pass_converts_every_source(self) -> None:
+        watcher = self.start()
+
+        self.assertEqual(
+            sorted(outcome.source.name for outcome in self.passes[0]),
+            ["intro.md", "notes.md"],
+        )
+        self.assertTrue((self.root / "notes.docx").exists())
+        self.assertEqual(watcher.converted, 2)
+
+    def test_an_edit_converts_only_the_edited_file(self) -> None:
+        self.start()
+
+        (self.root / "notes.md").write_text("# Заметки, правка\n", encoding="utf-8")
+
+        self.assertEqual(list(self.next_pass()), ["notes.md"])
+        self.assertEqual(
+            Document(self.root / "notes.docx").paragraphs[0].text, "Заметки, правка"
+        )
+
+    def test_a_changed_image_converts_the_documents_that_show_it(self) -> None:
+        self.start()
+
+        Image.new("RGB", (8, 8), "blue").save(self.root / "guide" / "logo.png")
+
+        outcomes = self.next_pass()
+        self.assertEqual(list(outcomes), ["intro.md"])
+        self.assertFalse(outcomes["intro.md"].unchanged)
+
+    def test_a_new_file_in_a_new_directory_is_converted(self) -> None:
+        watcher = self.start()
+
+        (self.root / "new" / "deeper").mkdir(parents=True)
+        (self.root / "new" / "deeper" / "added.md").write_text("# Новый\n", encoding="utf-8")
+
+        self.assertEqual(list(self.next_pass()), ["added.md"])
+        self.assertTrue((self.root / "new" / "deeper" / "added.docx").exists())
+        self.assertEqual(len(watcher.sources), 3)
+
+    def test_a_renamed_file_is_converted_under_its_new_name(self) -> None:
+        watcher = self.start()
+
+        (self.root / "notes.md").rename(self.root / "renamed.md")
+
+        self.assertEqual(list(self.next_pass()), ["renamed.md"])
+        self.assertNotIn(self.root / "notes.md", watcher.sources)
+
+    def test_a_burst_of_edits_is_converted_in_one_pass(self) -> None:
+        watcher = self.start(debounce=0.5)
+
+        for number in range(5):
+            (self.root / "notes.md").write_text(f"# Правка {number}\n", encoding="utf-8")
+            (self.root / "guide" / "intro.md").write_text(
+                f"# Правка {number}\n", encoding="utf-8"
+            )
+            time.sleep(0.05)
+
+        self.assertEqual(sorted(self.next_pass()), ["intro.md", "notes.md"])
+        time.sleep(1)
+        self.assertEqual(watcher.passes, 2)
+
+    def test_excluded_directories_are_not_converted(self) -> None:
+        (self.root / "drafts").mkdir()
+        self.start(exclude=["drafts"])
+
+        (self.root / "drafts" / "wip.md").write_text("# Черновик\n", encoding="utf-8")
+        (self.root / "notes.md").write_text("# Заметки, правка\n", encoding="utf-8")
+
+        self.assertEqual(list(self.next_pass()), ["notes.md"])
+        self.assertFalse((self.root / "drafts" / "wip.docx").exists())
+
+    def test_stop_ends_the_thread(self) -> None:
+        watcher = self.start()
+
+        watcher.stop(_TIMEOUT_SECONDS)
+
+        self.assertFalse(watcher.is_alive())
+        self.assertIsNone(watcher.error)
+
+
+def _inotify_available() -> bool:
+    try:
+        _InotifyChanges().close()
+    except OSError:
+        return False
+    return True
+
+
+@unittest.skipUnless(_inotify_available(), "inotify недоступен на этой платформе")
+class InotifyWatcherTests(_WatcherTests, unittest.TestCase):
+    def test_the_backend_is_inotify(self) -> None:
+        self.assertEqual(self.start().backend, "inotify")
+
+    def test_running_out_of_inotify_watches_falls_back_to_polling(self) -> None:
+        # Дерево больше fs.inotify.max_user_watches: inotify_add_watch
+        # отвечает ENOSPC, а наблюдение должно продолжиться опросом.
+        def add_watch(fd: int, path: bytes, mask: int) -> int:
+            ctypes.set_errno(errno.ENOSPC)
+            return -1
+
+        init = _InotifyChanges.__init__
+
+        def init_without_watches(changes: _InotifyChanges) -> None:
+            init(changes)
+            changes._add_watch = add_watch
+
+        with mock.patch.object(_InotifyChanges, "__init__", init_without_watches):
+            watcher = self.start()
+
+        self.assertEqual(watcher.backend, "polling")
+        self.assertEqual(len(self.passes[0]), 2)
+
+        (self.root / "notes.md").write_text("# Заметки, правка\n", encoding="utf-8")
+
+        self.assertEqual(list(self.next_pass()), ["notes.md"])
+        self.assertIsNone(watcher.error)
+
+
+class PollingWatcherTests(_WatcherTests, unittest.TestCase):
+    polling = True
+
+    def test_the_backend_is_polling(self) -> None:
+        self.assertEqual(self.start().backend, "polling")
+
+
+class WatcherArgumentTests(unittest.TestCase):
+    def test_inputs_that_do_not_exist_are_an_error(self) -> None:
+        with self.assertRaises(ValueError):
+            Watcher([Path("/нет/такого/каталога")], MarkdownToWordConverter())
+
+    def test_the_command_line_rejects_missing_inputs(self) -> None:
+        with self.assertRaises(SystemExit):
+            main(["/нет/такого/каталога"])
+
+
+if __name__ == "__main__":
+    unittest.main()
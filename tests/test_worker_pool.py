@@ -0,0 +1,118 @@
+"""Тесты пула прогретых процессов-воркеров.
+
+Задачи — встроенные функции вроде ``os.getpid``: их можно передать в
+spawn-процесс по ссылке, не завися от того, импортируем ли модуль тестов.
+"""
+
+import functools
+import operator
+import os
+import sys
+import time
+import unittest
+
+from mdtoword.worker_pool import JobOutOfMemory, JobTimedOut, WorkerCrashed, WorkerPool
+
+
+class WorkerPoolTests(unittest.TestCase):
+    def pool(self, **options) -> WorkerPool:
+        pool = WorkerPool(1, **options)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_jobs_run_in_the_same_warm_worker(self) -> None:
+        pool = self.pool()
+
+        first = pool.submit(os.getpid).result(timeout=60)
+        second = pool.submit(os.getpid).result(timeout=60)
+
+        self.assertNotEqual(first, os.getpid())
+        self.assertEqual(first, second)
+        self.assertEqual(pool.worker_pids(), [first])
+
+    def test_jobs_run_where_peak_rss_cannot_be_measured(self) -> None:
+        # Как на Windows: ни /proc, ни resource. Подмена делается в самом
+        # воркере, через initializer, который можно передать по ссылке.
+        pool = self.pool(
+            initializer=functools.partial(
+                exec, "import mdtoword.worker_pool as w; w._peak_rss = lambda: None"
+            )
+        )
+
+        first = pool.submit(os.getpid).result(timeout=60)
+        second = pool.submit(os.getpid).result(timeout=60)
+
+        self.assertEqual(first, second)
+
+    def test_a_worker_is_replaced_after_max_jobs(self) -> None:
+        pool = self.pool(max_jobs=2)
+
+        pids = [pool.submit(os.getpid).result(timeout=60) for _ in range(3)]
+
+        self.assertEqual(pids[0], pids[1])
+        self.assertNotEqual(pids[1], pids[2])
+
+    def test_a_worker_over_the_memory_ceiling_is_replaced(self) -> None:
+        pool = self.pool(max_rss_bytes=1)
+
+        first = pool.submit(os.getpid).result(timeout=60)
+        second = pool.submit(os.getpid).result(timeout=60)
+
+        self.assertNotEqual(first, second)
+
+    def test_a_crashed_worker_fails_only_its_job(self) -> None:
+        pool = self.pool()
+
+        with self.assertRaises(WorkerCrashed):
+            pool.submit(os._exit, 3).result(timeout=60)
+        self.assertIsInstance(pool.submit(os.getpid).result(timeout=60), int)
+
+    def test_exceptions_raised_by_the_job_reach_the_caller(self) -> None:
+        pool = self.pool()
+
+        with self.assertRaises(ValueError):
+            pool.submit(int, "не число").result(timeout=60)
+
+    def test_a_job_past_its_timeout_fails_and_the_pool_carries_on(self) -> None:
+        pool = self.pool()
+        pool.submit(os.getpid).result(timeout=60)
+
+        started = time.monotonic()
+        with self.assertRaises(JobTimedOut):
+            pool.submit(time.sleep, 30, timeout=0.5).result(timeout=60)
+
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertIsInstance(pool.submit(os.getpid).result(timeout=60), int)
+
+    @unittest.skipIf(sys.platform == "win32", "нет getrusage")
+    def test_a_job_past_its_memory_limit_fails_and_the_pool_carries_on(self) -> None:
+        pool = self.pool()
+        limit = 256 * 1024 * 1024
+
+        with self.assertRaises(JobOutOfMemory):
+            # Повтор одного байта заполняет страницы, а не только резервирует их.
+            pool.submit(operator.mul, b"x", 2 * limit, max_rss_bytes=limit).result(
+                timeout=60
+            )
+        self.assertIsInstance(
+            pool.submit(os.getpid, max_rss_bytes=limit).result(timeout=60), int
+        )
+
+    def test_the_pool_grows_on_demand_and_never_shrinks(self) -> None:
+        pool = self.pool()
+
+        pool.ensure_size(3)
+        pool.ensure_size(2)
+
+        self.assertEqual(pool.size, 3)
+
+    def test_a_closed_pool_refuses_new_jobs(self) -> None:
+        pool = self.pool()
+        pool.close()
+
+        with self.assertRaises(RuntimeError):
+            pool.submit(os.getpid)
+
+
+if __name__ == "__main__":
+    unittest.main()